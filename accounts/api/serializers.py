@@ -12,8 +12,7 @@ from accounts.models import (
 from matches.api.models import TeamMembership
 from matches.models import Team
 from matches.services.memberships import set_current_team, clear_current_team
-from stats.api.models import PlayerMatchStat
-from stats.api.serializers import StatsSummarySerializer
+from stats.services.summary import summary_for_user
 
 User = get_user_model()
 
@@ -64,9 +63,9 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
     def get_stats_summary(self, obj):
-        qs = PlayerMatchStat.objects.filter(user=obj)
         # Devuelve: {"matches": N, "wins": N, "goals": N, "mvps": N}
-        return StatsSummarySerializer.from_queryset(qs)
+        # Lee la fila de PlayerStatsSummary (select_related("stats_totals") en las vistas)
+        return summary_for_user(obj)
 
 
 # --------- Registro (pantalla 1) ----------
@@ -9,7 +9,10 @@ from accounts.models import (
     DocumentType, City, District, FootballPosition, DominantFoot, TermsAndConditions
 )
 from accounts.services.sessions import logout_by_token, logout_all, upsert_session
+from config.compression import no_compression
+from config.db_router import read_replica
 from config.responses import created, ok, error
+from config.query_budget import query_budget
 from matches.api.models import Team
 from .serializers import (
     RegisterSerializer, UserSerializer, ChangePasswordSerializer, ProfileUpdateSerializer, LoginByDocumentSerializer
@@ -19,6 +22,7 @@ from ..utils.authentication import DeviceTokenAuthentication
 User = get_user_model()
 
 
+@query_budget(post=26)
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
@@ -32,6 +36,8 @@ class RegisterView(APIView):
         )
 
 
+@no_compression  # lleva el token de acceso (BREACH)
+@query_budget(post=13)
 class LoginView(APIView):
     permission_classes = [AllowAny]
 
@@ -48,7 +54,8 @@ class LoginView(APIView):
         # hidratar usuario con relaciones para serializarlo completo (como en ProfileDataView)
         user_full = (
             User.objects
-            .select_related("document_type", "city", "district", "position", "dominant_foot", "team")
+            .select_related("document_type", "city", "district", "position", "dominant_foot", "team",
+                            "stats_totals")
             .prefetch_related("team_memberships__team")
             .get(pk=user.pk)
         )
@@ -61,13 +68,15 @@ class LoginView(APIView):
         return ok(payload, message="Login exitoso")
 
 
+@query_budget(get=4, patch=5)
 class ProfileDataView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = (User.objects
-                .select_related("document_type", "city", "district", "position", "dominant_foot", "team")
+                .select_related("document_type", "city", "district", "position", "dominant_foot", "team",
+                                "stats_totals")
                 .prefetch_related("team_memberships__team")
                 .get(pk=request.user.pk))
         return ok(UserSerializer(user).data, message="Perfil")
@@ -78,12 +87,14 @@ class ProfileDataView(APIView):
         s.save()
 
         user = (User.objects
-                .select_related("document_type", "city", "district", "position", "dominant_foot", "team")
+                .select_related("document_type", "city", "district", "position", "dominant_foot", "team",
+                                "stats_totals")
                 .prefetch_related("team_memberships__team")
                 .get(pk=request.user.pk))
         return ok(UserSerializer(user).data, message="Perfil actualizado")
 
 
+@query_budget(post=3)
 class ChangePasswordView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -100,6 +111,7 @@ class ChangePasswordView(APIView):
 
 
 # ---------- LOGOUTS ----------
+@query_budget(post=5)
 class LogoutView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -116,6 +128,7 @@ class LogoutView(APIView):
         return Response(payload, status=status.HTTP_200_OK)
 
 
+@query_budget(post=6)
 class LogoutAllView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -126,6 +139,8 @@ class LogoutAllView(APIView):
 
 
 # ---------- CATÁLOGOS ----------
+@read_replica
+@query_budget(get=6)
 class RegistrationCatalogView(APIView):
     """
     Devuelve catálogos para la pantalla de registro (excepto distritos, que se carga por city).
@@ -154,6 +169,8 @@ class RegistrationCatalogView(APIView):
         })
 
 
+@read_replica
+@query_budget(get=1)
 class DistrictsByCityView(APIView):
     """
     GET /catalogs/districts?city_id=#
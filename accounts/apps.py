@@ -7,4 +7,5 @@ class AccountsConfig(AppConfig):
     verbose_name = 'Cuentas y Sesiones'
 
     def ready(self):
-        pass
+        from .utils import signals  # noqa: F401  (registra los receivers)
+        from config import caches  # noqa: F401  (system checks de CACHES compartidas)
@@ -0,0 +1,62 @@
+# accounts/management/commands/bench_auth.py
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import SessionToken
+from accounts.services.token_cache import token_cache
+from accounts.utils.authentication import DeviceTokenAuthentication
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Mide el costo de DeviceTokenAuthentication por request con la caché de tokens fría y caliente."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def _measure(self, auth, request, n, cold):
+        cache = token_cache()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(n):
+                if cold:
+                    cache.clear()
+                auth.authenticate(request)
+            elapsed = time.perf_counter() - started
+        return {
+            "us_per_request": round(elapsed / n * 1e6, 1),
+            "queries_per_request": round(len(queries.captured_queries) / n, 2),
+        }
+
+    def handle(self, *args, **opts):
+        if not settings.AUTH_TOKEN_CACHE_ENABLED:
+            self.stderr.write(self.style.WARNING("AUTH_TOKEN_CACHE_ENABLED=0: 'warm' será igual a 'cold'"))
+
+        run = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f"bench-auth-{run}", email=f"bench-auth-{run}@bench.local",
+                                   document_number=run, password="!")
+        st = SessionToken.objects.create(user=user, document_number=run, device_id="bench",
+                                         token=f"bench-auth-{run}-{uuid.uuid4().hex}")
+        try:
+            request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {st.token}")
+            auth = DeviceTokenAuthentication()
+            n = opts["requests"]
+            auth.authenticate(request)  # calienta conexión/ORM
+            cold = self._measure(auth, request, n, cold=True)
+            token_cache().clear()
+            auth.authenticate(request)
+            warm = self._measure(auth, request, n, cold=False)
+        finally:
+            user.delete()
+
+        self.stdout.write(f"db={connection.vendor} requests={n}")
+        self.stdout.write(f"  cold: {cold['us_per_request']} µs/req, {cold['queries_per_request']} queries/req")
+        self.stdout.write(f"  warm: {warm['us_per_request']} µs/req, {warm['queries_per_request']} queries/req")
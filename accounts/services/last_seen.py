@@ -0,0 +1,128 @@
+# accounts/services/last_seen.py
+"""
+Escritura coalescida de SessionToken.last_seen.
+
+Antes cada request autenticado hacía un UPDATE (un GET de solo lectura se volvía
+una escritura). Ahora:
+- si last_seen es más reciente que AUTH_LAST_SEEN_WINDOW, no se escribe nada;
+- con AUTH_LAST_SEEN_BUFFER=1 los "touch" se acumulan en memoria y se vuelcan
+  con UN UPDATE por lote: desde un hilo del worker cada
+  AUTH_LAST_SEEN_FLUSH_INTERVAL (haya tráfico o no), desde la request que
+  llena el buffer y al apagar el worker.
+
+Así las escrituras escalan con sesiones activas, no con requests, y last_seen
+queda exacto dentro de la ventana (+ el intervalo de flush si hay buffer).
+
+Como en promos/services/events.py: si el UPDATE falla los ids vuelven al
+buffer y se reintentan en el próximo volcado; la request que lo disparó no ve
+el error (se loguea) y no reintenta antes de un intervalo.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from accounts.api.models import SessionToken
+
+logger = logging.getLogger(__name__)
+
+
+class TouchBuffer:
+    def __init__(self, max_size: int, interval: float):
+        self.max_size = max_size
+        self.interval = interval
+        self._pending = set()
+        self._retry_at = 0.0  # tras un volcado fallido, la request no reintenta antes de esto
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def add(self, session_id: int):
+        with self._lock:
+            self._pending.add(session_id)
+            due = len(self._pending) >= self.max_size and time.monotonic() >= self._retry_at
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+        if due:
+            self._safe_flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            ids, self._pending = self._pending, set()
+        if not ids:
+            return 0
+        try:
+            # un UPDATE por lote; el error máximo de last_seen es el intervalo de flush
+            updated = SessionToken.objects.filter(pk__in=ids).update(last_seen=timezone.now())
+        except Exception:
+            with self._lock:
+                self._pending |= ids  # vuelven al buffer: se reintentan en el próximo volcado
+                self._retry_at = time.monotonic() + self.interval
+            raise
+        self._retry_at = 0.0  # la BD volvió: las requests pueden volcar de nuevo
+        return updated
+
+    def _safe_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudo volcar last_seen (%s sesiones en el buffer)", len(self))
+
+    def _start_flusher(self):
+        # por pid: con gunicorn --preload el hilo del master no sobrevive al fork
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="last-seen-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            self._safe_flush()
+            # el hilo no pasa por request_finished: como en el checkout, CONN_MAX_AGE/pool se respetan aquí
+            close_old_connections()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def touch_buffer() -> TouchBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = TouchBuffer(settings.AUTH_LAST_SEEN_BUFFER_SIZE,
+                                      settings.AUTH_LAST_SEEN_FLUSH_INTERVAL)
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def touch_session(st: SessionToken, now=None) -> bool:
+    """Marca actividad de la sesión. True si se registró (escritura o buffer)."""
+    now = now or timezone.now()
+    window = timedelta(seconds=settings.AUTH_LAST_SEEN_WINDOW)
+    if st.last_seen and now - st.last_seen < window:
+        return False
+
+    if settings.AUTH_LAST_SEEN_BUFFER:
+        touch_buffer().add(st.pk)
+    else:
+        SessionToken.objects.filter(pk=st.pk).update(last_seen=now)
+    st.last_seen = now
+    return True
+
+
+def flush_last_seen() -> int:
+    """Vuelca los touch pendientes de este proceso (p.ej. en tests o benchmarks)."""
+    return touch_buffer().flush() if _buffer is not None else 0
@@ -6,6 +6,8 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from accounts.api.models import SessionToken
+from config.db_router import pin_primary
+from .token_cache import invalidate_tokens
 from ..utils.datetime import fmt_local
 from ..utils.requests import client_ip
 
@@ -20,6 +22,8 @@ def issue_access_token() -> str:
 def upsert_session(user: User, device_id: str, request) -> str:
     """Crea/actualiza la sesión (una por device_id) y devuelve el token en claro."""
     access = issue_access_token()
+    # el token anterior de este device deja de valer: sácalo de la caché de auth
+    invalidate_tokens(*SessionToken.objects.filter(user=user, device_id=device_id).values_list("token", flat=True))
     SessionToken.objects.update_or_create(
         user=user, device_id=device_id,
         defaults={
@@ -29,6 +33,7 @@ def upsert_session(user: User, device_id: str, request) -> str:
             "user_agent": request.META.get("HTTP_USER_AGENT", "")[:255],
         }
     )
+    pin_primary(user.pk)  # sus próximas lecturas no deben venir de una réplica atrasada
     return access
 
 
@@ -55,6 +60,7 @@ def logout_by_token(user: User, token: str) -> Dict[str, Any]:
         }
     payload = serialize_session(st, include_terminated_at=True)
     st.delete()
+    invalidate_tokens(st.token)
     return {
         "status": "success",
         "message": "Sesión terminada",
@@ -75,6 +81,7 @@ def logout_all(user: User) -> Dict[str, Any]:
         }
     terminated = [serialize_session(st) for st in sessions]
     SessionToken.objects.filter(user=user).delete()
+    invalidate_tokens(*(st.token for st in sessions))
     return {
         "status": "success",
         "message": f"Se cerraron {len(terminated)} sesiones",
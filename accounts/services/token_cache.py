@@ -0,0 +1,153 @@
+# accounts/services/token_cache.py
+"""
+Caché token -> (snapshot del usuario, datos de la sesión) para DeviceTokenAuthentication.
+
+Dos niveles:
+- local: LRU + TTL en memoria del proceso (acotado por AUTH_TOKEN_CACHE_SIZE)
+- compartido (opcional): un alias de Django cache (AUTH_TOKEN_CACHE_ALIAS),
+  p.ej. Redis, visible para todos los workers. Un alias local al proceso
+  (LocMemCache) no cuenta como compartido.
+
+La revocación (logout, logout_all, nuevo token por device, usuario desactivado)
+borra la entrada en ambos niveles, pero el nivel local solo en el proceso que
+revoca: los demás workers pueden seguir aceptando el token hasta que venza su
+entrada local. Por eso el nivel local siempre usa AUTH_TOKEN_CACHE_LOCAL_TTL
+(unos pocos segundos); AUTH_TOKEN_CACHE_TTL es solo para el nivel compartido.
+
+Del usuario se guardan solo los valores de sus campos: cada hit arma una
+instancia nueva, sin caches de relaciones (lo que la vista cargue sobre
+request.user no vuelve a la caché).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from config.caches import is_shared
+
+_KEY_PREFIX = "auth:token:"
+
+
+class LRUTTLCache:
+    """LRU acotado con expiración por entrada (thread-safe)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _snapshot(user) -> tuple:
+    """(alias de BD, valores de los campos concretos) del usuario, desacoplado de la instancia."""
+    return user._state.db, tuple(getattr(user, f.attname) for f in user._meta.concrete_fields)
+
+
+def _restore(snapshot):
+    db, values = snapshot
+    User = get_user_model()
+    return User.from_db(db, [f.attname for f in User._meta.concrete_fields], values)
+
+
+class TokenCache:
+    def __init__(self):
+        alias = settings.AUTH_TOKEN_CACHE_ALIAS
+        self.shared = caches[alias] if is_shared(alias) else None
+        self.local = LRUTTLCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_LOCAL_TTL)
+        self.ttl = settings.AUTH_TOKEN_CACHE_TTL
+
+    def get(self, token: str):
+        """Devuelve (user, session_data) o None. `user` es una instancia nueva por request."""
+        entry = self.local.get(token)
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(_KEY_PREFIX + token)
+            if entry is not None:
+                self.local.set(token, entry)
+        if entry is None:
+            return None
+        user, session = entry
+        return _restore(user), dict(session)
+
+    def set(self, token: str, user, session: dict):
+        entry = (_snapshot(user), dict(session))
+        self.local.set(token, entry)
+        if self.shared is not None:
+            self.shared.set(_KEY_PREFIX + token, entry, timeout=self.ttl)
+
+    def invalidate(self, *tokens):
+        tokens = [t for t in tokens if t]
+        for t in tokens:
+            self.local.delete(t)
+        if self.shared is not None and tokens:
+            self.shared.delete_many([_KEY_PREFIX + t for t in tokens])
+
+    def clear(self):
+        self.local.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def token_cache() -> TokenCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TokenCache()
+    return _cache
+
+
+def invalidate_tokens(*tokens):
+    if settings.AUTH_TOKEN_CACHE_ENABLED:
+        token_cache().invalidate(*tokens)
+
+
+def invalidate_user_tokens(user_id):
+    """Invalida todas las sesiones cacheadas de un usuario (cambio de password, desactivación...)."""
+    if not settings.AUTH_TOKEN_CACHE_ENABLED:
+        return
+    from accounts.api.models import SessionToken
+    tokens = SessionToken.objects.filter(user_id=user_id).values_list("token", flat=True)
+    token_cache().invalidate(*tokens)
+
+
+def reset_token_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import SessionToken
+from accounts.services import last_seen
+
+User = get_user_model()
+
+
+@override_settings(AUTH_LAST_SEEN_BUFFER=True, AUTH_LAST_SEEN_WINDOW=60)
+class TouchBufferTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("jugador", email="jugador@example.com", password="x",
+                                        document_number="12345678")
+        self.session = SessionToken.objects.create(user=user, document_number=user.document_number,
+                                                   device_id="d1", token="t" * 32)
+        # last_seen es auto_now: se envejece con update() para que el touch no caiga en la ventana
+        SessionToken.objects.filter(pk=self.session.pk).update(last_seen=timezone.now() - timedelta(hours=1))
+        self.session.refresh_from_db()
+        self.buffer = last_seen.TouchBuffer(max_size=1, interval=60)
+
+    def test_failed_update_keeps_touches_and_does_not_fail_the_request(self):
+        failing = mock.patch.object(SessionToken.objects, "filter", side_effect=DatabaseError("BD caída"))
+        with mock.patch.object(last_seen, "_buffer", self.buffer), failing, \
+                self.assertLogs(last_seen.logger, "ERROR"):
+            # el buffer se llena con este touch: el volcado falla dentro de la request
+            self.assertTrue(last_seen.touch_session(self.session))
+        self.assertEqual(len(self.buffer), 1)
+
+        before = SessionToken.objects.get(pk=self.session.pk).last_seen
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertGreater(SessionToken.objects.get(pk=self.session.pk).last_seen, before)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_request_waits_an_interval_before_retrying(self):
+        with mock.patch.object(SessionToken.objects, "filter", side_effect=DatabaseError("BD caída")) as update, \
+                self.assertLogs(last_seen.logger, "ERROR"):
+            self.buffer.add(self.session.pk)
+            self.buffer.add(self.session.pk + 1)
+        self.assertEqual(update.call_count, 1)
+        self.assertEqual(len(self.buffer), 2)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        with mock.patch.object(self.buffer, "flush", wraps=self.buffer.flush) as flush:
+            self.buffer.add(self.session.pk)  # tras un volcado exitoso ya no hay espera
+        flush.assert_called_once()
@@ -1,12 +1,15 @@
 # accounts/authentication.py
 from typing import Optional, Tuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import exceptions
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 
 from accounts.api.models import SessionToken
+from accounts.services.last_seen import touch_session
+from accounts.services.token_cache import token_cache
 
 User = get_user_model()
 
@@ -24,16 +27,45 @@ class DeviceTokenAuthentication(BaseAuthentication):
 
         token = auth[1].decode("utf-8")
 
-        try:
-            st = SessionToken.objects.select_related("user").get(token=token)
-        except SessionToken.DoesNotExist:
-            raise exceptions.AuthenticationFailed("Sesión cerrada o token inválido")
+        st = self._cached_session(token) if settings.AUTH_TOKEN_CACHE_ENABLED else None
+        from_cache = st is not None
+        if st is None:
+            try:
+                st = SessionToken.objects.select_related("user").get(token=token)
+            except SessionToken.DoesNotExist:
+                raise exceptions.AuthenticationFailed("Sesión cerrada o token inválido")
 
         if not st.user.is_active:
             raise exceptions.AuthenticationFailed("Usuario inactivo")
 
-        SessionToken.objects.filter(pk=st.pk).update(last_seen=timezone.now())
+        # solo escribe si last_seen es más viejo que AUTH_LAST_SEEN_WINDOW
+        touched = touch_session(st, timezone.now())
+        if touched or not from_cache:
+            self._cache_session(token, st)
         return (st.user, st)
 
+    @staticmethod
+    def _cache_session(token, st: SessionToken):
+        if settings.AUTH_TOKEN_CACHE_ENABLED:
+            token_cache().set(token, st.user, {
+                "id": st.pk, "device_id": st.device_id, "document_number": st.document_number,
+                "last_seen": st.last_seen,
+            })
+
+    @staticmethod
+    def _cached_session(token) -> Optional[SessionToken]:
+        """SessionToken (no persistido) armado desde la caché, o None si no está."""
+        hit = token_cache().get(token)
+        if hit is None:
+            return None
+        user, session = hit
+        st = SessionToken(
+            pk=session["id"], user_id=user.pk, token=token,
+            device_id=session["device_id"], document_number=session["document_number"],
+            last_seen=session["last_seen"],
+        )
+        st.user = user
+        return st
+
     def authenticate_header(self, request):
         return "Bearer"
\ No newline at end of file
@@ -1,14 +1,23 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from accounts.api.models import SessionToken
+from accounts.services.token_cache import invalidate_tokens, invalidate_user_tokens
 
 User = get_user_model()
 
 
 @receiver(post_save, sender=User)
 def revoke_sessions_if_inactive(sender, instance: User, **kwargs):
+    # El snapshot cacheado del usuario queda viejo (perfil, password, is_active)
+    invalidate_user_tokens(instance.pk)
     # Si el usuario se desactiva desde el admin, borra todas sus sesiones
     if not instance.is_active:
         SessionToken.objects.filter(user=instance).delete()
+
+
+@receiver(post_delete, sender=SessionToken)
+def invalidate_deleted_session(sender, instance: SessionToken, **kwargs):
+    # Cubre borrados desde el admin (SessionTokenAdmin / inline) y cascadas
+    invalidate_tokens(instance.token)
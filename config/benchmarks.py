@@ -0,0 +1,473 @@
+# config/benchmarks.py
+"""
+Benchmark de la API: cada endpoint pasa por el Client de Django contra una liga
+generada con config/seeding.py (determinista) en varios tamaños, y se registra
+latencia (p50/p90/p99...) y cantidad de queries por request.
+
+- SCENARIOS: un escenario por (nombre de URL, método). `build(ctx, i)` arma la
+  request i-ésima FUERA de la medición (crear usuarios/tokens/pagos de usar y
+  tirar para logout, join, leave, checkout, webhook...).
+- run_suite(): genera cada tamaño de DATASETS en la BD actual (vaciándola antes)
+  y corre los escenarios; el resultado es un dict serializable a JSON.
+- compare(): diferencias contra una corrida anterior (mismo formato JSON).
+- metrics_overhead(): costo de MetricsMiddleware por request (µs), sin dataset.
+
+MercadoPago es el falso en proceso (payments/services/mp_fake.py, sin latencia)
+y el checkout se mide en modo síncrono.
+"""
+import itertools
+import json
+import statistics
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import Callable
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from django.utils import timezone
+
+from accounts.models import SessionToken
+from accounts.services.token_cache import reset_token_cache
+from config.metrics import MetricsMiddleware
+from config.seeding import SEED_PASSWORD, LeagueSpec, generate_league
+from matches.models import Match, MatchStatus
+from matches.services.enrollments import join_match
+from payments.models import Payment, PaymentStatus
+from payments.services.mp import reset_mp_sdk
+from payments.services.mp_fake import FakeHttpClient, FakeMercadoPago
+from promos.services.events import flush_events
+from promos.services.payload import invalidate_promos
+
+User = get_user_model()
+
+DATASETS = {
+    "small": LeagueSpec(users=100, locations=5, matches=20, enrollments=200, payments=100),
+    "medium": LeagueSpec(users=2_000, locations=20, matches=300, enrollments=4_000, payments=2_000),
+    "large": LeagueSpec(users=20_000, locations=60, matches=3_000, enrollments=40_000, payments=20_000, teams=20),
+}
+
+PLAYERS = 20  # usuarios del dataset con token para los endpoints autenticados
+# DNI de los usuarios creados durante el benchmark (no chocan con los de config/seeding.py)
+FRESH_DOCUMENT_BASE = 90_000_000
+
+
+@dataclass
+class Call:
+    kwargs: dict = None  # kwargs de reverse()
+    query: dict = None
+    data: dict = None
+    token: str = None
+    headers: dict = field(default_factory=dict)
+
+
+@dataclass
+class Scenario:
+    url_name: str
+    method: str
+    build: Callable
+
+    @property
+    def label(self) -> str:
+        return f"{self.method.upper()} {self.url_name}"
+
+
+class BenchContext:
+    """Datos de la liga + helpers para crear lo que cada request consume."""
+
+    def __init__(self, league, fake_mp: FakeMercadoPago):
+        self.league = league
+        self.fake_mp = fake_mp
+        self._fresh = itertools.count()
+        self.password_hash = make_password(SEED_PASSWORD)
+
+        user_ids = league.user_ids[:PLAYERS]
+        self.players = [self._token(user_id, "bench") for user_id in user_ids]
+        self.player_users = dict(User.objects.in_bulk(user_ids))
+        staff = User.objects.create(username="bench-staff", email="bench-staff@liga.local",
+                                    document_number="00000000", password=self.password_hash, is_staff=True)
+        self.staff = self._token(staff.pk, "bench")
+
+        self.played = list(Match.objects.filter(pk__in=[m for m in league.played_ids if league.rosters.get(m)]))
+        self.upcoming = list(Match.objects.filter(pk__in=league.upcoming_ids))
+        # partido sin tope práctico para join/leave/checkout/webhook repetidos
+        self.open_match = Match.objects.create(
+            location_id=(self.upcoming or self.played)[0].location_id, title="Bench abierto",
+            start_at=timezone.now() + timedelta(days=7), capacity=10 ** 6, price_amount=10,
+            status=MatchStatus.PUBLISHED,
+        )
+        self.player_payments = [
+            (str(self._payment(user_id).public_id), token)
+            for user_id, token in zip(user_ids, self.players)
+        ]
+
+    def _token(self, user_id, device) -> str:
+        token = f"bench-{user_id}-{device}-{uuid.uuid4().hex}"
+        SessionToken.objects.create(user_id=user_id, document_number="", device_id=device, token=token)
+        return token
+
+    def _payment(self, user_id, status=PaymentStatus.PENDING) -> Payment:
+        public_id = uuid.uuid4()
+        return Payment.objects.create(public_id=public_id, user_id=user_id, match=self.open_match, status=status,
+                                      amount=self.open_match.price_amount, external_reference=str(public_id))
+
+    def player(self, i):
+        """(user, token) del jugador i (cíclico)."""
+        user_id = self.league.user_ids[i % len(self.players)]
+        return self.player_users[user_id], self.players[i % len(self.players)]
+
+    def fresh_document(self) -> str:
+        return str(FRESH_DOCUMENT_BASE + next(self._fresh))
+
+    def fresh_user(self):
+        """Usuario nuevo con token (para requests que lo consumen: logout-all, join, checkout...)."""
+        doc = self.fresh_document()
+        user = User.objects.create(username=f"bench-{doc}", email=f"bench-{doc}@liga.local",
+                                   document_type=self.league.document_type, document_number=doc,
+                                   password=self.password_hash)
+        return user, self._token(user.pk, "bench")
+
+
+# ---------- escenarios ----------
+def _register(ctx, i):
+    doc, league = ctx.fresh_document(), ctx.league
+    return Call(data={
+        "email": f"bench-{doc}@liga.local", "password": SEED_PASSWORD,
+        "first_name": "Bench", "last_name": "Registro",
+        "document_type_id": league.document_type.pk, "document_number": doc,
+        "city_id": league.city_ids[0], "district_id": league.district_ids[0],
+        "position_id": league.position_ids[0], "dominant_foot_id": league.foot_ids[0],
+        "team_id": league.team_ids[i % len(league.team_ids)] if league.team_ids else None,
+        "accept_terms": True, "terms_id": league.terms.pk,
+    })
+
+
+def _login(ctx, i):
+    user, _ = ctx.player(i)
+    return Call(data={"document_type": ctx.league.document_type.code, "document_number": user.document_number,
+                      "password": SEED_PASSWORD, "device_id": "bench-login"})
+
+
+def _logout(ctx, i):
+    user, _ = ctx.player(i)
+    return Call(token=ctx._token(user.pk, f"bench-logout-{i}"))
+
+
+def _fresh_token(ctx, i):
+    return Call(token=ctx.fresh_user()[1])
+
+
+def _change_password(ctx, i):
+    return Call(token=ctx.fresh_user()[1],
+                data={"current_password": SEED_PASSWORD, "new_password": f"{SEED_PASSWORD}-2"})
+
+
+def _as_player(ctx, i):
+    return Call(token=ctx.player(i)[1])
+
+
+def _as_staff(ctx, i):
+    return Call(token=ctx.staff, query={"output": "ndjson"})
+
+
+def _profile_patch(ctx, i):
+    return Call(token=ctx.player(i)[1], data={"phone": f"9{i:08d}"})
+
+
+def _districts(ctx, i):
+    return Call(query={"city_id": ctx.league.city_ids[i % len(ctx.league.city_ids)]})
+
+
+def _match_detail(ctx, i):
+    match = ctx.upcoming[i % len(ctx.upcoming)] if ctx.upcoming else ctx.open_match
+    return Call(kwargs={"match_identifier": match.match_identifier})
+
+
+def _join(ctx, i):
+    user, token = ctx.fresh_user()
+    ctx._payment(user.pk, status=PaymentStatus.APPROVED)  # join exige pago aprobado
+    return Call(kwargs={"match_identifier": ctx.open_match.match_identifier}, token=token)
+
+
+def _leave(ctx, i):
+    user, token = ctx.fresh_user()
+    join_match(user, ctx.open_match.pk)
+    return Call(kwargs={"match_identifier": ctx.open_match.match_identifier}, token=token)
+
+
+def _checkout(ctx, i):
+    return Call(data={"match_identifier": str(ctx.open_match.match_identifier)}, token=ctx.fresh_user()[1],
+                headers={"Idempotency-Key": f"bench-checkout-{i}"})
+
+
+def _webhook(ctx, i):
+    user, _ = ctx.fresh_user()
+    payment = ctx._payment(user.pk)
+    mp_id = ctx.fake_mp.pay(payment.external_reference, ("approved",))
+    return Call(query={"type": "payment", "data.id": mp_id}, data={})
+
+
+def _payment_status(ctx, i):
+    public_id, token = ctx.player_payments[i % len(ctx.player_payments)]
+    return Call(kwargs={"public_id": public_id}, token=token)
+
+
+def _promo_events(ctx, i):
+    ids = ctx.league.banner_ids or [0]
+    return Call(data={"events": [
+        {"kind": "banner", "id": ids[(i + j) % len(ids)], "type": "click" if j % 10 == 0 else "impression"}
+        for j in range(20)
+    ]})
+
+
+def _leaderboard(ctx, i):
+    metrics = ("goals", "mvps", "wins", "win_rate")
+    return Call(kwargs={"metric": metrics[i % len(metrics)]})
+
+
+def _team_stats(ctx, i):
+    teams = ctx.league.team_ids or [0]
+    return Call(kwargs={"team_id": teams[i % len(teams)]})
+
+
+def _results(ctx, i):
+    match = ctx.played[i % len(ctx.played)]
+    roster = ctx.league.rosters[match.pk]
+    return Call(kwargs={"match_identifier": match.match_identifier}, token=ctx.staff, data={
+        "players": [{"user_id": u, "goals": (u + i) % 3, "side": "AB"[n % 2]} for n, u in enumerate(roster)],
+        "winning_side": "A", "mvp_user_id": roster[0],
+    })
+
+
+def _anonymous(ctx, i):
+    return Call()
+
+
+SCENARIOS = [
+    Scenario("auth-register", "post", _register),
+    Scenario("auth-login", "post", _login),
+    Scenario("auth-logout", "post", _logout),
+    Scenario("auth-logout-all", "post", _fresh_token),
+    Scenario("profile-edit", "get", _as_player),
+    Scenario("profile-edit", "patch", _profile_patch),
+    Scenario("profile-change-password", "post", _change_password),
+    Scenario("catalogs-registration", "get", _anonymous),
+    Scenario("catalogs-districts", "get", _districts),
+    Scenario("matches-upcoming", "get", _anonymous),
+    Scenario("matches-board", "get", _as_player),
+    Scenario("matches-detail", "get", _match_detail),
+    Scenario("matches-join", "post", _join),
+    Scenario("matches-leave", "post", _leave),
+    Scenario("matches-enrollments-export", "get", _as_staff),
+    Scenario("payments-checkout", "post", _checkout),
+    Scenario("mp-webhook", "post", _webhook),
+    Scenario("payments-export", "get", _as_staff),
+    Scenario("payments-status", "get", _payment_status),
+    Scenario("public-promos", "get", _anonymous),
+    Scenario("promos-events", "post", _promo_events),
+    Scenario("promos-report", "get", lambda ctx, i: Call(token=ctx.staff)),
+    Scenario("stats-me-summary", "get", _as_player),
+    Scenario("stats-me-buckets", "get", _as_player),
+    Scenario("stats-me-matches", "get", _as_player),
+    Scenario("stats-export", "get", _as_staff),
+    Scenario("stats-leaderboard", "get", _leaderboard),
+    Scenario("matches-results", "post", _results),
+    Scenario("teams-stats", "get", _team_stats),
+    Scenario("metrics", "get", _anonymous),  # el Client llega desde 127.0.0.1 (METRICS_ALLOWED_IPS)
+]
+
+
+def url_names() -> set:
+    """Nombres de todas las rutas de config/urls.py salvo el admin (lo que el benchmark debe cubrir)."""
+    names = set()
+
+    def walk(patterns):
+        for p in patterns:
+            if isinstance(p, URLResolver):
+                if p.namespace != "admin":
+                    walk(p.url_patterns)
+            elif isinstance(p, URLPattern) and p.name:
+                names.add(p.name)
+
+    walk(get_resolver().url_patterns)
+    return names
+
+
+# ---------- medición ----------
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def summarize(samples, queries, statuses) -> dict:
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        "count": len(samples),
+        "p50_ms": ms(percentile(samples, 0.50)),
+        "p90_ms": ms(percentile(samples, 0.90)),
+        "p99_ms": ms(percentile(samples, 0.99)),
+        "mean_ms": ms(statistics.fmean(samples)) if samples else 0.0,
+        "max_ms": ms(max(samples, default=0.0)),
+        "queries_p50": percentile(queries, 0.50),
+        "queries_max": max(queries, default=0),
+        "statuses": dict(sorted(Counter(statuses).items())),
+    }
+
+
+def perform(client: Client, scenario: Scenario, call: Call):
+    """Ejecuta la request (recorre el stream si lo hay: el costo real está ahí)."""
+    path = reverse(scenario.url_name, kwargs=call.kwargs)
+    if call.query:
+        path = f"{path}?{urlencode(call.query)}"
+    headers = dict(call.headers)
+    if call.token:
+        headers["Authorization"] = f"Bearer {call.token}"
+    body = json.dumps(call.data) if call.data is not None else ""
+    response = client.generic(scenario.method.upper(), path, body, content_type="application/json",
+                              secure=True, headers=headers)
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def run_scenario(client: Client, ctx: BenchContext, scenario: Scenario, iterations: int, warmup: int) -> dict:
+    samples, queries, statuses = [], [], []
+    for i in range(warmup + iterations):
+        call = scenario.build(ctx, i)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = perform(client, scenario, call)
+            elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        samples.append(elapsed)
+        queries.append(len(captured.captured_queries))
+        statuses.append(str(response.status_code))
+    return summarize(samples, queries, statuses)
+
+
+@contextmanager
+def bench_environment(seed=42):
+    """MercadoPago falso en proceso y checkout síncrono mientras dure el bloque. Entrega el fake."""
+    fake_mp = FakeMercadoPago(seed=seed)
+    reset_mp_sdk(FakeHttpClient(fake_mp))
+    try:
+        with override_settings(PAYMENTS_ASYNC_CHECKOUT=False):
+            yield fake_mp
+    finally:
+        reset_mp_sdk()
+        flush_events()
+
+
+def prepare_dataset(size, seed, fake_mp) -> BenchContext:
+    """Vacía la BD y cachés, genera la liga `size` y devuelve el contexto de los escenarios."""
+    flush_events()
+    call_command("flush", interactive=False, verbosity=0)
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    reset_token_cache()
+    invalidate_promos()
+    return BenchContext(generate_league(DATASETS[size], seed=seed), fake_mp)
+
+
+def run_suite(sizes, iterations=30, warmup=3, seed=42, only=None, log=None) -> dict:
+    """Corre SCENARIOS en cada tamaño de `sizes`. OJO: vacía la BD actual (úsese en una BD de prueba)."""
+    log = log or (lambda msg: None)
+    scenarios = [s for s in SCENARIOS if not only or s.url_name in only]
+    covered = {s.url_name for s in SCENARIOS}
+    report = {
+        "meta": {
+            "db": connection.vendor,
+            "seed": seed,
+            "iterations": iterations,
+            "warmup": warmup,
+            "started_at": timezone.now().isoformat(),
+        },
+        "uncovered": sorted(url_names() - covered),
+        "datasets": {},
+    }
+
+    with bench_environment(seed) as fake_mp:
+        for size in sizes:
+            started = time.perf_counter()
+            ctx = prepare_dataset(size, seed, fake_mp)
+            log(f"[{size}] liga generada en {time.perf_counter() - started:.1f}s")
+            client = Client()
+            results = {}
+            for scenario in scenarios:
+                results[scenario.label] = r = run_scenario(client, ctx, scenario, iterations, warmup)
+                log(f"[{size}] {scenario.label}: p50 {r['p50_ms']} ms, p99 {r['p99_ms']} ms, "
+                    f"{r['queries_p50']} queries, {r['statuses']}")
+            report["datasets"][size] = {"spec": asdict(DATASETS[size]), "scenarios": results}
+    return report
+
+
+def metrics_overhead(requests=2000, queries=5, rounds=7) -> dict:
+    """
+    Costo de MetricsMiddleware por request: la misma vista mínima (`queries`
+    SELECT 1 y 512 bytes) con y sin el middleware, en rondas alternadas para
+    repartir el ruido; se informa la mediana de las rondas en µs.
+    """
+    request = RequestFactory().get(reverse("matches-upcoming"))
+    request.resolver_match = resolve(request.path)
+    body = b"x" * 512
+
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute("SELECT 1")
+        return HttpResponse(body)
+
+    with override_settings(METRICS_ENABLED=True):
+        measured = MetricsMiddleware(view)
+
+    def per_request(handler):
+        started = time.perf_counter()
+        for _ in range(requests):
+            handler(request)
+        return (time.perf_counter() - started) / requests * 1e6
+
+    per_request(view), per_request(measured)  # calentar conexión y registro
+    bare, with_metrics = [], []
+    for _ in range(rounds):
+        bare.append(per_request(view))
+        with_metrics.append(per_request(measured))
+    bare_us, metrics_us = statistics.median(bare), statistics.median(with_metrics)
+    return {
+        "requests": requests,
+        "queries": queries,
+        "bare_us": round(bare_us, 1),
+        "metrics_us": round(metrics_us, 1),
+        "overhead_us": round(metrics_us - bare_us, 1),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold=0.10) -> list:
+    """Líneas con lo que cambió más de `threshold` (p50) o en cantidad de queries."""
+    lines = []
+    for size, data in current["datasets"].items():
+        before = baseline.get("datasets", {}).get(size, {}).get("scenarios", {})
+        for label, now in data["scenarios"].items():
+            old = before.get(label)
+            if not old:
+                continue
+            ratio = now["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+            dq = now["queries_p50"] - old["queries_p50"]
+            if abs(ratio) >= threshold or dq:
+                lines.append(f"[{size}] {label}: p50 {old['p50_ms']} -> {now['p50_ms']} ms ({ratio:+.0%}), "
+                             f"queries {old['queries_p50']} -> {now['queries_p50']}")
+    return lines
@@ -0,0 +1,76 @@
+# config/caches.py
+"""
+Alias de CACHES compartidos (o no) entre workers.
+
+settings.CACHES["default"] sale de CACHE_URL (Redis o tabla en la BD). Sin
+CACHE_URL es LocMemCache: una por proceso, y lo que se invalida en un worker
+sigue vigente en los demás. Lo que depende de invalidar entre workers
+(versión de /api/promos, stats por equipo y por periodo, caché de tokens, pin
+de la réplica) pregunta is_shared() y, con caché local, acota la vigencia o
+se desactiva.
+
+Los system checks avisan cuando un alias de esos es local y gunicorn corre con
+más de un worker (WEB_CONCURRENCY, el que lee gunicorn sin --workers). El pin
+de la réplica no tiene un modo degradado aceptable: ahí es un error.
+"""
+import os
+
+from django.conf import settings
+from django.core import checks
+
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared(alias) -> bool:
+    """True si el alias de CACHES lo ven todos los workers (no es memoria del proceso)."""
+    return bool(alias) and settings.CACHES[alias]["BACKEND"] not in LOCAL_BACKENDS
+
+
+def web_workers() -> int:
+    try:
+        return int(os.getenv("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        return 1
+
+
+# (setting, qué se pierde con caché local)
+_SHARED_SETTINGS = (
+    ("PROMOS_CACHE_ALIAS", "/api/promos tarda hasta PROMOS_LOCAL_MAX_AGE en reflejar cambios en otros workers"),
+    ("STATS_CACHE_ALIAS", "las stats por periodo y por equipo se recalculan cada STATS_LOCAL_CACHE_TTL y tardan eso "
+                          "en reflejar cambios en otros workers"),
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if web_workers() <= 1:
+        return []
+    return [
+        checks.Warning(
+            f"{name}={getattr(settings, name)!r} es una caché local al proceso y WEB_CONCURRENCY>1: {effect}.",
+            hint="Define CACHE_URL (redis://... o db://tabla).",
+            id="config.W001",
+        )
+        for name, effect in _SHARED_SETTINGS
+        if not is_shared(getattr(settings, name))
+    ]
+
+
+@checks.register(checks.Tags.caches)
+def check_replica_pin(app_configs, **kwargs):
+    from config.db_router import pin_reaches_all_workers, replica_enabled
+
+    if not replica_enabled() or pin_reaches_all_workers():
+        return []
+    return [
+        checks.Error(
+            f"REPLICA_CACHE_ALIAS={settings.REPLICA_CACHE_ALIAS!r} es una caché local al proceso y "
+            "WEB_CONCURRENCY>1: el pin al primario tras escribir no llega a los otros workers "
+            "(ReplicaMiddleware queda desactivado).",
+            hint="Define CACHE_URL (redis://... o db://tabla) o apunta REPLICA_CACHE_ALIAS a un alias compartido.",
+            id="config.E001",
+        )
+    ]
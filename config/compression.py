@@ -0,0 +1,146 @@
+# config/compression.py
+"""
+Compresión selectiva de respuestas (gzip o brotli según Accept-Encoding).
+
+- Solo cuerpos de COMPRESSION_MIN_SIZE bytes o más y de un content-type de
+  COMPRESSION_LEVELS (nivel por tipo y codificación); imágenes, zip, etc. no
+  están ahí porque ya vienen comprimidos. Tampoco se tocan respuestas con
+  Content-Encoding, en streaming (exportaciones: no hay tamaño para decidir y
+  son de staff) ni las vistas marcadas con @no_compression (BREACH: no
+  comprimir secretos junto a datos que controla el cliente, p.ej. el token del
+  login).
+- brotli es opcional: si el paquete no está instalado se negocia solo gzip.
+- Respuestas con ETag fuerte (/api/promos, ya precalculado) se comprimen una
+  vez por versión y codificación; el ETag pasa a débil como en GZipMiddleware.
+- `manage.py bench_compression` mide CPU por request contra bytes ahorrados.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # opcional (requirements.txt): sin él solo gzip
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+_CACHE_SIZE = 64
+
+
+def no_compression(view):
+    """La respuesta de la vista nunca se comprime."""
+    view.compress = False
+    return view
+
+
+def available_encodings() -> tuple:
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate(accept_encoding: str):
+    """Codificación a usar según Accept-Encoding (q-values; brotli primero si empatan) o None."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def level_for(content_type: str, encoding: str):
+    """Nivel configurado para el content-type (sin parámetros) o None si no se comprime."""
+    mime = content_type.split(";", 1)[0].strip().lower()
+    levels = settings.COMPRESSION_LEVELS.get(mime)
+    return levels.get(encoding) if levels else None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=level, mode=brotli.MODE_TEXT)
+    return gzip.compress(body, compresslevel=level, mtime=0)  # mtime fijo: mismo body, mismos bytes
+
+
+class _CompressedCache:
+    """LRU chico de cuerpos comprimidos por (ETag fuerte, codificación, nivel)."""
+
+    def __init__(self, size=_CACHE_SIZE):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, etag, body, encoding, level) -> bytes:
+        key = (etag, encoding, level)
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit
+        data = compress(body, encoding, level)
+        with self._lock:
+            self._items[key] = data
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return data
+
+
+_cache = _CompressedCache()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        match = request.resolver_match
+        if match and not getattr(getattr(match.func, "view_class", match.func), "compress", True):
+            return response
+        content_type = response.get("Content-Type", "")
+        if (len(response.content) < settings.COMPRESSION_MIN_SIZE
+                or all(level_for(content_type, e) is None for e in available_encodings())):
+            return response
+
+        # comprimible: la respuesta varía según Accept-Encoding aunque esta vez vaya sin comprimir
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        level = level_for(content_type, encoding) if encoding else None
+        if level is None:
+            return response
+
+        etag = response.get("ETag", "")
+        strong = etag and not etag.startswith("W/")
+        if strong:
+            compressed = _cache.get_or_compress(etag, response.content, encoding, level)
+        else:
+            compressed = compress(response.content, encoding, level)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        if strong:
+            response["ETag"] = f"W/{etag}"  # el cuerpo ya no es byte a byte el del ETag
+        return response
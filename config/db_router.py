@@ -0,0 +1,170 @@
+# config/db_router.py
+"""
+Lecturas en la réplica (alias "replica", DATABASE_REPLICA_URL).
+
+- @read_replica: marca vistas de solo lectura; solo sus GET/HEAD/OPTIONS leen
+  de la réplica. El resto (y todo lo que corre fuera de una request: comandos,
+  hilos de checkout) lee y escribe en el primario.
+- ReplicaMiddleware: abre el estado de la request (contextvar); sin réplica
+  configurada se desactiva (MiddlewareNotUsed). Las respuestas en streaming
+  (exportaciones) iteran dentro del mismo contexto.
+- ReplicaRouter: una lectura va al primario si hay transaction.atomic abierto
+  en el primario, si la request ya escribió (INSERT/UPDATE/DELETE vistos por
+  un execute_wrapper del primario), si el modelo está en PRIMARY_ONLY o no es
+  un modelo de una app (la tabla de DatabaseCache: la caché no puede leer una
+  invalidación atrasada) o si el usuario está fijado (read-your-writes).
+- Leer lo propio: tras una request que escribe (POST/PATCH/...) o un login
+  (pin_primary) el usuario queda fijado al primario REPLICA_PIN_SECONDS (debe
+  superar el lag normal) en el alias REPLICA_CACHE_ALIAS, que con varios
+  workers tiene que ser compartido: si es local y WEB_CONCURRENCY>1 el
+  middleware no se activa (todo lee del primario) y `check` falla.
+- `manage.py check_replica` simula lag con dos BD separadas.
+"""
+import contextvars
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from config.caches import is_shared, web_workers
+
+PRIMARY = DEFAULT_DB_ALIAS
+REPLICA = "replica"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+_WRITES = ("INSERT", "UPDATE", "DELETE")
+# tokens recién emitidos: la autenticación no puede esperar a que se repliquen
+PRIMARY_ONLY = {"accounts.SessionToken"}
+
+_state = contextvars.ContextVar("replica_state", default=None)
+
+
+def read_replica(view):
+    """Marca la vista (clase APIView o función) como apta para leer de la réplica."""
+    view.read_replica = True
+    return view
+
+
+def replica_enabled() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def pin_reaches_all_workers() -> bool:
+    """El pin de read-your-writes lo ven todos los workers (alias compartido o uno solo)."""
+    return is_shared(settings.REPLICA_CACHE_ALIAS) or web_workers() <= 1
+
+
+def _pin_key(user_id) -> str:
+    return f"replica:pin:{user_id}"
+
+
+def pin_primary(user_id):
+    """Fija al usuario al primario durante REPLICA_PIN_SECONDS (acaba de escribir)."""
+    if replica_enabled() and user_id is not None:
+        caches[settings.REPLICA_CACHE_ALIAS].set(_pin_key(user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    # sin estado de request el router manda todo al primario: con CACHE_URL=db:// la lectura
+    # del pin no vuelve a pasar por pinned() ni lee de la réplica atrasada
+    token = _state.set(None)
+    try:
+        return caches[settings.REPLICA_CACHE_ALIAS].get(_pin_key(user_id)) is not None
+    finally:
+        _state.reset(token)
+
+
+@dataclass
+class _RequestState:
+    request: object
+    replica: bool = False  # la vista está marcada y el método es seguro
+    wrote: bool = False
+    _pinned: Optional[tuple] = None  # (user_id, fijado) de la última consulta
+
+    def user_id(self):
+        # DRF autentica en initial(), antes de cualquier lectura de la vista, y deja el
+        # usuario en el HttpRequest; la lectura del token en sí va por PRIMARY_ONLY
+        user = getattr(self.request, "user", None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def pinned(self) -> bool:
+        user_id = self.user_id()
+        if user_id is None:
+            return False
+        if self._pinned is None or self._pinned[0] != user_id:
+            self._pinned = (user_id, is_pinned(user_id))
+        return self._pinned[1]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.wrote:
+            return PRIMARY
+        # CacheEntry de DatabaseCache tiene un _meta mínimo, sin label
+        label = getattr(model._meta, "label", None)
+        if label is None or label in PRIMARY_ONLY:
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block or state.pinned():
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY  # también para instancias leídas de la réplica
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # primario y réplica tienen los mismos datos
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+
+def _in_context(ctx, chunks):
+    it = iter(chunks)
+    while True:
+        try:
+            chunk = ctx.run(next, it)
+        except StopIteration:
+            return
+        yield chunk
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        if not replica_enabled():
+            raise MiddlewareNotUsed
+        if not pin_reaches_all_workers():
+            # otro worker no vería el pin y leería de la réplica lo que el usuario acaba de escribir
+            raise MiddlewareNotUsed("REPLICA_CACHE_ALIAS local con varios workers: lecturas al primario")
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState(request)
+
+        def track_writes(execute, sql, params, many, context):
+            # no alcanza con db_for_write: Django también lo consulta al asignar FKs
+            if not state.wrote and sql.lstrip()[:6].upper() in _WRITES:
+                state.wrote = True  # lo que lea después esta request debe ver la escritura
+            return execute(sql, params, many, context)
+
+        token = _state.set(state)
+        try:
+            with connections[PRIMARY].execute_wrapper(track_writes):
+                response = self.get_response(request)
+            if response.streaming and state.replica:
+                # el cuerpo se genera después de salir del middleware
+                response.streaming_content = _in_context(contextvars.copy_context(), response.streaming_content)
+        finally:
+            _state.reset(token)
+        if state.wrote and request.method not in SAFE_METHODS:
+            pin_primary(state.user_id())
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        view = getattr(view_func, "view_class", view_func)
+        if state is not None and request.method in SAFE_METHODS and getattr(view, "read_replica", False):
+            state.replica = True
+        return None
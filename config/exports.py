@@ -0,0 +1,100 @@
+# config/exports.py
+"""
+Exportaciones en streaming (CSV / NDJSON) con memoria constante.
+
+Cada app define su export como (encabezados, queryset.values_list(...)); aquí
+se recorre con .iterator(chunk_size=EXPORTS_CHUNK_SIZE) —cursor del lado del
+servidor en Postgres— y se emite línea por línea, sin materializar el
+queryset ni instancias de modelos. Lo usan las vistas (StreamingHttpResponse)
+y el comando `manage.py export_data`.
+"""
+import csv
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+@dataclass
+class Export:
+    name: str
+    headers: list
+    rows: object  # QuerySet de values_list en el orden de `headers`
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)  # Decimal, UUID
+
+
+def iter_rows(export: Export):
+    return export.rows.iterator(chunk_size=settings.EXPORTS_CHUNK_SIZE)
+
+
+def iter_csv(export: Export):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export.headers)
+    for row in iter_rows(export):
+        yield writer.writerow([_plain(v) for v in row])
+
+
+def iter_ndjson(export: Export):
+    for row in iter_rows(export):
+        yield json.dumps(dict(zip(export.headers, map(_plain, row))), ensure_ascii=False) + "\n"
+
+
+def iter_export(export: Export, fmt: str):
+    return iter_csv(export) if fmt == "csv" else iter_ndjson(export)
+
+
+def streaming_export(export: Export, fmt: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_export(export, fmt), content_type=FORMATS[fmt])
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    response["Content-Disposition"] = f'attachment; filename="{export.name}-{stamp}.{fmt}"'
+    return response
+
+
+def parse_range(date_from, date_to):
+    """'YYYY-MM-DD' (ambos opcionales, inclusivos) -> (inicio, fin) aware. ValueError si no son válidos."""
+    bounds = []
+    for value, at in ((date_from, time.min), (date_to, time.max)):
+        if not value:
+            bounds.append(None)
+            continue
+        d = parse_date(value)
+        if d is None:
+            raise ValueError(value)
+        bounds.append(timezone.make_aware(datetime.combine(d, at)))
+    return tuple(bounds)
+
+
+def parse_export_params(params) -> dict:
+    """
+    ?output=csv|ndjson&match=<uuid>&from=YYYY-MM-DD&to=YYYY-MM-DD -> dict. ValueError si algo es inválido.
+    (no `format`: DRF lo reserva para negociar el renderer y responde 404)
+    """
+    fmt = params.get("output", "csv")
+    if fmt not in FORMATS:
+        raise ValueError(fmt)
+    start, end = parse_range(params.get("from"), params.get("to"))
+    match = params.get("match") or None
+    if match is not None:
+        match = str(uuid.UUID(match))
+    return {"format": fmt, "match_identifier": match, "start": start, "end": end}
@@ -0,0 +1,309 @@
+# config/metrics.py
+"""
+Métricas por endpoint (nombre de URL resuelto): latencia, cantidad y tiempo de
+queries SQL y bytes de respuesta, expuestas en formato texto de Prometheus.
+
+- MetricsMiddleware: mide cada request y cuenta las queries con
+  connection.execute_wrapper (todas las conexiones/alias).
+- Registro en memoria por proceso; si METRICS_DIR está definido, un hilo de
+  cada worker vuelca su snapshot a METRICS_DIR/<pid>.json cada
+  METRICS_FLUSH_INTERVAL segundos (escritura atómica, aunque no haya tráfico)
+  y /internal/metrics suma todos los archivos: así el scrape ve el total de
+  los workers de gunicorn sin importar cuál atiende. Sin METRICS_DIR solo se
+  ve el proceso que responde.
+- Workers muertos: el archivo se borra al salir (atexit) y, si el worker
+  murió sin salir limpio, collect() descarta (y borra) los archivos cuyo pid
+  ya no existe o que no se actualizan hace _STALE_FLUSHES intervalos. Sus
+  contadores dejan de sumarse (Prometheus lo ve como un reinicio) y sus
+  gauges (db_pool_*) no quedan congelados en el total.
+- Pools de conexiones (DATABASE_POOL): el snapshot de cada worker incluye
+  ConnectionPool.get_stats() por alias, así que db_pool_* es el total de los
+  workers (p.ej. db_pool_connections = conexiones abiertas contra Postgres).
+- metrics_view: con METRICS_TOKEN definido exige el Bearer (detrás del proxy
+  de Railway REMOTE_ADDR es el del proxy, no el del cliente); sin token,
+  solo IPs de METRICS_ALLOWED_IPS (desarrollo local).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from config.query_budget import query_budget
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# posiciones dentro de cada serie
+_COUNT, _LATENCY_SUM, _QUERIES_SUM, _SQL_SUM, _BYTES_SUM = range(5)
+_LAT_HIST = 5
+_Q_HIST = _LAT_HIST + len(LATENCY_BUCKETS) + 1
+
+# claves de psycopg_pool.ConnectionPool.get_stats() (las que valen 0 no vienen)
+POOL_STATS = (
+    "pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting",
+    "requests_num", "requests_queued", "requests_wait_ms", "requests_errors",
+    "connections_num", "connections_errors", "connections_lost",
+)
+_POOL_KEY = "db_pool"  # serie "db_pool|<alias>" en los snapshots
+# un archivo que no se reescribió en estos intervalos es de un worker muerto o colgado
+_STALE_FLUSHES = 3
+
+
+def _new_series():
+    return [0, 0.0, 0, 0.0, 0] + [0] * (len(LATENCY_BUCKETS) + 1) + [0] * (len(QUERY_BUCKETS) + 1)
+
+
+def pool_stats() -> dict:
+    """{alias: valores de POOL_STATS} de los pools de este proceso (solo alias con OPTIONS["pool"])."""
+    stats = {}
+    for alias in connections:
+        conn = connections[alias]
+        if not conn.settings_dict["OPTIONS"].get("pool"):
+            continue
+        values = conn.pool.get_stats()
+        stats[alias] = [values.get(name, 0) for name in POOL_STATS]
+    return stats
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, de otro usuario
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def observe(self, key, latency, queries, sql_time, size):
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = _new_series()
+            s[_COUNT] += 1
+            s[_LATENCY_SUM] += latency
+            s[_QUERIES_SUM] += queries
+            s[_SQL_SUM] += sql_time
+            s[_BYTES_SUM] += size
+            s[_LAT_HIST + bisect_left(LATENCY_BUCKETS, latency)] += 1
+            s[_Q_HIST + bisect_left(QUERY_BUCKETS, queries)] += 1
+        if settings.METRICS_DIR and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self):
+        # por pid: con gunicorn --preload el hilo del master no sobrevive al fork
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+        atexit.register(_remove, self._path())
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                pass  # disco lleno / directorio borrado: se reintenta en el próximo intervalo
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snap = {"|".join(k): list(v) for k, v in self._series.items()}
+        for alias, values in pool_stats().items():
+            snap[f"{_POOL_KEY}|{alias}"] = values
+        return snap
+
+    def _path(self):
+        return os.path.join(settings.METRICS_DIR, f"{os.getpid()}.json")
+
+    def flush(self):
+        """Vuelca el snapshot de este worker a METRICS_DIR/<pid>.json (write + rename)."""
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = self._path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self) -> dict:
+        """Series sumadas de todos los workers (archivos) + las vivas de este proceso."""
+        merged = {}
+        own = f"{os.getpid()}.json"
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR and os.path.isdir(settings.METRICS_DIR):
+            stale_before = time.time() - _STALE_FLUSHES * settings.METRICS_FLUSH_INTERVAL
+            for name in os.listdir(settings.METRICS_DIR):
+                if not name.endswith(".json") or name == own:
+                    continue
+                path = os.path.join(settings.METRICS_DIR, name)
+                try:
+                    pid = int(name[:-len(".json")])
+                    if not _pid_alive(pid) or os.path.getmtime(path) < stale_before:
+                        _remove(path)  # worker muerto: sus series ya no cuentan
+                        continue
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # archivo a medio escribir por otro worker (o nombre ajeno)
+        for snap in snapshots:
+            for key, values in snap.items():
+                current = merged.get(key)
+                if current is None:
+                    merged[key] = list(values)
+                else:
+                    for i, v in enumerate(values):
+                        current[i] += v
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.METRICS_ENABLED
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        db = [0, 0.0]  # queries, segundos en SQL
+
+        def count_queries(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db[0] += 1
+                db[1] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(count_queries))
+            response = self.get_response(request)
+        latency = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        if response.streaming:
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        key = (view, request.method, f"{response.status_code // 100}xx")
+        registry.observe(key, latency, db[0], db[1], size)
+        return response
+
+
+def _labels(key) -> str:
+    view, method, status = key.split("|")
+    return f'view="{view}",method="{method}",status="{status}"'
+
+
+def _histogram(lines, name, help_text, series, offset, buckets, sum_idx):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, s in sorted(series.items()):
+        labels = _labels(key)
+        cumulative = 0
+        for i, bound in enumerate(buckets):
+            cumulative += s[offset + i]
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {s[_COUNT]}')
+        lines.append(f"{name}_sum{{{labels}}} {s[sum_idx]}")
+        lines.append(f"{name}_count{{{labels}}} {s[_COUNT]}")
+
+
+def _counter(lines, name, help_text, series, idx):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for key, s in sorted(series.items()):
+        lines.append(f"{name}{{{_labels(key)}}} {s[idx]}")
+
+
+_POOL_GAUGES = (
+    ("db_pool_min_size", "Tamaño mínimo configurado.", "pool_min"),
+    ("db_pool_max_size", "Tope de conexiones configurado.", "pool_max"),
+    ("db_pool_connections", "Conexiones abiertas (prestadas + libres).", "pool_size"),
+    ("db_pool_connections_available", "Conexiones libres en el pool.", "pool_available"),
+    ("db_pool_requests_waiting", "Hilos esperando una conexión.", "requests_waiting"),
+)
+_POOL_COUNTERS = (
+    ("db_pool_requests_total", "Conexiones pedidas al pool.", "requests_num"),
+    ("db_pool_requests_queued_total", "Pedidos que tuvieron que esperar.", "requests_queued"),
+    ("db_pool_timeouts_total", "Pedidos que vencieron DATABASE_POOL_TIMEOUT.", "requests_errors"),
+    ("db_pool_connections_opened_total", "Conexiones abiertas contra la BD.", "connections_num"),
+    ("db_pool_connection_errors_total", "Errores al abrir conexiones.", "connections_errors"),
+    ("db_pool_connections_lost_total", "Conexiones descartadas por el health check.", "connections_lost"),
+)
+
+
+def _pool_metrics(lines, pools):
+    def value(values, stat):
+        return values[POOL_STATS.index(stat)]
+
+    for kind, metrics in (("gauge", _POOL_GAUGES), ("counter", _POOL_COUNTERS)):
+        for name, help_text, stat in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for alias, values in sorted(pools.items()):
+                lines.append(f'{name}{{alias="{alias}"}} {value(values, stat)}')
+    lines += ["# HELP db_pool_wait_seconds_total Tiempo esperando una conexión.",
+              "# TYPE db_pool_wait_seconds_total counter"]
+    for alias, values in sorted(pools.items()):
+        lines.append(f'db_pool_wait_seconds_total{{alias="{alias}"}} {value(values, "requests_wait_ms") / 1000}')
+
+
+def render_prometheus(series) -> str:
+    prefix = f"{_POOL_KEY}|"
+    pools = {k[len(prefix):]: v for k, v in series.items() if k.startswith(prefix)}
+    series = {k: v for k, v in series.items() if not k.startswith(prefix)}
+    lines = []
+    _histogram(lines, "http_request_duration_seconds", "Latencia por endpoint.",
+               series, _LAT_HIST, LATENCY_BUCKETS, _LATENCY_SUM)
+    _histogram(lines, "http_request_db_queries", "Queries SQL por request.",
+               series, _Q_HIST, QUERY_BUCKETS, _QUERIES_SUM)
+    _counter(lines, "http_request_db_seconds_total", "Tiempo total en SQL.", series, _SQL_SUM)
+    _counter(lines, "http_response_bytes_total", "Bytes de respuesta (sin streaming sin Content-Length).",
+             series, _BYTES_SUM)
+    if pools:
+        _pool_metrics(lines, pools)
+    return "\n".join(lines) + "\n"
+
+
+def _client_ip(request):
+    return request.META.get("REMOTE_ADDR", "")
+
+
+@query_budget(get=0)
+def metrics_view(request):
+    """GET /internal/metrics (texto Prometheus)."""
+    token = settings.METRICS_TOKEN
+    if token:
+        # detrás de un proxy REMOTE_ADDR no identifica al cliente: con token, solo el token
+        authorized = request.headers.get("Authorization") == f"Bearer {token}"
+    else:
+        authorized = _client_ip(request) in settings.METRICS_ALLOWED_IPS
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(registry.collect()),
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
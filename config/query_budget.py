@@ -0,0 +1,180 @@
+# config/query_budget.py
+"""
+Presupuesto de queries SQL por vista (guardia contra N+1).
+
+- @query_budget(get=4, post=12): máximo de queries por request y método. Un
+  dict fija el máximo por forma del dataset (claves de DATASETS en
+  config/benchmarks.py), p.ej. get={"small": 5, "large": 8}; un int vale para
+  todas (lo normal: el número de queries no debe crecer con los datos).
+- check_budgets(): corre los escenarios del benchmark en cada forma y compara
+  el máximo observado con el presupuesto; si se pasa, reporta el SQL agrupado
+  por línea de código que lo emitió. También falla si una URL de
+  config/urls.py no tiene presupuesto o escenario.
+- config/test_runner.py (TEST_RUNNER): `manage.py test` lo ejecuta después
+  de los tests, sobre la BD de prueba (--no-query-budgets para omitirlo).
+- QueryBudgetMiddleware: con QUERY_BUDGETS_LOG=1 loguea en producción las
+  requests que superan el presupuesto de su vista (el máximo de sus formas).
+"""
+import logging
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger("query_budget")
+
+DEFAULT_SHAPES = ("small", "medium")
+_SKIP_FILES = (__file__, str(Path(__file__).with_name("benchmarks.py")))
+
+
+def query_budget(**methods):
+    """Declara el presupuesto de la vista (clase APIView o función) por método HTTP."""
+    budgets = {m.upper(): v for m, v in methods.items()}
+
+    def decorate(view):
+        view.query_budget = budgets
+        return view
+
+    return decorate
+
+
+def budget_limit(budget, shape=None):
+    """Máximo para `shape`; sin shape (o si el dict no la define) el mayor de todos."""
+    if isinstance(budget, dict):
+        return budget[shape] if shape in budget else max(budget.values())
+    return budget
+
+
+@lru_cache(maxsize=None)
+def _budgets_by_name() -> dict:
+    found = {}
+
+    def walk(patterns):
+        for p in patterns:
+            if hasattr(p, "url_patterns"):
+                if getattr(p, "namespace", None) != "admin":
+                    walk(p.url_patterns)
+            elif p.name:
+                found[p.name] = view_budgets(p.callback)
+
+    walk(get_resolver().url_patterns)
+    return found
+
+
+def view_budgets(callback) -> dict:
+    view = getattr(callback, "view_class", callback)  # as_view() guarda la clase
+    return getattr(view, "query_budget", None) or {}
+
+
+class QueryRecorder:
+    """execute_wrapper que guarda cada SQL con la línea del proyecto que lo originó."""
+
+    def __init__(self):
+        self.queries = []
+        self._root = str(settings.BASE_DIR)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, self._call_site()))
+        return execute(sql, params, many, context)
+
+    def _call_site(self) -> str:
+        for frame in reversed(traceback.extract_stack()[:-2]):
+            name = frame.filename
+            if name.startswith(self._root) and "site-packages" not in name and name not in _SKIP_FILES:
+                return f"{Path(name).relative_to(self._root)}:{frame.lineno} ({frame.name})"
+        return "<fuera del proyecto>"
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def grouped(self) -> list:
+        """[(call_site, cantidad, ejemplo de SQL)] de mayor a menor."""
+        sites = defaultdict(list)
+        for sql, site in self.queries:
+            sites[site].append(sql)
+        return sorted(((site, len(sqls), sqls[0]) for site, sqls in sites.items()), key=lambda r: -r[1])
+
+
+def check_budgets(shapes=DEFAULT_SHAPES, iterations=2, seed=42, log=None) -> list:
+    """Devuelve las violaciones (texto). OJO: vacía la BD actual (úsese en la BD de prueba)."""
+    # import diferido: django.test y el benchmark no se cargan en los workers web
+    from django.test import Client
+
+    from config.benchmarks import SCENARIOS, bench_environment, perform, prepare_dataset, url_names
+
+    log = log or (lambda msg: None)
+    budgets = _budgets_by_name()
+    violations = []
+
+    for name in sorted(url_names()):
+        if not budgets.get(name):
+            violations.append(f"{name}: la vista no declara @query_budget")
+    for name in sorted(url_names() - {s.url_name for s in SCENARIOS}):
+        violations.append(f"{name}: sin escenario en config/benchmarks.py")
+
+    with bench_environment(seed) as fake_mp:
+        for shape in shapes:
+            ctx = prepare_dataset(shape, seed, fake_mp)
+            client = Client()
+            for scenario in SCENARIOS:
+                budget = budgets.get(scenario.url_name, {}).get(scenario.method.upper())
+                if budget is None:
+                    if budgets.get(scenario.url_name):
+                        violations.append(f"{scenario.label}: sin presupuesto para {scenario.method.upper()}")
+                    continue
+                limit = budget_limit(budget, shape)
+                worst = None
+                for i in range(iterations):
+                    call = scenario.build(ctx, i)
+                    with QueryRecorder() as recorder:
+                        perform(client, scenario, call)
+                    if worst is None or len(recorder.queries) > len(worst.queries):
+                        worst = recorder
+                log(f"[{shape}] {scenario.label}: {len(worst.queries)}/{limit} queries")
+                if len(worst.queries) > limit:
+                    lines = [f"{scenario.label} [{shape}]: {len(worst.queries)} queries (presupuesto {limit})"]
+                    for site, count, sql in worst.grouped():
+                        lines.append(f"    {count:>4}x {site}")
+                        lines.append(f"          {sql[:200]}")
+                    violations.append("\n".join(lines))
+    return violations
+
+
+class QueryBudgetMiddleware:
+    """Con QUERY_BUDGETS_LOG=1 cuenta las queries de cada request y loguea las que exceden el presupuesto."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGETS_LOG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(count_queries))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        budget = view_budgets(match.func).get(request.method) if match else None
+        if budget is not None and count[0] > budget_limit(budget):
+            logger.warning("query budget excedido: %s %s (%s) %d queries, presupuesto %d",
+                           request.method, request.path, match.url_name, count[0], budget_limit(budget))
+        return response
@@ -0,0 +1,357 @@
+# config/seeding.py
+"""
+Generador determinista de datos de liga (mismo `seed` => mismos datos).
+
+Crea catálogos, usuarios (con membresía de equipo vigente), sedes, partidos
+(jugados y próximos), inscripciones con su fila de PlayerMatchStat —como hace
+join_match—, resultados de los partidos jugados, pagos (aprobados de las
+inscripciones + pendientes de checkouts abiertos), promos y sus contadores.
+
+Pensado para volumen (100k usuarios, 1M inscripciones):
+- un solo hash de contraseña para todos (make_password una vez, no por usuario);
+- tablas grandes (inscripciones, estadísticas, pagos, contadores) con COPY en
+  Postgres y bulk_create en lotes en el resto, desde generadores (memoria acotada);
+- respeta uniq_user_doc_type_number (DNI libres aunque la BD ya tenga datos),
+  uniq_user_active_membership (una vigente por usuario) y
+  uniq_pending_payment_per_user_match (un pendiente por (user, match), nunca
+  de alguien ya inscrito).
+Las señales no corren, así que al final se recalculan los derivados
+(resúmenes, leaderboards) y se invalidan las cachés afectadas.
+
+Lo usan el benchmark de la API (`manage.py bench_api`) y `manage.py seed_league`.
+"""
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import City, District, DocumentType, DominantFoot, FootballPosition, TermsAndConditions
+from matches.models import Enrollment, Location, Match, MatchStatus, Team, TeamMembership
+from payments.models import Payment, PaymentStatus
+from promos.models import Banner, PromoCounter, PromoKind, Sponsor
+from promos.services.payload import invalidate_promos
+from stats.models import PlayerMatchStat
+from stats.services.leaderboards import refresh_leaderboards
+from stats.services.summary import rebuild_summaries
+from stats.services.teams import invalidate_team_stats
+
+User = get_user_model()
+
+# contraseña de todos los usuarios generados (el hash se calcula una sola vez)
+SEED_PASSWORD = "liga-seed-1234"
+# los DNI generados empiezan aquí (8 dígitos, como exige validate_document)
+DOCUMENT_BASE = 10_000_000
+
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class LeagueSpec:
+    users: int = 200
+    locations: int = 10
+    matches: int = 40
+    enrollments: int = 400  # total; también filas de PlayerMatchStat (una por inscripción)
+    payments: int = 200  # aprobados, tomados de las inscripciones en partidos con precio
+    pending_payments: int = 20  # checkouts abiertos en partidos próximos (sin inscripción)
+    teams: int = 8
+    cities: int = 3
+    districts_per_city: int = 4
+    promos: int = 5  # banners y sponsors
+    promo_days: int = 2  # días de contadores por hora de cada promo
+    played: float = 0.6  # fracción de partidos ya jugados (con resultados)
+
+
+@dataclass
+class League:
+    spec: LeagueSpec
+    seed: int
+    document_type: DocumentType
+    terms: TermsAndConditions
+    user_ids: list = field(default_factory=list)
+    team_ids: list = field(default_factory=list)
+    city_ids: list = field(default_factory=list)
+    district_ids: list = field(default_factory=list)
+    position_ids: list = field(default_factory=list)
+    foot_ids: list = field(default_factory=list)
+    played_ids: list = field(default_factory=list)
+    upcoming_ids: list = field(default_factory=list)
+    banner_ids: list = field(default_factory=list)
+    sponsor_ids: list = field(default_factory=list)
+    rosters: dict = field(default_factory=dict)  # match_id -> [user_id, ...]
+    counts: dict = field(default_factory=dict)  # filas insertadas por modelo
+    # uuids (match_identifier, public_id): derivados del seed y del primer DNI libre, para que
+    # volver a sembrar con el mismo seed sobre una BD con datos no choque con los anteriores
+    uuid_rng: random.Random = None
+
+
+def _uuid(rng) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def bulk_insert(model, fields, rows, batch_size=BATCH_SIZE) -> int:
+    """
+    Inserta tuplas en el orden de `fields` (attnames: "match_id", ...). Con
+    Postgres usa COPY (sin pasar por el ORM); en el resto, bulk_create por
+    lotes. `rows` puede ser un generador: nunca se materializa entero.
+    """
+    if connection.vendor == "postgresql":
+        meta, qn = model._meta, connection.ops.quote_name
+        columns = ", ".join(qn(meta.get_field(f).column) for f in fields)
+        count = 0
+        with connection.cursor() as cursor:
+            with cursor.copy(f"COPY {qn(meta.db_table)} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    count += 1
+        return count
+
+    count = 0
+    for chunk in _chunks(rows, batch_size):
+        model.objects.bulk_create([model(**dict(zip(fields, row))) for row in chunk], batch_size=batch_size)
+        count += len(chunk)
+    return count
+
+
+def _catalogs(league: League):
+    spec = league.spec
+    league.document_type, _ = DocumentType.objects.get_or_create(code="DNI", defaults={"name": "DNI"})
+    league.terms = (TermsAndConditions.objects.filter(section="register", is_active=True).first()
+                    or TermsAndConditions.objects.create(version="seed", section="register", body="TyC"))
+
+    for code, name in (("GK", "Arquero"), ("DF", "Defensa"), ("MF", "Mediocampista"), ("FW", "Delantero")):
+        league.position_ids.append(FootballPosition.objects.get_or_create(code=code, defaults={"name": name})[0].pk)
+    for code, name in (("R", "Diestro"), ("L", "Zurdo"), ("B", "Ambidiestro")):
+        league.foot_ids.append(DominantFoot.objects.get_or_create(code=code, defaults={"name": name})[0].pk)
+
+    for c in range(spec.cities):
+        city, _ = City.objects.get_or_create(name=f"Ciudad {c + 1}")
+        league.city_ids.append(city.pk)
+        for d in range(spec.districts_per_city):
+            district, _ = District.objects.get_or_create(city=city, name=f"Distrito {c + 1}-{d + 1}")
+            league.district_ids.append(district.pk)
+
+    for t in range(spec.teams):
+        league.team_ids.append(Team.objects.get_or_create(name=f"Equipo {t + 1}")[0].pk)
+
+
+def _free_documents(document_type, n) -> list:
+    """Los primeros `n` DNI libres desde DOCUMENT_BASE (una consulta; en BD vacía son consecutivos)."""
+    taken = set(
+        User.objects.filter(document_type=document_type, document_number__gte=str(DOCUMENT_BASE),
+                            document_number__lte="99999999")
+        .values_list("document_number", flat=True)
+    )
+    docs, candidate = [], DOCUMENT_BASE
+    while len(docs) < n:
+        if str(candidate) not in taken:
+            docs.append(str(candidate))
+        candidate += 1
+    return docs
+
+
+def _users(league: League, rng, now):
+    spec = league.spec
+    password = make_password(SEED_PASSWORD)
+    districts = dict(District.objects.filter(pk__in=league.district_ids).values_list("pk", "city_id"))
+    users = []
+    for doc in _free_documents(league.document_type, spec.users):
+        district_id = rng.choice(league.district_ids)
+        users.append(User(
+            username=f"seed-{doc}", email=f"seed-{doc}@liga.local", password=password,
+            first_name=f"Jugador{doc[-5:]}", last_name="Seed",
+            document_type=league.document_type, document_number=doc,
+            date_of_birth=(now - timedelta(days=rng.randint(18 * 365, 45 * 365))).date(),
+            city_id=districts[district_id], district_id=district_id,
+            position_id=rng.choice(league.position_ids), dominant_foot_id=rng.choice(league.foot_ids),
+            team_id=rng.choice(league.team_ids) if league.team_ids and rng.random() < 0.7 else None,
+        ))
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    league.user_ids = [u.pk for u in users]
+    league.uuid_rng = random.Random(f"{league.seed}:{users[0].document_number if users else ''}")
+    league.counts["users"] = len(users)
+
+    # una membresía vigente por usuario con equipo (uniq_user_active_membership); son usuarios nuevos
+    since = (now - timedelta(days=800)).date()
+    league.counts["memberships"] = bulk_insert(
+        TeamMembership, ("user_id", "team_id", "date_from", "date_to", "created_at", "updated_at"),
+        ((u.pk, u.team_id, since, None, now, now) for u in users if u.team_id),
+    )
+
+
+def _matches(league: League, rng, now):
+    spec = league.spec
+    # pocas filas: get_or_create para reusar las sedes de una siembra anterior (unique_together)
+    locations = [
+        Location.objects.get_or_create(district_id=rng.choice(league.district_ids), field_name=f"Cancha {i + 1}",
+                                       address=f"Av. Seed {100 + i}")[0]
+        for i in range(spec.locations)
+    ]
+    n_played = int(spec.matches * spec.played)
+    matches = []
+    for i in range(spec.matches):
+        played = i < n_played
+        offset = timedelta(days=rng.randint(1, 700), hours=rng.randint(0, 23))
+        matches.append(Match(
+            match_identifier=_uuid(league.uuid_rng), location=rng.choice(locations), title=f"Partido {i + 1}",
+            start_at=(now - offset) if played else (now + timedelta(days=rng.randint(1, 60))),
+            capacity=rng.choice((10, 12, 14, 22)), price_amount=Decimal(rng.choice((0, 10, 15, 20))),
+            status=MatchStatus.FINISHED if played else MatchStatus.PUBLISHED,
+        ))
+    Match.objects.bulk_create(matches, batch_size=BATCH_SIZE)
+    league.played_ids = [m.pk for m in matches[:n_played]]
+    league.upcoming_ids = [m.pk for m in matches[n_played:]]
+    league.counts["matches"] = len(matches)
+    return matches
+
+
+def _enrollments(league: League, rng, matches, now):
+    """Reparte `enrollments` entre los partidos sin pasar su capacidad; (match, user) nunca se repite."""
+    spec = league.spec
+    remaining = spec.enrollments
+    for i, m in enumerate(matches):
+        if remaining <= 0:
+            break
+        share = -(-remaining // (len(matches) - i))  # ceil
+        k = min(m.capacity, spec.users, share)
+        league.rosters[m.pk] = sorted(league.user_ids[j] for j in rng.sample(range(spec.users), k))
+        remaining -= k
+
+    played = set(league.played_ids)
+    results = {}  # match_id -> (lado ganador, mvp)
+    for m in matches:
+        roster = league.rosters.get(m.pk)
+        if roster and m.pk in played:
+            results[m.pk] = (rng.choice(("A", "B", None)), rng.choice(roster))
+
+    def joined_at(m):
+        return min(now, m.start_at - timedelta(days=1))
+
+    league.counts["enrollments"] = bulk_insert(
+        Enrollment, ("match_id", "user_id", "is_active", "joined_at", "cancelled_at"),
+        ((m.pk, user_id, True, joined_at(m), None) for m in matches for user_id in league.rosters.get(m.pk, ())),
+    )
+
+    def stat_rows():
+        for m in matches:
+            result = results.get(m.pk)
+            for pos, user_id in enumerate(league.rosters.get(m.pk, ())):
+                if result is None:
+                    yield m.pk, user_id, 0, None, False, "", joined_at(m), joined_at(m)
+                    continue
+                winner, mvp = result
+                side = "A" if pos % 2 == 0 else "B"
+                yield (m.pk, user_id, rng.choice((0, 0, 0, 1, 1, 2, 3)),
+                       None if winner is None else side == winner, user_id == mvp, "", joined_at(m), m.end_at)
+
+    league.counts["stats"] = bulk_insert(
+        PlayerMatchStat, ("match_id", "user_id", "goals", "is_winner", "is_mvp", "notes", "created_at", "updated_at"),
+        stat_rows(),
+    )
+
+
+def _payments(league: League, rng, matches, now):
+    """Aprobados de inscripciones pagadas + pendientes de no inscritos (uno por (user, match))."""
+    spec = league.spec
+    fields = ("public_id", "user_id", "match_id", "amount", "currency", "preference_id", "init_point",
+              "sandbox_init_point", "preference_error", "mp_payment_id", "mp_status", "external_reference",
+              "status", "idempotency_key", "created_at", "updated_at")
+
+    def approved():
+        n = 0
+        for m in matches:
+            if not m.price_amount:
+                continue
+            for user_id in league.rosters.get(m.pk, ()):
+                if n >= spec.payments:
+                    return
+                n += 1
+                public_id = _uuid(league.uuid_rng)
+                yield (public_id, user_id, m.pk, m.price_amount, "PEN", "", "", "", "", str(10 ** 9 + n),
+                       "approved", str(public_id), PaymentStatus.APPROVED, "", now, now)
+
+    def pending():
+        upcoming = set(league.upcoming_ids)
+        targets = [m for m in matches if m.price_amount and m.pk in upcoming]
+        seen = set()
+        for _ in range(spec.pending_payments * 10 if targets else 0):
+            if len(seen) >= spec.pending_payments:
+                return
+            m, user_id = rng.choice(targets), rng.choice(league.user_ids)
+            if (user_id, m.pk) in seen or user_id in league.rosters.get(m.pk, ()):
+                continue
+            seen.add((user_id, m.pk))
+            public_id = _uuid(league.uuid_rng)
+            yield (public_id, user_id, m.pk, m.price_amount, "PEN", "", "", "", "", "", "",
+                   str(public_id), PaymentStatus.PENDING, "", now, now)
+
+    league.counts["payments"] = bulk_insert(Payment, fields, approved())
+    league.counts["pending_payments"] = bulk_insert(Payment, fields, pending())
+
+
+def _promos(league: League, now):
+    n = league.spec.promos
+    banners = Banner.objects.bulk_create([
+        Banner(title=f"Banner {i + 1}", image_url=f"https://cdn.liga.local/banners/{i + 1}.png", order=i)
+        for i in range(n)
+    ])
+    sponsors = Sponsor.objects.bulk_create([
+        Sponsor(title=f"Sponsor {i + 1}", image_url=f"https://cdn.liga.local/sponsors/{i + 1}.png", order=i)
+        for i in range(n)
+    ])
+    league.banner_ids = [b.pk for b in banners]
+    league.sponsor_ids = [s.pk for s in sponsors]
+
+    # contadores por hora (ids nuevos: no chocan con uniq_promo_counter_hour)
+    last_hour = now.replace(minute=0, second=0, microsecond=0)
+    hours = [last_hour - timedelta(hours=h) for h in range(league.spec.promo_days * 24)]
+    promos = [(PromoKind.BANNER, pk) for pk in league.banner_ids] + [(PromoKind.SPONSOR, pk) for pk in league.sponsor_ids]
+    league.counts["promo_counters"] = bulk_insert(
+        PromoCounter, ("kind", "promo_id", "hour", "impressions", "clicks"),
+        ((kind, pk, hour, 100 + (pk * 37 + i) % 400, (pk + i) % 25)
+         for kind, pk in promos for i, hour in enumerate(hours)),
+    )
+
+
+def generate_league(spec: LeagueSpec, seed: int = 42, now=None, log=None) -> League:
+    """
+    Genera la liga en la BD por defecto. Conviene envolverlo en transaction.atomic
+    (todo o nada, y en Postgres un solo commit).
+    """
+    log = log or (lambda msg: None)
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    league = League(spec=spec, seed=seed, document_type=None, terms=None)
+
+    def step(name, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        log(f"{name}: {time.perf_counter() - started:.1f}s")
+        return result
+
+    step("catálogos", _catalogs, league)
+    step("usuarios", _users, league, rng, now)
+    matches = step("partidos", _matches, league, rng, now)
+    step("inscripciones y estadísticas", _enrollments, league, rng, matches, now)
+    step("pagos", _payments, league, rng, matches, now)
+    step("promos", _promos, league, now)
+    # bulk_create/COPY no disparan señales: derivados desde cero
+    step("resúmenes", rebuild_summaries)
+    step("leaderboards", refresh_leaderboards, None, True)
+
+    invalidate_team_stats(*league.team_ids)
+    invalidate_promos()
+    return league
@@ -64,6 +64,10 @@ INSTALLED_APPS = [
 # Middleware
 # -----------------------------
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",  # primero: mide la request completa
+    "config.compression.CompressionMiddleware",  # dentro de métricas: cuentan bytes y CPU de comprimir
+    "config.query_budget.QueryBudgetMiddleware",  # solo con QUERY_BUDGETS_LOG=1
+    "config.db_router.ReplicaMiddleware",  # solo con DATABASE_REPLICA_URL
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS antes de CommonMiddleware
@@ -75,6 +79,37 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Métricas por endpoint (config/metrics.py), expuestas en /internal/metrics (Prometheus)
+# - METRICS_DIR: directorio compartido por los workers de gunicorn (vacío = solo el proceso que responde)
+# - acceso: header "Authorization: Bearer <METRICS_TOKEN>"; sin token definido, IP en
+#   METRICS_ALLOWED_IPS (solo sirve sin proxy delante: en Railway definir METRICS_TOKEN)
+METRICS_ENABLED = env_bool("METRICS_ENABLED", "1")
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = env_list("METRICS_ALLOWED_IPS", "127.0.0.1,::1")
+
+# Compresión de respuestas (config/compression.py): gzip o brotli (si está instalado) según
+# Accept-Encoding, solo cuerpos >= MIN_SIZE de los tipos de abajo; niveles medidos con
+# `manage.py bench_compression` (el CSS/JS estático ya lo sirve comprimido whitenoise)
+COMPRESSION_ENABLED = env_bool("COMPRESSION_ENABLED", "1")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVELS = {
+    # board de 300 KB: gzip 6 deja 8% del tamaño con ~2.5 ms de CPU (generarlo lleva ~180 ms);
+    # gzip 9 cuesta 4x más CPU para ganar menos de 1%
+    "application/json": {"gzip": 6, "br": 4},
+    "text/html": {"gzip": 6, "br": 4},  # admin
+    # texto voluminoso y poco repetido por request (/internal/metrics, CSV): nivel más barato
+    "text/plain": {"gzip": 4, "br": 3},
+    "text/csv": {"gzip": 4, "br": 3},
+}
+
+# Presupuesto de queries por vista (@query_budget, config/query_budget.py)
+# - `manage.py test` lo verifica con el runner de abajo (--no-query-budgets para omitir)
+# - QUERY_BUDGETS_LOG=1: loguea (logger "query_budget") las requests que lo exceden
+QUERY_BUDGETS_LOG = env_bool("QUERY_BUDGETS_LOG", "0")
+TEST_RUNNER = "config.test_runner.QueryBudgetTestRunner"
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [{
@@ -99,19 +134,100 @@ USE_X_FORWARDED_HOST = True
 # Producción (Railway): define DATABASE_URL (la referencia ${{Postgres.DATABASE_URL}})
 # Local: por defecto SQLite; si pones DATABASE_URL en tu .env, lo usará
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
+# Réplica de solo lectura opcional (config/db_router.py): la leen las vistas @read_replica
+# Local: dos archivos SQLite (sqlite:///db.sqlite3 y sqlite:///replica.sqlite3) o dos BD Postgres
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "").strip()
+# Pool de conexiones de psycopg (OPTIONS["pool"], solo Postgres; requiere psycopg[pool])
+# Sin pool cada hilo de gunicorn abre y retiene su conexión (CONN_MAX_AGE): con --threads y
+# una ráfaga, conexiones = workers × hilos. Con pool cada worker abre a lo sumo MAX_SIZE por
+# alias; el resto de los hilos espera DATABASE_POOL_TIMEOUT segundos y después la request falla
+# (PoolTimeout) en vez de abrir otra conexión.
+# Tope: workers × MAX_SIZE (× 2 con réplica) + release/comandos < max_connections del plan
+# Cada conexión se verifica al prestarla (CONN_HEALTH_CHECKS) y se recicla tras MAX_LIFETIME;
+# las libres por más de MAX_IDLE se cierran hasta volver a MIN_SIZE.
+# Uso del pool en /internal/metrics (db_pool_*); `manage.py bench_db_pool` lo prueba con ráfagas.
+DATABASE_POOL = env_bool("DATABASE_POOL", "0")
+DATABASE_POOL_MIN_SIZE = int(os.getenv("DATABASE_POOL_MIN_SIZE", "2"))
+DATABASE_POOL_MAX_SIZE = int(os.getenv("DATABASE_POOL_MAX_SIZE", "4"))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+DATABASE_POOL_MAX_IDLE = float(os.getenv("DATABASE_POOL_MAX_IDLE", "300"))
+DATABASE_POOL_MAX_LIFETIME = float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "1800"))
 
-if DATABASE_URL:
-    db_cfg = dj_database_url.parse(
-        DATABASE_URL,
+
+def database_config(url: str) -> dict:
+    cfg = dj_database_url.parse(
+        url,
         conn_max_age=600,
         ssl_require=not DEBUG,
     )
-    db_cfg.setdefault("OPTIONS", {})
-    db_cfg["OPTIONS"]["options"] = "-c timezone=UTC"
-    DATABASES = {"default": db_cfg}
+    if cfg["ENGINE"] == "django.db.backends.postgresql":
+        cfg.setdefault("OPTIONS", {})
+        cfg["OPTIONS"]["options"] = "-c timezone=UTC"
+        if DATABASE_POOL:
+            # el pool reemplaza a las conexiones persistentes (Django no admite ambas)
+            cfg["CONN_MAX_AGE"] = 0
+            cfg["CONN_HEALTH_CHECKS"] = True  # -> ConnectionPool.check_connection al prestar
+            cfg["OPTIONS"]["pool"] = {
+                "min_size": DATABASE_POOL_MIN_SIZE,
+                "max_size": DATABASE_POOL_MAX_SIZE,
+                "timeout": DATABASE_POOL_TIMEOUT,
+                "max_idle": DATABASE_POOL_MAX_IDLE,
+                "max_lifetime": DATABASE_POOL_MAX_LIFETIME,
+            }
+    return cfg
+
+
+if DATABASE_URL:
+    DATABASES = {"default": database_config(DATABASE_URL)}
+    if DATABASE_REPLICA_URL:
+        DATABASES["replica"] = database_config(DATABASE_REPLICA_URL)
+        # en tests la réplica es la misma BD de prueba (el lag se simula con `manage.py check_replica`)
+        DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+# Tras escribir, el usuario lee del primario esta cantidad de segundos (debe superar el lag).
+# El alias de CACHES debe ser compartido entre workers (Redis/BD); si es local y
+# WEB_CONCURRENCY>1 no se lee de la réplica y `check` falla (config.E001)
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", "5"))
+REPLICA_CACHE_ALIAS = os.getenv("REPLICA_CACHE_ALIAS", "default")
+
+# -----------------------------
+# Caché
+# -----------------------------
+# CACHE_URL: redis://host:6379/0 (RedisCache, paquete redis) o db://tabla (DatabaseCache; la
+# tabla la crea `manage.py release`). Vacío: LocMemCache, una por proceso, válido en local o con
+# un solo worker; con WEB_CONCURRENCY > 1 las invalidaciones no cruzan workers (config/caches.py)
+CACHE_URL = os.getenv("CACHE_URL", "").strip()
+
+
+def cache_config(url: str) -> dict:
+    if not url:
+        return {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    if url.startswith(("redis://", "rediss://")):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": url}
+    if url.startswith("db://"):
+        return {"BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": url[len("db://"):] or "django_cache"}
+    raise ValueError(f"CACHE_URL no soportada: {url!r} (redis://... o db://tabla)")
+
+
+CACHES = {"default": cache_config(CACHE_URL)}
 
 MERCADOPAGO_ACCESS_TOKEN = os.getenv("MP_ACCESS_TOKEN")
 MERCADOPAGO_WEBHOOK_SECRET = os.getenv("MP_WEBHOOK_SECRET", default=None)
+# MP_BACKEND=fake usa el MercadoPago falso en proceso (payments/services/mp_fake.py); solo local/bench
+MERCADOPAGO_BACKEND = os.getenv("MP_BACKEND", "real")
+# Cliente HTTP de MP (payments/services/mp_client.py)
+# MP_API_BASE_URL permite apuntar a un stand-in local para pruebas de carga
+MERCADOPAGO_API_BASE_URL = os.getenv("MP_API_BASE_URL", "https://api.mercadopago.com")
+MERCADOPAGO_CONNECT_TIMEOUT = float(os.getenv("MP_CONNECT_TIMEOUT", "3"))
+MERCADOPAGO_READ_TIMEOUT = float(os.getenv("MP_READ_TIMEOUT", "10"))
+MERCADOPAGO_MAX_RETRIES = int(os.getenv("MP_MAX_RETRIES", "2"))
+MERCADOPAGO_RETRY_BACKOFF = float(os.getenv("MP_RETRY_BACKOFF", "0.2"))
+MERCADOPAGO_POOL_SIZE = int(os.getenv("MP_POOL_SIZE", "10"))
+MERCADOPAGO_POOLING = env_bool("MP_POOLING", "1")
+MERCADOPAGO_BREAKER_THRESHOLD = int(os.getenv("MP_BREAKER_THRESHOLD", "5"))
+MERCADOPAGO_BREAKER_COOLDOWN = float(os.getenv("MP_BREAKER_COOLDOWN", "30"))
 # FRONT_SUCCESS_URL = os.getenv("FRONT_SUCCESS_URL", default="")
 # FRONT_FAILURE_URL = os.getenv("FRONT_FAILURE_URL", default="")
 # FRONT_PENDING_URL = os.getenv("FRONT_PENDING_URL", default="")
@@ -119,6 +235,12 @@ FRONT_BASE_URL = os.getenv("FRONT_BASE_URL", default=None)
 FRONT_MATCH_ROUTE = os.getenv("FRONT_MATCH_ROUTE", default=None)
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL")
 
+# Checkout asíncrono: el POST responde sin esperar a MP y la Preference se crea en un pool de hilos
+PAYMENTS_ASYNC_CHECKOUT = env_bool("PAYMENTS_ASYNC_CHECKOUT", "0")
+PAYMENTS_CHECKOUT_WORKERS = int(os.getenv("PAYMENTS_CHECKOUT_WORKERS", "4"))
+# Un pago pendiente más viejo que esto se considera abandonado (init_point vencido)
+PAYMENTS_PENDING_TTL_MINUTES = int(os.getenv("PAYMENTS_PENDING_TTL_MINUTES", "60"))
+
 # -----------------------------
 # Usuario / DRF / JWT
 # -----------------------------
@@ -135,6 +257,25 @@ REST_FRAMEWORK = {
     "DATE_FORMAT": "%d/%m/%Y",
 }
 
+# Caché de tokens de DeviceTokenAuthentication (accounts/services/token_cache.py)
+# - AUTH_TOKEN_CACHE_ALIAS: alias de CACHES compartido entre workers (vacío o LocMem = solo memoria)
+# - AUTH_TOKEN_CACHE_TTL: vigencia en el nivel compartido (la revocación lo borra para todos)
+# - AUTH_TOKEN_CACHE_LOCAL_TTL: vigencia en memoria del proceso; un logout en otro worker tarda
+#   hasta esto en valer acá, así que unos pocos segundos como mucho
+AUTH_TOKEN_CACHE_ENABLED = env_bool("AUTH_TOKEN_CACHE_ENABLED", "1")
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_ALIAS = os.getenv("AUTH_TOKEN_CACHE_ALIAS", "")
+AUTH_TOKEN_CACHE_LOCAL_TTL = float(os.getenv("AUTH_TOKEN_CACHE_LOCAL_TTL", "2"))
+
+# last_seen de SessionToken (accounts/services/last_seen.py): no se reescribe si es más
+# reciente que la ventana; con BUFFER=1 se acumula en memoria y se vuelca en lotes (hilo
+# del worker cada FLUSH_INTERVAL o al llegar a BUFFER_SIZE sesiones)
+AUTH_LAST_SEEN_WINDOW = float(os.getenv("AUTH_LAST_SEEN_WINDOW", "60"))
+AUTH_LAST_SEEN_BUFFER = env_bool("AUTH_LAST_SEEN_BUFFER", "0")
+AUTH_LAST_SEEN_BUFFER_SIZE = int(os.getenv("AUTH_LAST_SEEN_BUFFER_SIZE", "500"))
+AUTH_LAST_SEEN_FLUSH_INTERVAL = float(os.getenv("AUTH_LAST_SEEN_FLUSH_INTERVAL", "30"))
+
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
@@ -144,6 +285,45 @@ SIMPLE_JWT = {
     "UPDATE_LAST_LOGIN": True,
 }
 
+# -----------------------------
+# Estadísticas
+# -----------------------------
+# Las temporadas empiezan el día 1 de este mes (1 = año calendario)
+STATS_SEASON_START_MONTH = int(os.getenv("STATS_SEASON_START_MONTH", "1"))
+# Rankings precalculados (stats/services/leaderboards.py, `manage.py refresh_leaderboards`)
+STATS_LEADERBOARD_SIZE = int(os.getenv("STATS_LEADERBOARD_SIZE", "1000"))  # filas por ranking
+STATS_LEADERBOARD_MIN_MATCHES = int(os.getenv("STATS_LEADERBOARD_MIN_MATCHES", "5"))  # para % de victorias
+STATS_LEADERBOARD_PAGE_SIZE = int(os.getenv("STATS_LEADERBOARD_PAGE_SIZE", "50"))
+# Caché de estadísticas derivadas (por equipo y por periodo) en este alias de CACHES
+STATS_CACHE_ALIAS = os.getenv("STATS_CACHE_ALIAS", "default")
+STATS_TEAM_CACHE_TTL = int(os.getenv("STATS_TEAM_CACHE_TTL", "600"))
+STATS_TEAM_TOP_PLAYERS = int(os.getenv("STATS_TEAM_TOP_PLAYERS", "5"))
+# Estadísticas por periodo (stats/services/buckets.py): los periodos cerrados quedan en caché
+STATS_BUCKET_PERIODS = env_list("STATS_BUCKET_PERIODS", "week,month,season,year")
+STATS_BUCKET_CACHE_TTL = int(os.getenv("STATS_BUCKET_CACHE_TTL", str(7 * 24 * 3600)))
+# Con STATS_CACHE_ALIAS local al proceso (sin CACHE_URL) la invalidación solo llega al worker
+# que la hizo: los TTL de arriba se acotan a esto (atraso máximo en los demás workers)
+STATS_LOCAL_CACHE_TTL = int(os.getenv("STATS_LOCAL_CACHE_TTL", "30"))
+
+# Payload de /api/promos en memoria (promos/services/payload.py). La versión vive en este
+# alias de CACHES; si es compartido (CACHE_URL) un cambio llega a todos los workers en
+# PROMOS_VERSION_CHECK_INTERVAL. Si es local, los demás workers lo ven recién al reconstruir:
+# el payload dura a lo sumo PROMOS_LOCAL_MAX_AGE segundos
+PROMOS_CACHE_ALIAS = os.getenv("PROMOS_CACHE_ALIAS", "default")
+PROMOS_VERSION_CHECK_INTERVAL = float(os.getenv("PROMOS_VERSION_CHECK_INTERVAL", "1"))
+PROMOS_LOCAL_MAX_AGE = float(os.getenv("PROMOS_LOCAL_MAX_AGE", "30"))
+
+# Impresiones/clics de promos (promos/services/events.py): se suman en memoria y se
+# vuelcan en lote cada FLUSH_INTERVAL segundos (hilo del worker) o al llegar a BUFFER_KEYS
+# (promo, hora) distintos; si el volcado falla se reintenta sin perder los contadores
+PROMOS_EVENTS_FLUSH_INTERVAL = float(os.getenv("PROMOS_EVENTS_FLUSH_INTERVAL", "10"))
+PROMOS_EVENTS_BUFFER_KEYS = int(os.getenv("PROMOS_EVENTS_BUFFER_KEYS", "5000"))
+PROMOS_EVENTS_MAX_BATCH = int(os.getenv("PROMOS_EVENTS_MAX_BATCH", "500"))  # eventos por request
+PROMOS_EVENTS_MAX_AGE = int(os.getenv("PROMOS_EVENTS_MAX_AGE", str(24 * 3600)))  # segundos
+
+# Exportaciones en streaming (config/exports.py): filas por ida a la BD
+EXPORTS_CHUNK_SIZE = int(os.getenv("EXPORTS_CHUNK_SIZE", "2000"))
+
 # -----------------------------
 # Archivos estáticos
 # -----------------------------
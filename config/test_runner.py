@@ -0,0 +1,36 @@
+# config/test_runner.py
+import logging
+
+from django.test.runner import DiscoverRunner
+
+from config.query_budget import DEFAULT_SHAPES, check_budgets
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """DiscoverRunner que además verifica los presupuestos de queries (cuentan como fallos)."""
+
+    def __init__(self, query_budgets=True, budget_shapes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.query_budgets = query_budgets
+        self.budget_shapes = budget_shapes.split(",") if budget_shapes else DEFAULT_SHAPES
+        self.budget_violations = []
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--no-query-budgets", dest="query_budgets", action="store_false",
+                            help="No verificar los presupuestos de queries por vista.")
+        parser.add_argument("--budget-shapes", help=f"Formas del dataset (por defecto {','.join(DEFAULT_SHAPES)}).")
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if self.query_budgets:
+            self.budget_violations = check_budgets(self.budget_shapes, log=self.log if self.verbosity > 1 else None)
+            for violation in self.budget_violations:
+                self.log(f"QUERY BUDGET: {violation}", level=logging.ERROR)
+            if not self.budget_violations:
+                self.log("Presupuestos de queries OK")
+        return result
+
+    def suite_result(self, suite, result, **kwargs):
+        return super().suite_result(suite, result, **kwargs) + len(self.budget_violations)
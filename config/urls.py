@@ -2,8 +2,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from config.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("internal/metrics", metrics_view, name="metrics"),
     path("api/", include("accounts.api.urls")),
     path("api/", include("matches.api.urls")),
     path("api/", include("payments.api.urls")),
@@ -1,7 +1,15 @@
 # admin.py
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
 
 from matches.api.models import Team, Location, Match, MatchFAQ, MatchRecommendation, Enrollment
+from stats.models import PlayerMatchStat
+from stats.services.results import DRAW, SIDES, record_match_results
 
 
 @admin.register(Team)
@@ -18,12 +26,89 @@ class LocationAdmin(admin.ModelAdmin):
     search_fields = ("field_name", "address", "district__name")
 
 
+class PlayerResultForm(forms.Form):
+    user_id = forms.IntegerField(widget=forms.HiddenInput)
+    goals = forms.IntegerField(min_value=0, initial=0)
+    side = forms.ChoiceField(choices=[("", "-")] + [(s, s) for s in SIDES], required=False)
+
+
+PlayerResultFormSet = forms.formset_factory(PlayerResultForm, extra=0)
+
+
+class MatchResultsForm(forms.Form):
+    winning_side = forms.ChoiceField(
+        choices=[("", "Desconocido")] + [(s, f"Lado {s}") for s in SIDES] + [(DRAW, "Empate")], required=False
+    )
+    mvp_user_id = forms.TypedChoiceField(coerce=int, required=False, empty_value=None)
+
+    def __init__(self, *args, players=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["mvp_user_id"].choices = [("", "-")] + [(u.pk, str(u)) for u in players]
+
+
 @admin.register(Match)
 class MatchAdmin(admin.ModelAdmin):
     list_display = ("title", "location", "start_at", "capacity", "status")
     list_filter = ("status", "location__district")
     search_fields = ("title", "location__field_name")
     autocomplete_fields = ("location",)
+    readonly_fields = ("results_link",)
+
+    @admin.display(description="Resultados")
+    def results_link(self, obj):
+        if not obj.pk:
+            return "-"
+        return format_html('<a href="{}">Cargar resultados del partido</a>',
+                           reverse("admin:matches_match_results", args=[obj.pk]))
+
+    def get_urls(self):
+        return [
+            path("<int:object_id>/results/", self.admin_site.admin_view(self.results_view),
+                 name="matches_match_results"),
+        ] + super().get_urls()
+
+    def results_view(self, request, object_id):
+        """Todos los resultados del partido en un formulario (un bulk_update al guardar)."""
+        match = get_object_or_404(Match, pk=object_id)
+        if not self.has_change_permission(request, match):
+            return redirect("admin:matches_match_changelist")
+
+        enrollments = (Enrollment.objects.select_related("user")
+                       .filter(match=match, is_active=True).order_by("user__first_name", "user_id"))
+        players = [e.user for e in enrollments]
+        stats = {s.user_id: s for s in PlayerMatchStat.objects.filter(match=match)}
+        initial = [{"user_id": u.pk, "goals": stats[u.pk].goals if u.pk in stats else 0} for u in players]
+        mvp = next((uid for uid, s in stats.items() if s.is_mvp), None)
+
+        if request.method == "POST":
+            formset = PlayerResultFormSet(request.POST, initial=initial)
+            form = MatchResultsForm(request.POST, players=players)
+            if formset.is_valid() and form.is_valid():
+                try:
+                    record_match_results(
+                        match.id, [f.cleaned_data for f in formset],
+                        winning_side=form.cleaned_data["winning_side"] or None,
+                        mvp_user_id=form.cleaned_data["mvp_user_id"],
+                    )
+                except ValidationError as e:
+                    self.message_user(request, "; ".join(e.messages), level=messages.ERROR)
+                else:
+                    self.message_user(request, "Resultados registrados; el partido quedó finalizado.")
+                    return redirect("admin:matches_match_change", match.pk)
+        else:
+            formset = PlayerResultFormSet(initial=initial)
+            form = MatchResultsForm(initial={"mvp_user_id": mvp}, players=players)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": match,
+            "title": f"Resultados: {match}",
+            "form": form,
+            "formset": formset,
+            "rows": list(zip(players, formset)),
+        }
+        return TemplateResponse(request, "admin/matches/match/results.html", context)
 
 
 @admin.register(MatchFAQ)
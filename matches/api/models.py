@@ -46,6 +46,8 @@ class TeamMembership(models.Model):
         indexes = [
             models.Index(fields=["user", "date_to"]),
             models.Index(fields=["user", "date_from"]),
+            # atribución de estadísticas a equipos por rango de fechas (stats/services/teams.py)
+            models.Index(fields=["team", "date_from", "date_to"]),
         ]
 
     def __str__(self):
@@ -2,6 +2,7 @@
 from datetime import timezone as dt_timezone
 from datetime import timedelta
 from django.utils import timezone
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from accounts.api.models import User
@@ -63,6 +64,11 @@ class PlayerMiniSerializer(serializers.ModelSerializer):
         return f"{(obj.first_name or '').strip()} {(obj.last_name or '').strip()}".strip() or obj.email
 
 
+def _active_enrollments():
+    return (Enrollment.objects.filter(is_active=True)
+            .select_related("user__position", "user__dominant_foot")
+            .order_by("-joined_at", "-id"))
+
 
 class UpcomingMatchSerializer(serializers.ModelSerializer):
     match_identifier = serializers.UUIDField(read_only=True)
@@ -108,8 +114,22 @@ class UpcomingMatchSerializer(serializers.ModelSerializer):
         dt = to_utc(obj.start_at)
         return dt.strftime("%I:%M%p").lower()  # "11:00pm" si en BD es 23:00+00
 
+    @staticmethod
+    def eager(qs):
+        """Precarga lo que el serializer lee (sede, FAQs, recomendaciones, inscritos): sin N+1."""
+        return qs.select_related("location", "location__district").prefetch_related(
+            "faqs", "recommendations",
+            Prefetch("enrollments", queryset=_active_enrollments(), to_attr="active_enrollments"),
+        )
+
+    @staticmethod
+    def _enrollments(obj):
+        if not hasattr(obj, "active_enrollments"):  # instancia sin eager()
+            obj.active_enrollments = list(_active_enrollments().filter(match=obj))
+        return obj.active_enrollments
+
     def get_info(self, obj):
-        enrolled = Enrollment.objects.filter(match=obj, is_active=True).count()
+        enrolled = len(self._enrollments(obj))
         available = max(0, obj.capacity - enrolled)
         price_val = obj.price_amount
         price_label = f"S/ {int(price_val) if price_val == int(price_val) else price_val}"
@@ -122,13 +142,8 @@ class UpcomingMatchSerializer(serializers.ModelSerializer):
         }
 
     def get_considerations(self, obj):
-        return {"recommendations": list(obj.recommendations.values_list("text", flat=True))}
+        return {"recommendations": [r.text for r in obj.recommendations.all()]}
 
     def get_registered_players(self, obj):
-        users = (
-            User.objects
-            .filter(match_enrollments__match=obj, match_enrollments__is_active=True)
-            .select_related("position", "dominant_foot")
-            .order_by("-match_enrollments__joined_at", "-match_enrollments__id")
-        )
+        users = [e.user for e in self._enrollments(obj)]
         return PlayerMiniSerializer(users, many=True).data
@@ -4,17 +4,23 @@ from datetime import timedelta
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.views import APIView
 
 from accounts.utils.authentication import DeviceTokenAuthentication
+from config.db_router import read_replica
+from config.exports import parse_export_params, streaming_export
+from config.query_budget import query_budget
 from config.responses import ok, error
 from matches.api.models import Match, MatchStatus
 from matches.api.serializers import UpcomingMatchSerializer
 from matches.services.enrollments import join_match, leave_match
+from matches.services.exports import enrollments_export
 from payments.api.models import Payment, PaymentStatus
 
 
+@read_replica
+@query_budget(get=13)
 class MatchesBoardView(APIView):
     """
     GET /api/matches/board
@@ -28,11 +34,7 @@ class MatchesBoardView(APIView):
     def get(self, request):
         now = timezone.now() - timedelta(hours=5)
 
-        base = (
-            Match.objects
-            .select_related("location", "location__district")
-            .prefetch_related("faqs", "recommendations")
-        )
+        base = UpcomingMatchSerializer.eager(Match.objects.all())
 
         # Público (upcoming)
         public_qs = (
@@ -68,28 +70,28 @@ class MatchesBoardView(APIView):
         return ok(payload, message="Matches board")
 
 
+@read_replica
+@query_budget(get=4)
 class UpcomingMatchesView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         now = timezone.now() - timedelta(hours=5)
-        qs = (Match.objects
-              .select_related("location", "location__district")
-              .prefetch_related("faqs", "recommendations")
+        qs = (UpcomingMatchSerializer.eager(Match.objects.all())
               .filter(status=MatchStatus.PUBLISHED, start_at__gt=now)
               .order_by("start_at"))
         data = UpcomingMatchSerializer(qs, many=True).data
         return ok({"upcoming_matches": data}, message="Upcoming matches")
 
 
+@read_replica
+@query_budget(get=4)
 class MatchDetailView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, match_identifier):
         m = (
-            Match.objects
-            .select_related("location", "location__district")
-            .prefetch_related("faqs", "recommendations")
+            UpcomingMatchSerializer.eager(Match.objects.all())
             .filter(match_identifier=match_identifier)
             .first()
         )
@@ -99,6 +101,7 @@ class MatchDetailView(APIView):
         return ok(data, message="Match")
 
 
+@query_budget(post=20)
 class JoinMatchView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -121,6 +124,7 @@ class JoinMatchView(APIView):
         return ok(payload, message="Joined")
 
 
+@query_budget(post=12)
 class LeaveMatchView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -132,3 +136,24 @@ class LeaveMatchView(APIView):
         except Exception as e:
             return error(str(e), status_code=status.HTTP_400_BAD_REQUEST)
         return ok(payload, message="Left")
+
+
+@read_replica
+@query_budget(get=2)
+class EnrollmentsExportView(APIView):
+    """
+    GET /api/matches/enrollments/export?output=csv|ndjson&match=<uuid>&from=YYYY-MM-DD&to=YYYY-MM-DD  (staff)
+    from/to filtran por fecha del partido.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            params = parse_export_params(request.query_params)
+        except ValueError:
+            return error("Parámetros inválidos")
+        match = None
+        if params["match_identifier"]:
+            match = get_object_or_404(Match, match_identifier=params["match_identifier"])
+        return streaming_export(enrollments_export(match, params["start"], params["end"]), params["format"])
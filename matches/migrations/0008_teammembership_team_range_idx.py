@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0007_alter_enrollment_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teammembership',
+            index=models.Index(fields=['team', 'date_from', 'date_to'], name='matches_tea_team_id_6c0dc2_idx'),
+        ),
+    ]
@@ -23,12 +23,10 @@ def join_match(user, match_id: int) -> dict:
     if match.start_at <= now:
         raise ValidationError("Match already started or finished.")
 
-    enr, created = Enrollment.objects.get_or_create(
-        match=match, user=user, defaults={"is_active": True}
-    )
+    enr = Enrollment.objects.filter(match=match, user=user).first()
 
     # Ya estaba inscrito -> idempotente, garantiza que exista la fila de estadísticas
-    if not created and enr.is_active:
+    if enr and enr.is_active:
         PlayerMatchStat.objects.get_or_create(user=user, match=match)
         return {
             "joined": False,
@@ -36,15 +34,19 @@ def join_match(user, match_id: int) -> dict:
             "available_slots": max(0, match.capacity - active_count(match)),
         }
 
-    # Si estaba cancelado, lo reactivamos luego de verificar cupos
+    # Verificamos cupos ANTES de crear/reactivar (si no, la fila nueva se cuenta a sí misma)
     current = active_count(match)
     if current >= match.capacity:
         raise ValidationError("No slots available.")
 
-    enr.is_active = True
-    enr.joined_at = timezone.now() - timedelta(hours=5)
-    enr.cancelled_at = None
-    enr.save(update_fields=["is_active", "joined_at", "cancelled_at"])
+    if enr is None:
+        Enrollment.objects.create(match=match, user=user, is_active=True)
+    else:
+        # Si estaba cancelado, lo reactivamos
+        enr.is_active = True
+        enr.joined_at = timezone.now() - timedelta(hours=5)
+        enr.cancelled_at = None
+        enr.save(update_fields=["is_active", "joined_at", "cancelled_at"])
 
     # crea (o asegura) la fila de stats
     PlayerMatchStat.objects.get_or_create(user=user, match=match)
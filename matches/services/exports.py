@@ -0,0 +1,25 @@
+# matches/services/exports.py
+from config.exports import Export
+from matches.models import Enrollment
+
+HEADERS = [
+    "id", "match_identifier", "match_title", "match_start_at",
+    "user_id", "email", "first_name", "last_name", "phone",
+    "is_active", "joined_at", "cancelled_at",
+]
+
+
+def enrollments_export(match=None, start=None, end=None) -> Export:
+    qs = Enrollment.objects.all()
+    if match is not None:
+        qs = qs.filter(match=match)
+    if start is not None:
+        qs = qs.filter(match__start_at__gte=start)
+    if end is not None:
+        qs = qs.filter(match__start_at__lte=end)
+    rows = qs.order_by("id").values_list(
+        "id", "match__match_identifier", "match__title", "match__start_at",
+        "user_id", "user__email", "user__first_name", "user__last_name", "user__phone",
+        "is_active", "joined_at", "cancelled_at",
+    )
+    return Export("enrollments", HEADERS, rows)
@@ -13,8 +13,10 @@ def set_current_team(user, team, start_date=None):
         start_date = timezone.now().date()
 
     with transaction.atomic():
-        # cerrar vigente anterior (si hay)
-        TeamMembership.objects.filter(user=user, date_to__isnull=True).update(date_to=start_date)
+        # cerrar vigente anterior (si hay); updated_at a mano: update() no lo toca y es
+        # parte de la huella de los rankings por equipo
+        TeamMembership.objects.filter(user=user, date_to__isnull=True).update(
+            date_to=start_date, updated_at=timezone.now())
         # crear nueva
         TeamMembership.objects.create(user=user, team=team, date_from=start_date, date_to=None)
         # sincronizar campo denormalizado
@@ -29,6 +31,7 @@ def clear_current_team(user, end_date=None):
         end_date = timezone.now().date()
 
     with transaction.atomic():
-        TeamMembership.objects.filter(user=user, date_to__isnull=True).update(date_to=end_date)
+        TeamMembership.objects.filter(user=user, date_to__isnull=True).update(
+            date_to=end_date, updated_at=timezone.now())
         user.team = None
         user.save(update_fields=["team"])
@@ -1,3 +1,55 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import City, District
+from matches.models import Enrollment, Location, Match, MatchStatus
+from stats.models import PlayerMatchStat, PlayerStatsSummary
+
+User = get_user_model()
+
+
+# el admin renderiza {% static %}: sin collectstatic no hay manifest
+@override_settings(STORAGES={"staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}})
+class MatchResultsAdminTests(TestCase):
+    def setUp(self):
+        district = District.objects.create(city=City.objects.create(name="Lima"), name="Miraflores")
+        location = Location.objects.create(district=district, field_name="Cancha", address="Av. 1")
+        self.match = Match.objects.create(location=location, start_at=timezone.now() - timedelta(days=1),
+                                          capacity=10, price_amount=20, status=MatchStatus.PUBLISHED)
+        self.players = [
+            User.objects.create_user(name, email=f"{name}@example.com", password="x", document_number=doc)
+            for name, doc in (("ana", "11111111"), ("beto", "22222222"))
+        ]
+        for user in self.players:
+            Enrollment.objects.create(match=self.match, user=user)
+        admin = User.objects.create_superuser("admin", email="admin@example.com", password="x",
+                                              document_number="99999999")
+        self.client.force_login(admin)
+        self.url = reverse("admin:matches_match_results", args=[self.match.pk])
+
+    def test_form_records_results(self):
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "ana")
+
+        ana, beto = self.players
+        response = self.client.post(self.url, {
+            "form-TOTAL_FORMS": "2", "form-INITIAL_FORMS": "2",
+            "form-0-user_id": ana.pk, "form-0-goals": "3", "form-0-side": "A",
+            "form-1-user_id": beto.pk, "form-1-goals": "0", "form-1-side": "B",
+            "winning_side": "A", "mvp_user_id": ana.pk,
+        }, secure=True)
+        self.assertRedirects(response, reverse("admin:matches_match_change", args=[self.match.pk]),
+                             fetch_redirect_response=False)
+
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, MatchStatus.FINISHED)
+        self.assertEqual(
+            {s.user_id: (s.goals, s.is_winner, s.is_mvp) for s in PlayerMatchStat.objects.filter(match=self.match)},
+            {ana.pk: (3, True, True), beto.pk: (0, False, False)})
+        self.assertEqual(PlayerStatsSummary.objects.get(user=ana).goals, 3)
+        self.assertEqual(PlayerStatsSummary.objects.get(user=beto).wins, 0)
@@ -12,6 +12,6 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ("public_id", "mp_payment_id", "external_reference", "user__email")
     list_filter = ("status", "mp_status", "currency")
     readonly_fields = (
-        "public_id", "preference_id", "init_point", "sandbox_init_point",
+        "public_id", "preference_id", "init_point", "sandbox_init_point", "preference_error",
         "mp_payment_id", "mp_status", "external_reference", "created_at", "updated_at",
     )
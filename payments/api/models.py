@@ -11,6 +11,7 @@ class PaymentStatus(models.TextChoices):
     APPROVED = "approved", "Approved"
     REJECTED = "rejected", "Rejected"
     FAILED_CAPACITY = "failed_capacity", "Failed capacity"
+    EXPIRED = "expired", "Expired"  # pendiente abandonado (ver PAYMENTS_PENDING_TTL_MINUTES)
 
 
 class Payment(models.Model):
@@ -25,6 +26,7 @@ class Payment(models.Model):
     preference_id = models.CharField(max_length=120, blank=True)
     init_point = models.URLField(max_length=1000, blank=True)
     sandbox_init_point = models.URLField(max_length=1000, blank=True)
+    preference_error = models.CharField(max_length=255, blank=True)  # checkout asíncrono
 
     # Payment result
     mp_payment_id = models.CharField(max_length=120, blank=True)
@@ -33,6 +35,9 @@ class Payment(models.Model):
 
     status = models.CharField(max_length=32, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
 
+    # Header Idempotency-Key del checkout: reintentos del mismo tap devuelven este Payment
+    idempotency_key = models.CharField(max_length=64, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -40,6 +45,8 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=["external_reference"]),
             models.Index(fields=["status", "match"]),
+            # índice parcial: solo pendientes, para el sweeper de expiración
+            models.Index(fields=["created_at"], condition=Q(status="pending"), name="payment_pending_created_idx"),
         ]
 
         constraints = [
@@ -48,6 +55,11 @@ class Payment(models.Model):
                 condition=Q(status="pending"),  # solo uno pendiente por (user, match)
                 name="uniq_pending_payment_per_user_match",
             ),
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                condition=~Q(idempotency_key=""),
+                name="uniq_payment_idempotency_key_per_user",
+            ),
         ]
 
     def __str__(self):
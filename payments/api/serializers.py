@@ -11,4 +11,4 @@ class PaymentCreateSerializer(serializers.Serializer):
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
-        fields = ("public_id", "status", "preference_id", "init_point", "sandbox_init_point")
+        fields = ("public_id", "status", "preference_id", "init_point", "sandbox_init_point", "preference_error")
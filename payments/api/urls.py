@@ -1,9 +1,11 @@
 # payments/urls.py
 from django.urls import path
 
-from .views import CreateCheckoutView, MercadoPagoWebhookView
+from .views import CreateCheckoutView, MercadoPagoWebhookView, PaymentsExportView, PaymentStatusView
 
 urlpatterns = [
     path("payments/checkout", CreateCheckoutView.as_view(), name="payments-checkout"),
     path("payments/mercadopago/webhook", MercadoPagoWebhookView.as_view(), name="mp-webhook"),
+    path("payments/export", PaymentsExportView.as_view(), name="payments-export"),
+    path("payments/<uuid:public_id>", PaymentStatusView.as_view(), name="payments-status"),
 ]
@@ -1,26 +1,39 @@
 # payments/views.py
+import uuid
+
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.views import APIView
 
 from accounts.utils.authentication import DeviceTokenAuthentication
+from config.db_router import read_replica
+from config.exports import parse_export_params, streaming_export
+from config.query_budget import query_budget
 from config.responses import ok, error
-from matches.api.models import Enrollment
 from matches.models import Match, MatchStatus
-from matches.services.enrollments import join_match
 from .models import Payment, PaymentStatus
 from .serializers import PaymentCreateSerializer, PaymentSerializer
-from ..services.mp import create_preference_for_match, mp_sdk
+from ..services.checkout import apply_preference, checkout_match, notify_url, pending_payment, submit_preference
+from ..services.expiry import expire_payment_id, pending_cutoff
+from ..services.exports import payments_export
+from ..services.mp import MercadoPagoUnavailable, create_preference_for_match, mp_sdk
+from ..services.transitions import apply_mp_status
 
 
+@query_budget(post=6)
 class CreateCheckoutView(APIView):
     """
     Crea Payment + Preference (Checkout Pro).
     Devuelve init_point (URL de MP). El front redirige allí o inserta el botón embebido.
+
+    Con PAYMENTS_ASYNC_CHECKOUT=1 responde 202 apenas inserta el Payment; la
+    Preference se crea en segundo plano y el front consulta PaymentStatusView.
     """
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -31,54 +44,108 @@ class CreateCheckoutView(APIView):
         ser.is_valid(raise_exception=True)
         match_identifier = ser.validated_data["match_identifier"]
 
-        match = get_object_or_404(Match, match_identifier=match_identifier)
+        idempotency_key = request.headers.get("Idempotency-Key", "").strip()
+        if len(idempotency_key) > 64:
+            return error("Idempotency-Key inválida (máx. 64 caracteres)", status_code=400)
+
+        # Una sola consulta: match + cupos + ya inscrito + pendiente + idempotencia
+        match = checkout_match(match_identifier, request.user, idempotency_key)
+        if not match:
+            raise Http404
+
+        # 0) reintento del mismo tap -> mismo Payment, sin filas nuevas
+        if idempotency_key and match.idempotent_id:
+            return self._replay(match, match.idempotent_id)
+
         if match.status != MatchStatus.PUBLISHED:
             return error("Partido no disponible para pago", status_code=400)
 
         # PRE-CHECK de cupos
-        current = Enrollment.objects.filter(match=match, is_active=True).count()
-        if current >= match.capacity:
+        if match.enrolled_count >= match.capacity:
             return error("No hay cupos disponibles para este partido.", status_code=409)
 
         # 1) ya inscrito -> bloquear
-        if Enrollment.objects.filter(match=match, user=request.user, is_active=True).exists():
+        if match.is_enrolled:
             return error("Ya estás inscrito en este partido.", status_code=409)
 
         # 2) existe pago pendiente/en proceso -> reusar
-        existing_pending = Payment.objects.filter(
-            user=request.user, match=match,
-            status__in=[PaymentStatus.PENDING]
-        ).order_by("-created_at").first()
-        if existing_pending:
+        if match.pending_id and match.pending_created_at < pending_cutoff():
+            # abandonado: se libera (uniq_pending_payment_per_user_match) y se crea uno nuevo
+            expire_payment_id(match.pending_id)
+        elif match.pending_id:
+            existing_pending = pending_payment(match, request.user)
+            if settings.PAYMENTS_ASYNC_CHECKOUT and not existing_pending.preference_id:
+                # la Preference nunca se creó (falló o se perdió el hilo) -> reintentar
+                submit_preference(existing_pending)
             return ok(PaymentSerializer(existing_pending).data, message="Ya tienes un pago pendiente")
 
-        payment = Payment.objects.create(
-            user=request.user,
-            match=match,
-            amount=match.price_amount,
-            currency=match.price_currency,
-            external_reference="",  # se setea tras crear la fila
-        )
-        payment.external_reference = str(payment.public_id)
-        payment.save(update_fields=["external_reference"])
-
-        notify_url = settings.PUBLIC_BASE_URL.rstrip("/") + "/api/payments/mercadopago/webhook"
+        # public_id se genera en Python (uuid4): external_reference va en el mismo INSERT
+        public_id = uuid.uuid4()
+        try:
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    public_id=public_id,
+                    user=request.user,
+                    match=match,
+                    amount=match.price_amount,
+                    currency=match.price_currency,
+                    external_reference=str(public_id),
+                    idempotency_key=idempotency_key,
+                )
+        except IntegrityError:
+            # doble tap concurrente: otra request ganó la carrera (mismo key o pendiente único)
+            existing = Payment.objects.filter(user=request.user, match=match).filter(
+                Q(idempotency_key=idempotency_key) if idempotency_key else Q(status=PaymentStatus.PENDING)
+            ).order_by("-created_at").first()
+            if not existing:
+                raise
+            return ok(PaymentSerializer(existing).data, message="Ya tienes un pago pendiente")
+
+        if settings.PAYMENTS_ASYNC_CHECKOUT:
+            transaction.on_commit(lambda: submit_preference(payment))
+            return ok(PaymentSerializer(payment).data, message="Checkout en proceso",
+                      status_code=202)
 
         try:
-            pref = create_preference_for_match(payment, match, request.user, notify_url)
+            pref = create_preference_for_match(payment, match, request.user, notify_url())
         except Exception as e:
             # Borra el payment o déjalo en pending pero muestra error
             return error(f"No se pudo crear preferencia: {e}", status_code=400)
 
-        payment.preference_id = pref.get("id", "")
-        payment.init_point = pref.get("init_point", "")
-        payment.sandbox_init_point = pref.get("sandbox_init_point", "")
-        payment.save(update_fields=["preference_id", "init_point", "sandbox_init_point"])
+        apply_preference(payment, pref)
+
+        return ok(PaymentSerializer(payment).data, message="Checkout creado")
 
+    def _replay(self, match, payment_id):
+        payment = Payment.objects.get(pk=payment_id)
+        if payment.match_id != match.id:
+            return error("Idempotency-Key ya usada para otro partido", status_code=422)
         return ok(PaymentSerializer(payment).data, message="Checkout creado")
 
 
+@query_budget(get=1)
+class PaymentStatusView(APIView):
+    """
+    GET /api/payments/<public_id>
+    Estado del pago del usuario. Responde al instante (no retiene el worker):
+    mientras la Preference se crea en segundo plano manda Retry-After y el
+    front vuelve a consultar hasta tener init_point o preference_error.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    retry_after = 1  # segundos sugeridos entre consultas
+
+    def get(self, request, public_id):
+        payment = get_object_or_404(Payment, public_id=public_id, user=request.user)
+        response = ok(PaymentSerializer(payment).data, message="Pago")
+        if (payment.status == PaymentStatus.PENDING
+                and not payment.preference_id and not payment.preference_error):
+            response["Retry-After"] = str(self.retry_after)
+        return response
+
+
 @method_decorator(csrf_exempt, name="dispatch")
+@query_budget(post=23)
 class MercadoPagoWebhookView(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []
@@ -105,7 +172,11 @@ class MercadoPagoWebhookView(APIView):
 
         # Consultamos a MP para obtener el estado real
         sdk = mp_sdk()
-        resp = sdk.payment().get(payment_id)
+        try:
+            resp = sdk.payment().get(payment_id)
+        except MercadoPagoUnavailable:
+            # 503 -> MP reintenta la notificación más tarde
+            return error("MercadoPago no disponible", status_code=503)
         if resp.get("status") != 200:
             return error("Cannot fetch payment", status_code=400)
 
@@ -119,37 +190,30 @@ class MercadoPagoWebhookView(APIView):
             # puede pasar si borraron el registro; respondemos 200 para no reintentar
             return ok({"detail": "unknown external_reference"}, message="OK")
 
-        # Idempotencia: si ya resolvimos definitivamente este pago, solo sincronizamos campos de MP
-        if payment.status in (PaymentStatus.APPROVED, PaymentStatus.FAILED_CAPACITY, PaymentStatus.REJECTED):
-            payment.mp_payment_id = str(payment_id)
-            payment.mp_status = mp_status
-            payment.save(update_fields=["mp_payment_id", "mp_status", "updated_at"])
-            return ok({"status": payment.status}, message="Webhook processed")
-
-        # Actualizamos campos MP del Payment
-        payment.mp_payment_id = str(payment_id)
-        payment.mp_status = mp_status
-
-        if mp_status in ("approved", "accredited"):
-            # Regla: si YA está inscrito, no volvemos a inscribir.
-            if Enrollment.objects.filter(user=payment.user, match_id=payment.match_id, is_active=True).exists():
-                payment.status = PaymentStatus.APPROVED
-                payment.save(update_fields=["status", "mp_payment_id", "mp_status", "updated_at"])
-                return ok({"status": payment.status, "note": "already_enrolled"}, message="Webhook processed")
-
-            # Caso normal: inscribir (respeta cupos e idempotencia interna)
-            try:
-                join_match(payment.user, payment.match_id)
-                payment.status = PaymentStatus.APPROVED
-            except Exception:
-                # si no hay cupos u otra validación del join falla
-                payment.status = PaymentStatus.FAILED_CAPACITY
-
-        elif mp_status in ("rejected", "cancelled"):
-            payment.status = PaymentStatus.REJECTED
-        else:
-            # pending / in_process / otros
-            payment.status = PaymentStatus.PENDING
-
-        payment.save()
-        return ok({"status": payment.status}, message="Webhook processed")
+        result = apply_mp_status(payment, payment_id, mp_status)
+        return ok(result, message="Webhook processed")
+
+
+@read_replica
+@query_budget(get=1)
+class PaymentsExportView(APIView):
+    """
+    GET /api/payments/export?output=csv|ndjson&match=<uuid>&status=approved&from=YYYY-MM-DD&to=YYYY-MM-DD  (staff)
+    from/to filtran por fecha de creación del pago.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        status_filter = request.query_params.get("status") or None
+        try:
+            params = parse_export_params(request.query_params)
+            if status_filter and status_filter not in PaymentStatus.values:
+                raise ValueError(status_filter)
+        except ValueError:
+            return error("Parámetros inválidos")
+        match = None
+        if params["match_identifier"]:
+            match = get_object_or_404(Match, match_identifier=params["match_identifier"])
+        export = payments_export(match, status_filter, params["start"], params["end"])
+        return streaming_export(export, params["format"])
@@ -0,0 +1,300 @@
+# payments/management/commands/bench_payments.py
+"""
+Benchmark end-to-end del flujo de pago contra un MercadoPago falso:
+checkout -> (preference lista) -> usuario paga en MP -> webhook -> join_match.
+
+Como bench_api, corre en una BD de prueba (test_<NAME> en Postgres, en memoria
+con SQLite) que se crea al empezar y se destruye al terminar: la BD real no se
+toca. Ahí crea su dataset (usuarios + un partido con cupos limitados por modo).
+Con SQLite usa --concurrency 1 (no hay select_for_update); su BD de prueba va
+a un archivo temporal, porque la de memoria compartida no espera los locks
+entre hilos (los del checkout asíncrono fallarían con "table is locked").
+"""
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from accounts.models import City, District, SessionToken
+from config.db_router import REPLICA, replica_enabled
+from matches.models import Enrollment, Location, Match, MatchStatus
+from payments.models import Payment, PaymentStatus
+from payments.services.checkout import shutdown_executor
+from payments.services.mp import mp_stats, reset_mp_sdk
+from payments.services.mp_client import CircuitBreaker, PooledHttpClient
+from payments.services.mp_fake import FakeHttpClient, FakeMercadoPago, FakeMPServer
+
+User = get_user_model()
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def summarize(samples, elapsed):
+    return {
+        "count": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark checkout -> webhook -> join_match contra un MercadoPago falso."
+    poll_interval = 0.1  # entre consultas de GET /api/payments/<public_id> (modo async)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--capacity", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=16, help="usuarios simultáneos (hilos)")
+        parser.add_argument("--checkout", choices=["sync", "async", "both"], default="both")
+        parser.add_argument("--mp", choices=["inproc", "http"], default="http",
+                            help="MP falso en proceso o detrás de un servidor HTTP local")
+        parser.add_argument("--no-pooling", action="store_true", help="una Session HTTP por llamada")
+        parser.add_argument("--latency-ms", type=float, default=50)
+        parser.add_argument("--jitter-ms", type=float, default=10)
+        parser.add_argument("--failure-rate", type=float, default=0.0)
+        parser.add_argument("--approve-rate", type=float, default=0.9,
+                            help="fracción de usuarios cuyo pago MP aprueba")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", help="escribe los resultados en este archivo")
+
+    # ---------- setup ----------
+    def _setup_mp(self, opts):
+        latency, jitter = opts["latency_ms"] / 1000, opts["jitter_ms"] / 1000
+        self.fake = FakeMercadoPago(
+            latency=(max(0.0, latency - jitter), latency + jitter) if jitter else latency,
+            failure_rate=opts["failure_rate"],
+            seed=opts["seed"],
+        )
+        self.server = None
+        if opts["mp"] == "http":
+            self.server = FakeMPServer(self.fake).start()
+            client = PooledHttpClient(
+                base_url=self.server.base_url,
+                pooled=not opts["no_pooling"],
+                pool_size=max(10, opts["concurrency"]),
+                breaker=CircuitBreaker(failure_threshold=10 ** 6),  # medimos fallos, no cortamos
+            )
+        else:
+            client = FakeHttpClient(self.fake)
+        reset_mp_sdk(client)
+
+    def _seed(self, opts, n_matches):
+        run = uuid.uuid4().hex[:8]
+        self.prefix = f"bench-{run}"
+        city, _ = City.objects.get_or_create(name="Bench City")
+        district, _ = District.objects.get_or_create(city=city, name="Bench District")
+        self.location, _ = Location.objects.get_or_create(
+            district=district, field_name="Bench Field", address="Bench 123"
+        )
+        self.matches = [
+            Match.objects.create(
+                location=self.location, title=f"{self.prefix}-{i}", capacity=opts["capacity"],
+                price_amount=10, status=MatchStatus.PUBLISHED,
+                start_at=timezone.now() + timedelta(days=1),
+            )
+            for i in range(n_matches)
+        ]
+        users = [
+            User(username=f"{self.prefix}-{i}", email=f"{self.prefix}-{i}@bench.local",
+                 document_number=f"{run}{i}"[:20], password="!")
+            for i in range(opts["users"])
+        ]
+        User.objects.bulk_create(users, batch_size=1000)
+        users = list(User.objects.filter(username__startswith=self.prefix).order_by("id"))
+        SessionToken.objects.bulk_create([
+            SessionToken(user=u, document_number=u.document_number, device_id="bench",
+                         token=f"{self.prefix}-{u.pk}-{uuid.uuid4().hex}")
+            for u in users
+        ], batch_size=1000)
+        self.tokens = list(
+            SessionToken.objects.filter(user__username__startswith=self.prefix)
+            .order_by("user_id").values_list("token", flat=True)
+        )
+
+    # ---------- fases ----------
+    def _client(self):
+        # un Client por hilo (no son thread-safe)
+        c = getattr(self._local, "client", None)
+        if c is None:
+            host = next((h for h in settings.ALLOWED_HOSTS if h not in ("*", "")), "localhost").lstrip(".")
+            c = self._local.client = Client(SERVER_NAME=host)
+        return c
+
+    def _run_phase(self, fn, items, concurrency):
+        samples, results, lock = [], [], threading.Lock()
+
+        def task(item):
+            started = time.perf_counter()
+            out = fn(item)
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.append(elapsed)
+                results.append(out)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(task, items))
+            elapsed = time.perf_counter() - started
+            # cada hilo cierra su conexión: la BD de prueba no se puede borrar con conexiones abiertas
+            barrier = threading.Barrier(concurrency)
+
+            def close(_):
+                barrier.wait()  # una tarea por hilo
+                connections.close_all()
+
+            list(pool.map(close, range(concurrency)))
+        return samples, [r for r in results if r], elapsed
+
+    def _checkout(self, match, token):
+        r = self._client().post(
+            "/api/payments/checkout", {"match_identifier": str(match.match_identifier)},
+            content_type="application/json", secure=True,
+            HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_IDEMPOTENCY_KEY=f"bench-{match.pk}-{token[-12:]}",
+        )
+        if r.status_code not in (200, 202):
+            return None
+        return token, r.json()["data"]["public_id"]
+
+    def _wait_ready(self, item):
+        token, public_id = item
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            r = self._client().get(f"/api/payments/{public_id}", secure=True,
+                                   HTTP_AUTHORIZATION=f"Bearer {token}")
+            data = r.json().get("data") or {}
+            if data.get("init_point") or data.get("preference_error"):
+                return item if data.get("init_point") else None
+            time.sleep(self.poll_interval)  # como el front: vuelve a consultar
+        return None
+
+    def _pay_and_notify(self, item):
+        token, public_id = item
+        approved = self._random.random() < self.approve_rate
+        mp_id = self.fake.pay(str(public_id), ("approved",) if approved else ("rejected",))
+        self.paid[str(public_id)] = approved
+        r = self._client().post(f"/api/payments/mercadopago/webhook?type=payment&data.id={mp_id}",
+                                {}, content_type="application/json", secure=True)
+        return r.status_code == 200
+
+    def _run_mode(self, mode, match, opts):
+        with override_settings(PAYMENTS_ASYNC_CHECKOUT=mode == "async"):
+            return self._run_phases(mode, match, opts)
+
+    def _run_phases(self, mode, match, opts):
+        self.paid = {}
+        conc = opts["concurrency"]
+        report = {"mode": mode}
+
+        started = time.perf_counter()
+        samples, checked_out, elapsed = self._run_phase(lambda t: self._checkout(match, t), self.tokens, conc)
+        report["checkout"] = summarize(samples, elapsed)
+
+        if mode == "async":
+            samples, checked_out, elapsed = self._run_phase(self._wait_ready, checked_out, conc)
+            report["preference_ready"] = summarize(samples, elapsed)
+
+        samples, _, elapsed = self._run_phase(self._pay_and_notify, checked_out, conc)
+        report["webhook"] = summarize(samples, elapsed)
+        report["end_to_end_seconds"] = round(time.perf_counter() - started, 3)
+        report["correctness"] = self._check(match)
+        return report
+
+    def _check(self, match):
+        enrolled = Enrollment.objects.filter(match=match, is_active=True).count()
+        statuses = dict(Payment.objects.filter(match=match).values_list("external_reference", "status"))
+        approved_refs = [ref for ref, ok in self.paid.items() if ok]
+        unresolved = [ref for ref in approved_refs
+                      if statuses.get(ref) not in (PaymentStatus.APPROVED, PaymentStatus.FAILED_CAPACITY)]
+        local_approved = sum(1 for ref in approved_refs if statuses.get(ref) == PaymentStatus.APPROVED)
+        return {
+            "capacity": match.capacity,
+            "enrolled": enrolled,
+            "over_enrolled": enrolled > match.capacity,
+            "mp_approved": len(approved_refs),
+            "approved": local_approved,
+            "failed_capacity": sum(1 for ref in approved_refs if statuses.get(ref) == PaymentStatus.FAILED_CAPACITY),
+            "unresolved_approved": len(unresolved),
+            "approved_matches_enrolled": local_approved == enrolled,
+            "ok": enrolled <= match.capacity and not unresolved and local_approved == enrolled,
+        }
+
+    def handle(self, *args, **opts):
+        if connection.vendor == "sqlite" and opts["concurrency"] > 1:
+            self.stderr.write(self.style.WARNING(
+                "SQLite no soporta select_for_update: con concurrencia > 1 habrá 'database is locked'. "
+                "Usa Postgres o --concurrency 1."
+            ))
+
+        modes = ["sync", "async"] if opts["checkout"] == "both" else [opts["checkout"]]
+        self._local = threading.local()
+        self._random = random.Random(opts["seed"])
+        self.approve_rate = opts["approve_rate"]
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        old_test_name = test_settings.get("NAME")
+        if connection.vendor == "sqlite":
+            test_settings["NAME"] = os.path.join(tempfile.gettempdir(), f"bench_payments_{os.getpid()}.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        if replica_enabled():  # como en los tests: la réplica apunta a la misma BD de prueba
+            connections[REPLICA].creation.set_as_test_mirror(connection.settings_dict)
+        self.server = None
+        try:
+            self._setup_mp(opts)
+            self._seed(opts, len(modes))
+            runs = [self._run_mode(mode, match, opts) for mode, match in zip(modes, self.matches)]
+            results = {
+                "params": {k: opts[k] for k in ("users", "capacity", "concurrency", "mp", "no_pooling",
+                                                 "latency_ms", "jitter_ms", "failure_rate", "approve_rate")},
+                "db": connection.vendor,
+                "runs": runs,
+                "mp_client": mp_stats(),
+                "fake_mp_calls": self.fake.calls,
+            }
+        finally:
+            shutdown_executor()  # Preferences en vuelo terminan antes de borrar la BD
+            if self.server:
+                self.server.shutdown()
+                self.server.server_close()
+            reset_mp_sdk()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = old_test_name
+            teardown_test_environment()
+
+        for run in runs:
+            c = run["correctness"]
+            style = self.style.SUCCESS if c["ok"] else self.style.ERROR
+            self.stdout.write(style(
+                f"[{run['mode']}] checkout {run['checkout']['rps']} req/s "
+                f"(p50 {run['checkout']['p50_ms']} ms, p99 {run['checkout']['p99_ms']} ms) | "
+                f"webhook p99 {run['webhook']['p99_ms']} ms | "
+                f"inscritos {c['enrolled']}/{c['capacity']}, aprobados MP {c['mp_approved']}, "
+                f"sin resolver {c['unresolved_approved']}"
+            ))
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
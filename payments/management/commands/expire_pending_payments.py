@@ -0,0 +1,25 @@
+# payments/management/commands/expire_pending_payments.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.services.expiry import sweep_expired
+
+
+class Command(BaseCommand):
+    help = "Marca como EXPIRED los pagos PENDING más viejos que PAYMENTS_PENDING_TTL_MINUTES (por lotes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="solo cuenta los vencidos")
+
+    def handle(self, *args, **opts):
+        total = sweep_expired(
+            batch_size=opts["batch_size"],
+            max_batches=opts["max_batches"],
+            dry_run=opts["dry_run"],
+        )
+        verb = "expirarían" if opts["dry_run"] else "expirados"
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} pagos pendientes {verb} (TTL={settings.PAYMENTS_PENDING_TTL_MINUTES} min)"
+        ))
@@ -0,0 +1,36 @@
+# payments/management/commands/fake_mp_server.py
+from django.core.management.base import BaseCommand
+
+from payments.services.mp_fake import FakeMercadoPago, FakeMPServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un MercadoPago falso en HTTP para pruebas de carga locales. "
+        "Apunta la app con MP_API_BASE_URL=http://127.0.0.1:<port>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency-ms", type=float, default=0, help="latencia media por llamada")
+        parser.add_argument("--jitter-ms", type=float, default=0, help="± variación uniforme de la latencia")
+        parser.add_argument("--failure-rate", type=float, default=0, help="probabilidad de responder 500")
+        parser.add_argument("--statuses", default="approved",
+                            help="secuencia de estados por pago, separada por comas (p.ej. pending,approved)")
+
+    def handle(self, *args, **opts):
+        latency, jitter = opts["latency_ms"] / 1000, opts["jitter_ms"] / 1000
+        fake = FakeMercadoPago(
+            latency=(max(0.0, latency - jitter), latency + jitter) if jitter else latency,
+            failure_rate=opts["failure_rate"],
+            status_sequence=[s.strip() for s in opts["statuses"].split(",") if s.strip()],
+        )
+        server = FakeMPServer(fake, host=opts["host"], port=opts["port"])
+        self.stdout.write(self.style.SUCCESS(f"MP falso escuchando en {server.base_url} (Ctrl+C para salir)"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,56 @@
+# payments/management/commands/reconcile_payments.py
+import json
+from contextlib import ExitStack
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from payments.services.reconcile import reconcile_pending
+
+
+class Command(BaseCommand):
+    help = "Reconcilia pagos PENDING contra la búsqueda de pagos de MercadoPago (webhooks perdidos)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=4, help="búsquedas simultáneas a MP")
+        parser.add_argument("--dry-run", action="store_true", help="solo reporta; no cambia estados")
+        parser.add_argument("--checkpoint", default=".reconcile_payments.json",
+                            help="último id procesado de una corrida interrumpida; se borra al completar "
+                                 "una pasada (vacío = sin checkpoint)")
+        parser.add_argument("--reset", action="store_true", help="ignora el checkpoint y empieza desde cero")
+        parser.add_argument("--older-than-minutes", type=int, default=15,
+                            help="solo pagos creados hace más de N minutos")
+        parser.add_argument("--lookahead-hours", type=int, default=48,
+                            help="cuánto después de crear el Payment puede haberse pagado en MP "
+                                 "(los EXPIRED más nuevos que esto también se revisan)")
+        parser.add_argument("--report", help="escribe una línea JSON por pago encontrado en MP (JSONL), "
+                                             "a medida que se procesa")
+
+    def handle(self, *args, **opts):
+        checkpoint = opts["checkpoint"] or None
+        if opts["reset"] and checkpoint:
+            Path(checkpoint).unlink(missing_ok=True)
+
+        with ExitStack() as stack:
+            on_item = None
+            if opts["report"]:
+                out = stack.enter_context(open(opts["report"], "w"))
+                on_item = lambda item: out.write(json.dumps(item, default=str) + "\n")
+
+            report = reconcile_pending(
+                chunk_size=opts["chunk_size"],
+                concurrency=opts["concurrency"],
+                dry_run=opts["dry_run"],
+                checkpoint=checkpoint,
+                older_than=timedelta(minutes=opts["older_than_minutes"]),
+                lookahead=timedelta(hours=opts["lookahead_hours"]),
+                log=lambda msg: self.stdout.write(msg) if opts["verbosity"] > 1 else None,
+                on_item=on_item,
+            )
+
+        label = "DRY-RUN" if report["dry_run"] else "Reconciliación"
+        self.stdout.write(self.style.SUCCESS(f"{label} terminada (último id={report['last_id']})"))
+        for key, value in sorted(report["counts"].items()):
+            self.stdout.write(f"  {key}: {value}")
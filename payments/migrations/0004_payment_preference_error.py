@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_remove_payment_uniq_active_payment_per_user_match_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='preference_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,170 @@
+# payments/services/checkout.py
+"""
+Creación de la Preference de MP fuera del ciclo request/response.
+
+El checkout asíncrono inserta el Payment y responde al instante; la llamada a
+MP corre en un ThreadPoolExecutor del proceso y rellena init_point (o
+preference_error). El front consulta GET /api/payments/<public_id>.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from matches.api.models import Enrollment, Match
+from payments.api.models import Payment, PaymentStatus
+from .mp import create_preference_for_match
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# ids en vuelo en este proceso: evita crear dos preferences para el mismo pago
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def notify_url() -> str:
+    # sin PUBLIC_BASE_URL (local/bench) no mandamos notification_url
+    if not settings.PUBLIC_BASE_URL:
+        return ""
+    return settings.PUBLIC_BASE_URL.rstrip("/") + "/api/payments/mercadopago/webhook"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PAYMENTS_CHECKOUT_WORKERS,
+                    thread_name_prefix="mp-preference",
+                )
+    return _executor
+
+
+def shutdown_executor():
+    """Espera las Preferences en vuelo y cierra el pool (benchmarks, antes de borrar la BD de prueba)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+# lo que la respuesta del checkout (PaymentSerializer) y submit_preference usan de un pendiente
+PENDING_FIELDS = ("id", "public_id", "created_at", "preference_id", "init_point",
+                  "sandbox_init_point", "preference_error")
+
+
+def checkout_match(match_identifier, user, idempotency_key: str = ""):
+    """
+    Match + todo lo que el checkout necesita para decidir, en UNA consulta:
+    - enrolled_count: inscritos activos
+    - is_enrolled: si `user` ya está inscrito
+    - pending_<campo>: último pago pendiente de `user` para el match (PENDING_FIELDS;
+      pending_payment() lo arma sin otra consulta)
+    - idempotent_id: Payment ya creado por `user` con ese Idempotency-Key (si vino)
+    """
+    active = Enrollment.objects.filter(match=OuterRef("pk"), is_active=True)
+    enrolled_count = (
+        active.order_by().values("match")
+        .annotate(c=Count("id")).values("c")
+    )
+    pending = (
+        Payment.objects
+        .filter(match=OuterRef("pk"), user=user, status=PaymentStatus.PENDING)
+        .order_by("-created_at")
+    )
+    qs = Match.objects.filter(match_identifier=match_identifier).annotate(
+        enrolled_count=Coalesce(Subquery(enrolled_count, output_field=IntegerField()), Value(0)),
+        is_enrolled=Exists(active.filter(user=user)),
+        **{f"pending_{f}": Subquery(pending.values(f)[:1]) for f in PENDING_FIELDS},
+    )
+    if idempotency_key:
+        qs = qs.annotate(idempotent_id=Subquery(
+            Payment.objects.filter(user=user, idempotency_key=idempotency_key).values("id")[:1]
+        ))
+    return qs.first()
+
+
+def pending_payment(match, user):
+    """Payment pendiente (no recargado de la BD) a partir de las anotaciones de checkout_match."""
+    if match.pending_id is None:
+        return None
+    payment = Payment(user=user, match=match, status=PaymentStatus.PENDING,
+                      **{f: getattr(match, f"pending_{f}") for f in PENDING_FIELDS})
+    payment._state.adding = False
+    return payment
+
+
+def apply_preference(payment: Payment, pref: dict):
+    payment.preference_id = pref.get("id", "")
+    payment.init_point = pref.get("init_point", "")
+    payment.sandbox_init_point = pref.get("sandbox_init_point", "")
+    payment.preference_error = ""
+    payment.save(update_fields=["preference_id", "init_point", "sandbox_init_point",
+                                "preference_error", "updated_at"])
+
+
+def _record_error(payment_id: int, exc: Exception):
+    """Deja el motivo en preference_error (lo que ve el front al consultar el pago)."""
+    try:
+        Payment.objects.filter(pk=payment_id, preference_id="").update(
+            preference_error=(str(exc) or type(exc).__name__)[:255], updated_at=timezone.now(),
+        )
+    except Exception:
+        logger.exception("No se pudo guardar preference_error del pago %s", payment_id)
+
+
+def build_preference(payment_id: int, notify: str):
+    """Tarea de fondo: crea la Preference y la guarda en el Payment."""
+    close_old_connections()
+    try:
+        payment = Payment.objects.select_related("match", "user").filter(pk=payment_id).first()
+        if not payment or payment.preference_id:
+            return
+        try:
+            pref = create_preference_for_match(payment, payment.match, payment.user, notify)
+        except Exception as e:
+            logger.warning("MP rechazó la Preference del pago %s: %s", payment_id, e)
+            _record_error(payment_id, e)
+            return
+        apply_preference(payment, pref)
+    except Exception as e:
+        # el executor guarda la excepción en un Future que nadie mira: la registramos aquí
+        logger.exception("Falló la creación de la Preference del pago %s", payment_id)
+        _record_error(payment_id, e)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(payment_id)
+        # el hilo del pool no pasa por request_finished: cerramos su conexión
+        close_old_connections()
+
+
+def submit_preference(payment: Payment) -> bool:
+    """
+    Encola la creación de la Preference. False si ya estaba en vuelo.
+    Un reintento borra el preference_error del intento anterior: hasta que
+    termine, el pago vuelve a verse "en proceso".
+    """
+    with _in_flight_lock:
+        if payment.pk in _in_flight:
+            return False
+        _in_flight.add(payment.pk)
+    try:
+        if payment.preference_error:
+            Payment.objects.filter(pk=payment.pk).update(preference_error="", updated_at=timezone.now())
+            payment.preference_error = ""
+        _get_executor().submit(build_preference, payment.pk, notify_url())
+    except Exception:
+        with _in_flight_lock:
+            _in_flight.discard(payment.pk)
+        raise
+    return True
@@ -0,0 +1,58 @@
+# payments/services/expiry.py
+"""
+Expiración de pagos PENDING abandonados.
+
+Un pendiente viejo bloquea nuevos checkouts (uniq_pending_payment_per_user_match)
+aunque su init_point ya no sirva. El sweeper los pasa a EXPIRED por lotes con
+UPDATEs set-based. Convive con el webhook así:
+- los ids del lote se toman con select_for_update(skip_locked=True): las filas
+  que un webhook tiene bloqueadas se saltan y quedan para la próxima pasada;
+- el UPDATE vuelve a exigir status=PENDING, así que nunca pisa un pago que el
+  webhook ya resolvió.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from payments.api.models import Payment, PaymentStatus
+
+
+def pending_cutoff(now=None):
+    now = now or timezone.now()
+    return now - timedelta(minutes=settings.PAYMENTS_PENDING_TTL_MINUTES)
+
+
+def expire_payment_id(payment_id: int) -> bool:
+    """Expira un pendiente puntual (checkout). False si otro proceso ya lo resolvió."""
+    updated = Payment.objects.filter(pk=payment_id, status=PaymentStatus.PENDING).update(
+        status=PaymentStatus.EXPIRED, updated_at=timezone.now()
+    )
+    return bool(updated)
+
+
+def sweep_expired(batch_size: int = 1000, max_batches: int = None, dry_run: bool = False) -> int:
+    """Expira pendientes vencidos en lotes. Devuelve cuántos expiró (o expiraría)."""
+    cutoff = pending_cutoff()
+    stale = Payment.objects.filter(status=PaymentStatus.PENDING, created_at__lt=cutoff)
+    if dry_run:
+        return stale.count()
+
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            ids = list(
+                stale.select_for_update(skip_locked=True)
+                .order_by("created_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += Payment.objects.filter(id__in=ids, status=PaymentStatus.PENDING).update(
+                status=PaymentStatus.EXPIRED, updated_at=timezone.now()
+            )
+        batches += 1
+        if len(ids) < batch_size:
+            break
+    return total
@@ -0,0 +1,27 @@
+# payments/services/exports.py
+from config.exports import Export
+from payments.models import Payment
+
+HEADERS = [
+    "public_id", "external_reference", "match_identifier", "match_title",
+    "user_id", "email", "amount", "currency", "status",
+    "mp_payment_id", "mp_status", "created_at", "updated_at",
+]
+
+
+def payments_export(match=None, status=None, start=None, end=None) -> Export:
+    qs = Payment.objects.all()
+    if match is not None:
+        qs = qs.filter(match=match)
+    if status:
+        qs = qs.filter(status=status)
+    if start is not None:
+        qs = qs.filter(created_at__gte=start)
+    if end is not None:
+        qs = qs.filter(created_at__lte=end)
+    rows = qs.order_by("id").values_list(
+        "public_id", "external_reference", "match__match_identifier", "match__title",
+        "user_id", "user__email", "amount", "currency", "status",
+        "mp_payment_id", "mp_status", "created_at", "updated_at",
+    )
+    return Export("payments", HEADERS, rows)
@@ -1,10 +1,83 @@
 # payments/services/mp.py
-import mercadopago
+"""
+Fachada de MercadoPago. El SDK y el cliente HTTP (mp_client) se importan al
+crear el SDK, no al cargar el módulo: las vistas de pagos entran en el
+URLconf y no deben sumar ese import al arranque de cada worker.
+"""
+import threading
+
 from django.conf import settings
 
+_sdk = None
+_sdk_lock = threading.Lock()
+
+
+class MercadoPagoUnavailable(RuntimeError):
+    """MP no respondió (timeout/conexión/5xx) o el circuit breaker está abierto."""
+
+
+def mp_http_client():
+    """Cliente HTTP compartido por todo el proceso (pool + timeouts + breaker)."""
+    return mp_sdk().http_client
+
+
+def mp_stats() -> dict:
+    """Latencia y errores de las llamadas a MP en este proceso."""
+    from .mp_client import PooledHttpClient
+
+    client = mp_http_client()
+    if not isinstance(client, PooledHttpClient):
+        return {}  # MP falso en proceso: no hay red que medir
+    stats = client.stats.snapshot()
+    stats["breaker"] = client.breaker.state
+    return stats
+
 
 def mp_sdk():
-    return mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN)
+    """
+    SDK de MP reutilizable (uno por proceso). Antes se creaba uno por llamada,
+    lo que implicaba Session nueva + handshake TLS y timeout de 60s.
+    """
+    global _sdk
+    if _sdk is None:
+        import mercadopago
+
+        from .mp_client import CircuitBreaker, PooledHttpClient
+
+        with _sdk_lock:
+            if _sdk is None and settings.MERCADOPAGO_BACKEND == "fake":
+                from .mp_fake import FakeHttpClient, FakeMercadoPago
+                _sdk = mercadopago.SDK("fake-token", http_client=FakeHttpClient(FakeMercadoPago()))
+            elif _sdk is None:
+                http_client = PooledHttpClient(
+                    base_url=settings.MERCADOPAGO_API_BASE_URL,
+                    connect_timeout=settings.MERCADOPAGO_CONNECT_TIMEOUT,
+                    read_timeout=settings.MERCADOPAGO_READ_TIMEOUT,
+                    max_retries=settings.MERCADOPAGO_MAX_RETRIES,
+                    backoff=settings.MERCADOPAGO_RETRY_BACKOFF,
+                    pool_size=settings.MERCADOPAGO_POOL_SIZE,
+                    pooled=settings.MERCADOPAGO_POOLING,
+                    breaker=CircuitBreaker(
+                        failure_threshold=settings.MERCADOPAGO_BREAKER_THRESHOLD,
+                        cooldown=settings.MERCADOPAGO_BREAKER_COOLDOWN,
+                    ),
+                )
+                _sdk = mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN, http_client=http_client)
+    return _sdk
+
+
+def reset_mp_sdk(http_client=None):
+    """
+    Descarta el SDK compartido (tests o cambio de settings en caliente).
+    Con `http_client` lo reemplaza por uno que use ese cliente (benchmarks con MP falso).
+    """
+    global _sdk
+    with _sdk_lock:
+        _sdk = None
+        if http_client is not None:
+            import mercadopago
+
+            _sdk = mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN or "fake-token", http_client=http_client)
 
 
 def _build_back_urls_for_match(match):
@@ -12,8 +85,8 @@ def _build_back_urls_for_match(match):
     Construye back_urls dinámicos:
     success/failure/pending -> {FRONT_BASE_URL}/{FRONT_MATCH_ROUTE}/{match_identifier}
     """
-    base = getattr(settings, "FRONT_BASE_URL", "").rstrip("/")
-    route = getattr(settings, "FRONT_MATCH_ROUTE", "/partido").strip("/")
+    base = (getattr(settings, "FRONT_BASE_URL", "") or "").rstrip("/")
+    route = (getattr(settings, "FRONT_MATCH_ROUTE", "") or "/partido").strip("/")
 
     if not base:
         return None  # sin base, no seteamos back_urls (MP no exige si no pones auto_return)
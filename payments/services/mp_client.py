@@ -0,0 +1,259 @@
+# payments/services/mp_client.py
+"""
+Cliente HTTP para el SDK de MercadoPago con:
+- una requests.Session por proceso (pool de conexiones + keep-alive)
+- timeouts por llamada (connect, read)
+- reintentos acotados con backoff exponencial y jitter; los POST llevan
+  X-Idempotency-Key (la misma en cada intento) para que un reintento tras un
+  timeout no cree una segunda Preference
+- circuit breaker que falla rápido cuando MP está degradado
+- contadores de latencia y errores (ver `mp_stats()` en mp.py)
+
+Se conecta al SDK vía `mercadopago.SDK(token, http_client=...)`, que ya
+soporta inyectar un HttpClient propio.
+"""
+import random
+import threading
+import time
+import uuid
+
+import requests
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+
+from .mp import MercadoPagoUnavailable
+
+MP_API_BASE_URL = "https://api.mercadopago.com"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+IDEMPOTENCY_HEADER = "X-Idempotency-Key"
+
+
+class CircuitBreaker:
+    """
+    Breaker clásico de tres estados:
+    - closed: deja pasar todo; cuenta fallos consecutivos
+    - open: rechaza sin llamar a MP durante `cooldown` segundos
+    - half-open: deja pasar una sola llamada de prueba; si sale bien cierra
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _state_locked(self, now) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state_locked(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # reabre (o abre) y reinicia el cooldown
+                self._opened_at = time.monotonic()
+
+
+class MPStats:
+    """Contadores en memoria del proceso (thread-safe)."""
+
+    # ventana de muestras para percentiles; acotada para no crecer sin límite
+    SAMPLE_SIZE = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.retries = 0
+            self.short_circuited = 0
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+            self._samples = []
+            self._cursor = 0
+
+    def observe(self, elapsed: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            if len(self._samples) < self.SAMPLE_SIZE:
+                self._samples.append(elapsed)
+            else:
+                self._samples[self._cursor] = elapsed
+                self._cursor = (self._cursor + 1) % self.SAMPLE_SIZE
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            calls = self.calls
+
+            def pct(p):
+                if not samples:
+                    return 0.0
+                return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+            return {
+                "calls": calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+                "latency_avg_ms": round(self.latency_total / calls * 1000, 3) if calls else 0.0,
+                "latency_p50_ms": round(pct(0.50) * 1000, 3),
+                "latency_p99_ms": round(pct(0.99) * 1000, 3),
+                "latency_max_ms": round(self.latency_max * 1000, 3),
+            }
+
+
+class PooledHttpClient(HttpClient):
+    """
+    Reimplementa `mercadopago.http.HttpClient` (get/post/put/delete)
+    reutilizando una única Session. Con `pooled=False` abre una Session por
+    llamada (comportamiento original del SDK), útil para comparar latencias.
+    """
+
+    def __init__(self, base_url: str = MP_API_BASE_URL, connect_timeout: float = 3.0,
+                 read_timeout: float = 10.0, max_retries: int = 2, backoff: float = 0.2,
+                 pool_size: int = 10, pooled: bool = True, breaker: CircuitBreaker = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.pooled = pooled
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = MPStats()
+        self._session = self._new_session() if pooled else None
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        # sin reintentos a nivel urllib3: los controlamos aquí (jitter + breaker)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _rewrite(self, url: str) -> str:
+        # el SDK arma las URLs con su base fija; aquí la cambiamos (p.ej. a un stand-in local)
+        if self.base_url != MP_API_BASE_URL and url.startswith(MP_API_BASE_URL):
+            return self.base_url + url[len(MP_API_BASE_URL):]
+        return url
+
+    def _sleep_backoff(self, attempt: int):
+        # "full jitter": uniforme entre 0 y backoff * 2^attempt
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _send(self, method, url, **kwargs):
+        if self.pooled:
+            return self._session.request(method, url, **kwargs)
+        with requests.Session() as session:
+            return session.request(method, url, **kwargs)
+
+    @staticmethod
+    def _with_idempotency_key(method, kwargs) -> dict:
+        """POST/PATCH: agrega X-Idempotency-Key si el llamador no la puso (una por llamada, no por intento)."""
+        headers = kwargs.get("headers") or {}
+        if method.upper() in IDEMPOTENT_METHODS or any(k.lower() == IDEMPOTENCY_HEADER.lower() for k in headers):
+            return kwargs
+        return {**kwargs, "headers": {**headers, IDEMPOTENCY_HEADER: uuid.uuid4().hex}}
+
+    def request(self, method, url, maxretries=None, timeout=None, **kwargs):
+        """
+        Mismo contrato que HttpClient.request: devuelve {"status": int, "response": dict|None}.
+        Ignora el `timeout`/`maxretries` del SDK (60s/3) y usa los del cliente.
+        """
+        if not self.breaker.allow():
+            self.stats.incr("short_circuited")
+            raise MercadoPagoUnavailable("MercadoPago no disponible (circuit breaker abierto)")
+
+        url = self._rewrite(url)
+        kwargs = self._with_idempotency_key(method, kwargs)
+        last_exc = None
+        api_result = None
+        recorded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.stats.incr("retries")
+                    self._sleep_backoff(attempt - 1)
+                started = time.perf_counter()
+                try:
+                    api_result = self._send(method, url, timeout=self.timeout, **kwargs)
+                except requests.RequestException as e:
+                    self.stats.observe(time.perf_counter() - started, ok=False)
+                    last_exc, api_result = e, None
+                    continue
+
+                failed = api_result.status_code in RETRY_STATUSES
+                self.stats.observe(time.perf_counter() - started, ok=not failed)
+                if not failed:
+                    break
+
+            recorded = True
+            if api_result is None or api_result.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+                if api_result is None:
+                    raise MercadoPagoUnavailable(f"MercadoPago sin respuesta: {last_exc}") from last_exc
+            else:
+                self.breaker.record_success()
+        finally:
+            if not recorded:
+                # error inesperado (no de requests): sin esto la prueba del half-open queda tomada
+                self.breaker.record_failure()
+
+        response = {"status": api_result.status_code, "response": None}
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                response["response"] = None
+        return response
+
+    def get(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("GET", url=url, headers=headers, params=params)
+
+    def post(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("POST", url=url, headers=headers, data=data, params=params)
+
+    def put(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("PUT", url=url, headers=headers, data=data, params=params)
+
+    def delete(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("DELETE", url=url, headers=headers, params=params)
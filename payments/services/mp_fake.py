@@ -0,0 +1,191 @@
+# payments/services/mp_fake.py
+"""
+MercadoPago falso para pruebas de carga y benchmarks (nunca en producción).
+
+- FakeMercadoPago: estado en memoria + reglas (latencia, tasa de fallos,
+  secuencia de estados por pago). Implementa lo que usamos del API real:
+  POST /checkout/preferences, GET /v1/payments/<id>, GET /v1/payments/search.
+- FakeHttpClient: HttpClient del SDK que resuelve en proceso (sin red).
+- FakeMPServer: servidor HTTP local con el mismo comportamiento; se apunta con
+  MP_API_BASE_URL=http://127.0.0.1:<port> (ver `manage.py fake_mp_server`).
+
+Para simular que el usuario paga: `fake.pay(external_reference)` (o
+POST /_fake/pay {"external_reference": ...}) devuelve el id del pago en MP,
+que es lo que llega al webhook como data.id.
+"""
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mercadopago.http import HttpClient
+
+
+def _parse_dt(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+class FakeMercadoPago:
+    """
+    Args:
+        latency: segundos por llamada (float) o rango (min, max) uniforme.
+        failure_rate: probabilidad de responder 500.
+        status_sequence: estados que devuelve GET /v1/payments/<id> en llamadas
+            sucesivas; el último se repite. p.ej. ("pending", "approved").
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, status_sequence=("approved",), seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.status_sequence = tuple(status_sequence)
+        self.preferences = {}
+        self.payments = {}
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    # ---- simulación ----
+    def _delay(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _fails(self) -> bool:
+        return bool(self.failure_rate) and self._random.random() < self.failure_rate
+
+    def pay(self, external_reference: str, status_sequence=None) -> str:
+        """El usuario paga en MP: crea el pago y devuelve su id."""
+        with self._lock:
+            pid = str(next(self._ids) + 10 ** 9)
+            self.payments[pid] = {
+                "id": pid,
+                "external_reference": external_reference,
+                "date_created": datetime.now(dt_timezone.utc).isoformat(),
+                "sequence": tuple(status_sequence or self.status_sequence),
+                "step": 0,
+            }
+        return pid
+
+    def _payment_view(self, p, advance: bool) -> dict:
+        seq = p["sequence"]
+        status = seq[min(p["step"], len(seq) - 1)]
+        if advance:
+            p["step"] += 1
+        return {"id": p["id"], "external_reference": p["external_reference"],
+                "status": status, "date_created": p["date_created"],
+                "date_last_updated": p["date_created"]}
+
+    # ---- API ----
+    def handle(self, method: str, path: str, params: dict = None, body=None):
+        """Devuelve (http_status, json_body)."""
+        params = params or {}
+        with self._lock:
+            self.calls += 1
+        self._delay()
+        if self._fails():
+            return 500, {"message": "fake failure"}
+
+        if method == "POST" and path == "/checkout/preferences":
+            data = json.loads(body) if isinstance(body, (str, bytes)) else (body or {})
+            with self._lock:
+                pref_id = f"fake-pref-{next(self._ids)}"
+                self.preferences[pref_id] = data
+            url = f"https://fake.mercadopago.local/checkout?pref_id={pref_id}"
+            return 201, {"id": pref_id, "init_point": url, "sandbox_init_point": url,
+                         "external_reference": data.get("external_reference")}
+
+        if method == "GET" and path == "/v1/payments/search":
+            return 200, self._search(params)
+
+        if method == "GET" and path.startswith("/v1/payments/"):
+            pid = path.rsplit("/", 1)[-1]
+            with self._lock:
+                p = self.payments.get(pid)
+                if not p:
+                    return 404, {"message": "payment not found"}
+                return 200, self._payment_view(p, advance=True)
+
+        if method == "POST" and path == "/_fake/pay":
+            data = json.loads(body) if isinstance(body, (str, bytes)) else (body or {})
+            return 201, {"id": self.pay(data["external_reference"], data.get("status_sequence"))}
+
+        return 404, {"message": f"fake MP: ruta no soportada {method} {path}"}
+
+    def _search(self, params) -> dict:
+        ref = params.get("external_reference")
+        begin = _parse_dt(params.get("begin_date"))
+        end = _parse_dt(params.get("end_date"))
+        limit = int(params.get("limit", 30))
+        offset = int(params.get("offset", 0))
+        with self._lock:
+            rows = [p for p in self.payments.values()
+                    if (not ref or p["external_reference"] == ref)
+                    and (not begin or _parse_dt(p["date_created"]) >= begin)
+                    and (not end or _parse_dt(p["date_created"]) <= end)]
+            page = [self._payment_view(p, advance=False) for p in rows[offset:offset + limit]]
+        return {"results": page, "paging": {"total": len(rows), "limit": limit, "offset": offset}}
+
+
+class FakeHttpClient(HttpClient):
+    """HttpClient del SDK que responde desde un FakeMercadoPago en proceso."""
+
+    def __init__(self, fake: FakeMercadoPago):
+        self.fake = fake
+
+    def request(self, method, url, maxretries=None, **kwargs):
+        parts = urlsplit(url)
+        params = {k: v for k, v in (kwargs.get("params") or {}).items()}
+        params.update({k: v[0] for k, v in parse_qs(parts.query).items()})
+        status, body = self.fake.handle(method, parts.path, params, kwargs.get("data"))
+        return {"status": status, "response": body}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, para que el pooling del cliente se note
+    disable_nagle_algorithm = True  # headers y body van en writes separados (evita +40ms de delayed ACK)
+
+    def _dispatch(self, method):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        status, payload = self.server.fake.handle(method, parts.path, params, body)
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeMPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fake: FakeMercadoPago, host="127.0.0.1", port=0):
+        self.fake = fake
+        super().__init__((host, port), _Handler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMPServer":
+        threading.Thread(target=self.serve_forever, name="fake-mp", daemon=True).start()
+        return self
@@ -0,0 +1,271 @@
+# payments/services/reconcile.py
+"""
+Reconciliación de pagos PENDING contra MP (para webhooks perdidos).
+
+- Recorre los Payment pendientes por id ascendente, en chunks.
+- MP se consulta por franjas fijas de date_created (SEARCH_SLICE), paginadas
+  de a SEARCH_PAGE_SIZE, y los resultados se cruzan localmente con las
+  external_reference del chunk dentro de [created_at, created_at + lookahead].
+  Cada franja se pide una sola vez por corrida aunque la usen varios chunks:
+  las llamadas a MP escalan con los pagos de MP en el rango, no con la
+  cantidad de pendientes (nada de una búsqueda por pago).
+- Las franjas se buscan con concurrencia acotada; la aplicación de estados es
+  secuencial y en orden, para que el checkpoint (último id procesado) sea
+  monotónico y una corrida interrumpida pueda reanudarse. Al terminar una
+  pasada completa el checkpoint se borra: la próxima corrida vuelve a empezar
+  desde el principio (un pago viejo pudo pagarse después del último recorrido).
+- Los cambios pasan por `apply_mp_status`, igual que el webhook. El reporte
+  son conteos; el detalle por pago se entrega a un callback (`on_item`) a
+  medida que se aplica, sin acumularlo en memoria.
+- También entran los EXPIRED creados dentro del lookahead: el sweeper pudo
+  expirar un pago que el usuario terminó pagando en MP con el webhook perdido;
+  un "approved" lo revive (apply_mp_status) y cualquier otro estado lo deja.
+"""
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from payments.api.models import Payment, PaymentStatus
+from .mp import mp_sdk
+from .transitions import apply_mp_status, target_status
+
+# MP limita el page size de /v1/payments/search
+SEARCH_PAGE_SIZE = 100
+# ancho de las franjas de date_created en que se recorre la búsqueda de MP
+SEARCH_SLICE = timedelta(hours=6)
+
+# prioridad para elegir entre varios intentos de pago con la misma external_reference
+_MP_RANK = {"approved": 4, "accredited": 4, "in_process": 3, "pending": 3,
+            "authorized": 3, "rejected": 1, "cancelled": 1}
+
+
+def load_checkpoint(path) -> int:
+    if not path or not Path(path).exists():
+        return 0
+    return int(json.loads(Path(path).read_text()).get("last_id", 0))
+
+
+def save_checkpoint(path, last_id: int):
+    if not path:
+        return
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "saved_at": timezone.now().isoformat()}))
+    tmp.replace(path)  # rename atómico
+
+
+def clear_checkpoint(path):
+    if path:
+        Path(path).unlink(missing_ok=True)
+
+
+RECONCILABLE = (PaymentStatus.PENDING, PaymentStatus.EXPIRED)
+
+
+def pending_chunks(chunk_size: int, after_id: int = 0, older_than: timedelta = timedelta(0),
+                   lookahead: timedelta = timedelta(0)):
+    """
+    Chunks de pagos pendientes y de expirados recientes (creados dentro del
+    lookahead). Keyset pagination por id; sin OFFSET.
+    """
+    now = timezone.now()
+    cutoff = now - older_than
+    candidates = Q(status=PaymentStatus.PENDING) | Q(status=PaymentStatus.EXPIRED, created_at__gte=now - lookahead)
+    last_id = after_id
+    while True:
+        chunk = list(
+            Payment.objects
+            .filter(candidates, id__gt=last_id, created_at__lte=cutoff)
+            .order_by("id")
+            .values("id", "status", "external_reference", "created_at")[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]["id"]
+
+
+def _best(current, candidate):
+    if current is None:
+        return candidate
+    key = lambda r: (_MP_RANK.get(r.get("status"), 0), r.get("date_last_updated") or "")
+    return candidate if key(candidate) > key(current) else current
+
+
+def _parse_mp_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def search_slice(begin, end) -> dict:
+    """
+    Todos los pagos de MP creados en [begin, end], paginados de a
+    SEARCH_PAGE_SIZE. Devuelve {external_reference: [pago_mp, ...]} solo con
+    los campos que usa la reconciliación.
+    """
+    payments_api = mp_sdk().payment()
+    by_ref, offset = {}, 0
+    while True:
+        resp = payments_api.search(filters={
+            "range": "date_created",
+            "begin_date": begin.isoformat(),
+            "end_date": end.isoformat(),
+            "sort": "date_created",
+            "criteria": "asc",
+            "limit": SEARCH_PAGE_SIZE,
+            "offset": offset,
+        })
+        if resp.get("status") != 200:
+            raise RuntimeError(f"MercadoPago search error {resp.get('status')}: {resp.get('response')}")
+        body = resp.get("response") or {}
+        results = body.get("results") or []
+        for r in results:
+            if r.get("external_reference"):
+                by_ref.setdefault(r["external_reference"], []).append(
+                    {key: r.get(key) for key in ("id", "status", "date_created", "date_last_updated")})
+
+        offset += len(results)
+        total = (body.get("paging") or {}).get("total", 0)
+        if not results or offset >= total:
+            return by_ref
+
+
+class SearchWindows:
+    """
+    Franjas fijas de date_created (alineadas a `slice_size`) buscadas una sola
+    vez por corrida y compartidas entre chunks: la ventana de un pago
+    [created_at, created_at + lookahead] cubre varias franjas y las de pagos
+    vecinos se repiten, pero cada franja se pagina en MP una sola vez.
+    """
+
+    def __init__(self, pool, lookahead: timedelta, slice_size: timedelta = SEARCH_SLICE, now=None):
+        self.pool = pool
+        self.lookahead = lookahead
+        self.slice_size = slice_size
+        self.now = now or timezone.now()
+        self._slices = {}  # inicio de franja -> Future con {external_reference: [pagos]}
+
+    def _start_of(self, moment):
+        step = self.slice_size.total_seconds()
+        return datetime.fromtimestamp(moment.timestamp() // step * step, tz=dt_timezone.utc)
+
+    def _starts(self, row):
+        start = self._start_of(row["created_at"])
+        end = min(row["created_at"] + self.lookahead, self.now)
+        while start <= end:
+            yield start
+            start += self.slice_size
+
+    def prefetch(self, chunk) -> list:
+        """Encola en el pool las franjas que el chunk necesita y aún no se pidieron."""
+        futures = {}
+        for row in chunk:
+            for start in self._starts(row):
+                if start not in self._slices:
+                    end = min(start + self.slice_size - timedelta(milliseconds=1), self.now)
+                    self._slices[start] = self.pool.submit(search_slice, start, end)
+                futures[start] = self._slices[start]
+        return list(futures.values())
+
+    def match(self, chunk) -> dict:
+        """{external_reference: mejor pago_mp} dentro de la ventana de cada pago del chunk."""
+        found = {}
+        for row in chunk:
+            ref, begin = row["external_reference"], row["created_at"]
+            end = min(begin + self.lookahead, self.now)
+            best = None
+            for start in self._starts(row):
+                if start not in self._slices:  # descartada antes de tiempo: se vuelve a pedir
+                    self.prefetch([row])
+                for mp in self._slices[start].result().get(ref, ()):
+                    if begin <= _parse_mp_date(mp["date_created"]) <= end:
+                        best = _best(best, mp)
+            if best:
+                found[ref] = best
+        return found
+
+    def evict_before(self, moment):
+        """Suelta las franjas que terminan antes de `moment` (ningún chunk siguiente las usa)."""
+        for start in [s for s in self._slices if s + self.slice_size <= moment]:
+            del self._slices[start]
+
+
+def apply_chunk(chunk, found: dict, dry_run: bool, counts: Counter, on_item=None):
+    for row in chunk:
+        mp = found.get(row["external_reference"])
+        if not mp:
+            counts["not_found"] += 1
+            continue
+
+        mp_status = mp.get("status")
+        if dry_run:
+            would_be = target_status(mp_status)
+            if row["status"] == PaymentStatus.EXPIRED and would_be == PaymentStatus.PENDING:
+                would_be = PaymentStatus.EXPIRED  # solo lo revive un aprobado
+            counts[f"{row['status']}->{would_be}"] += 1
+            if on_item:
+                on_item({"id": row["id"], "external_reference": row["external_reference"],
+                         "mp_payment_id": mp.get("id"), "mp_status": mp_status, "would_be": would_be})
+            continue
+
+        with transaction.atomic():
+            # mismo lock que el webhook; si ya lo resolvió, no lo tocamos
+            payment = Payment.objects.select_for_update().filter(pk=row["id"]).first()
+            if not payment or payment.status not in RECONCILABLE:
+                counts["skipped_resolved"] += 1
+                continue
+            previous = payment.status
+            result = apply_mp_status(payment, mp.get("id"), mp_status)
+        counts[f"{previous}->{result['status']}"] += 1
+        if on_item:
+            on_item({"id": row["id"], "external_reference": row["external_reference"],
+                     "mp_payment_id": mp.get("id"), "mp_status": mp_status, "status": result["status"]})
+
+
+def reconcile_pending(chunk_size=500, concurrency=4, dry_run=False, checkpoint=None,
+                      older_than=timedelta(minutes=15), lookahead=timedelta(days=2), log=None,
+                      on_item=None) -> dict:
+    """
+    Ejecuta la reconciliación completa. Devuelve los conteos; cada pago con
+    resultado en MP se entrega a `on_item` a medida que se aplica (no se
+    acumulan en memoria).
+    """
+    after_id = load_checkpoint(checkpoint)
+    counts = Counter()
+    chunks = pending_chunks(chunk_size, after_id, older_than, lookahead)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mp-reconcile") as pool:
+        windows = SearchWindows(pool, lookahead)
+        # como mucho `concurrency` chunks leídos por delante del que se aplica
+        window = []
+        for chunk in chunks:
+            window.append((chunk, windows.prefetch(chunk)))
+            if len(window) < concurrency:
+                continue
+            after_id = _drain_one(window, windows, dry_run, counts, checkpoint, log, on_item)
+        while window:
+            after_id = _drain_one(window, windows, dry_run, counts, checkpoint, log, on_item)
+
+    if not dry_run:
+        clear_checkpoint(checkpoint)  # pasada completa: la próxima empieza de cero
+    return {"dry_run": dry_run, "last_id": after_id, "counts": dict(counts)}
+
+
+def _drain_one(window, windows, dry_run, counts, checkpoint, log, on_item) -> int:
+    chunk, futures = window.pop(0)
+    for future in futures:
+        future.result()
+    apply_chunk(chunk, windows.match(chunk), dry_run, counts, on_item)
+    counts["scanned"] += len(chunk)
+    if window:
+        windows.evict_before(min(row["created_at"] for pending, _ in window for row in pending))
+    last_id = chunk[-1]["id"]
+    if not dry_run:
+        save_checkpoint(checkpoint, last_id)
+    if log:
+        log(f"hasta id={last_id}: {dict(counts)}")
+    return last_id
@@ -0,0 +1,71 @@
+# payments/services/transitions.py
+"""
+Transiciones de estado de un Payment a partir del estado reportado por MP.
+Las usan el webhook y el job de reconciliación, para que ambos caminos
+resuelvan igual (join_match, FAILED_CAPACITY, idempotencia).
+"""
+from matches.api.models import Enrollment
+from matches.services.enrollments import join_match
+from payments.api.models import Payment, PaymentStatus
+
+FINAL_STATUSES = (PaymentStatus.APPROVED, PaymentStatus.FAILED_CAPACITY, PaymentStatus.REJECTED)
+MP_APPROVED = ("approved", "accredited")
+MP_REJECTED = ("rejected", "cancelled")
+
+
+def apply_mp_status(payment: Payment, mp_payment_id, mp_status: str) -> dict:
+    """
+    Aplica el estado de MP sobre un Payment ya bloqueado (select_for_update).
+    Devuelve {"status": ..., "note": ...?} para la respuesta del webhook.
+    """
+    # Idempotencia: si ya resolvimos definitivamente este pago, solo sincronizamos campos de MP
+    if payment.status in FINAL_STATUSES:
+        payment.mp_payment_id = str(mp_payment_id)
+        payment.mp_status = mp_status
+        payment.save(update_fields=["mp_payment_id", "mp_status", "updated_at"])
+        return {"status": payment.status}
+
+    # Actualizamos campos MP del Payment
+    payment.mp_payment_id = str(mp_payment_id)
+    payment.mp_status = mp_status
+
+    # Expirado por el sweeper: solo lo revive un pago aprobado (el usuario sí pagó).
+    # Volver a PENDING podría chocar con un pendiente nuevo del mismo (user, match).
+    if payment.status == PaymentStatus.EXPIRED and mp_status not in MP_APPROVED:
+        if mp_status in MP_REJECTED:
+            payment.status = PaymentStatus.REJECTED
+        payment.save(update_fields=["status", "mp_payment_id", "mp_status", "updated_at"])
+        return {"status": payment.status}
+
+    if mp_status in MP_APPROVED:
+        # Regla: si YA está inscrito, no volvemos a inscribir.
+        if Enrollment.objects.filter(user=payment.user, match_id=payment.match_id, is_active=True).exists():
+            payment.status = PaymentStatus.APPROVED
+            payment.save(update_fields=["status", "mp_payment_id", "mp_status", "updated_at"])
+            return {"status": payment.status, "note": "already_enrolled"}
+
+        # Caso normal: inscribir (respeta cupos e idempotencia interna)
+        try:
+            join_match(payment.user, payment.match_id)
+            payment.status = PaymentStatus.APPROVED
+        except Exception:
+            # si no hay cupos u otra validación del join falla
+            payment.status = PaymentStatus.FAILED_CAPACITY
+
+    elif mp_status in MP_REJECTED:
+        payment.status = PaymentStatus.REJECTED
+    else:
+        # pending / in_process / otros
+        payment.status = PaymentStatus.PENDING
+
+    payment.save()
+    return {"status": payment.status}
+
+
+def target_status(mp_status: str) -> str:
+    """Estado local al que llevaría `mp_status` (sin tocar la BD; para dry-run)."""
+    if mp_status in MP_APPROVED:
+        return PaymentStatus.APPROVED
+    if mp_status in MP_REJECTED:
+        return PaymentStatus.REJECTED
+    return PaymentStatus.PENDING
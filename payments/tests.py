@@ -1,3 +1,190 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import City, District, SessionToken
+from matches.models import Location, Match, MatchStatus
+from payments.models import Payment, PaymentStatus
+from payments.services import checkout, reconcile
+from payments.services.mp import reset_mp_sdk
+from payments.services.mp_fake import FakeHttpClient, FakeMercadoPago
+
+User = get_user_model()
+
+
+# TransactionTestCase: sin el atomic de TestCase no hay SAVEPOINTs y se cuentan las mismas
+# queries que en producción. Caché de tokens apagada: la autenticación es siempre 1 SELECT.
+# No se cuentan BEGIN/COMMIT (SQLite los manda como sentencias; psycopg no).
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK")
+
+
+class PaymentsTestCase(TransactionTestCase):
+    """Dos partidos publicados, un jugador con token y MP falso."""
+
+    def setUp(self):
+        reset_mp_sdk(FakeHttpClient(FakeMercadoPago()))
+        district = District.objects.create(city=City.objects.create(name="Lima"), name="Miraflores")
+        location = Location.objects.create(district=district, field_name="Cancha", address="Av. 1")
+        self.match = self._match(location)
+        self.other_match = self._match(location)
+        self.user = User.objects.create_user("jugador", email="jugador@example.com", password="x",
+                                             document_number="12345678")
+        self.token = uuid.uuid4().hex
+        SessionToken.objects.create(user=self.user, document_number=self.user.document_number,
+                                    device_id="d1", token=self.token)
+
+    def tearDown(self):
+        reset_mp_sdk()
+
+    @staticmethod
+    def _match(location):
+        return Match.objects.create(location=location, start_at=timezone.now() + timedelta(days=2),
+                                    capacity=10, price_amount=20, status=MatchStatus.PUBLISHED)
+
+
+@override_settings(PAYMENTS_ASYNC_CHECKOUT=False, AUTH_TOKEN_CACHE_ENABLED=False, PUBLIC_BASE_URL=None)
+class CheckoutQueryCountTests(PaymentsTestCase):
+    AUTH = 1  # SessionToken + usuario (select_related)
+
+    def _checkout(self, match, key=""):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        if key:
+            headers["Idempotency-Key"] = key
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("payments-checkout"),
+                                        {"match_identifier": str(match.match_identifier)},
+                                        content_type="application/json", headers=headers, secure=True)
+        queries = [q for q in ctx.captured_queries if q["sql"].upper() not in _TRANSACTION_CONTROL]
+        return response, len(queries)
+
+    def test_new_checkout(self):
+        response, queries = self._checkout(self.match, key="tap-1")
+        self.assertEqual(response.status_code, 200, response.content)
+        # elegibilidad (1 consulta anotada) + INSERT con external_reference + UPDATE de la Preference
+        self.assertEqual(queries, self.AUTH + 3)
+        payment = Payment.objects.get()
+        self.assertEqual(payment.external_reference, str(payment.public_id))
+        self.assertTrue(payment.init_point)
+
+    def test_existing_pending_is_reused_without_extra_queries(self):
+        first, _ = self._checkout(self.match)
+        response, queries = self._checkout(self.match)
+        self.assertEqual(response.status_code, 200)
+        # el pendiente sale de la misma consulta de elegibilidad
+        self.assertEqual(queries, self.AUTH + 1)
+        self.assertEqual(response.json()["data"]["public_id"], first.json()["data"]["public_id"])
+        self.assertEqual(response.json()["data"]["init_point"], first.json()["data"]["init_point"])
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_idempotent_replay_returns_same_payment(self):
+        first, _ = self._checkout(self.match, key="tap-1")
+        response, queries = self._checkout(self.match, key="tap-1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, self.AUTH + 2)  # elegibilidad + el Payment a devolver
+        self.assertEqual(response.json()["data"]["public_id"], first.json()["data"]["public_id"])
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_idempotency_key_reused_for_other_match(self):
+        self._checkout(self.match, key="tap-1")
+        response, queries = self._checkout(self.other_match, key="tap-1")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(queries, self.AUTH + 2)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_expired_pending_is_replaced(self):
+        self._checkout(self.match)
+        Payment.objects.update(created_at=timezone.now() - timedelta(days=1))
+        response, queries = self._checkout(self.match)
+        self.assertEqual(response.status_code, 200)
+        # elegibilidad + UPDATE a EXPIRED + INSERT + UPDATE de la Preference
+        self.assertEqual(queries, self.AUTH + 4)
+        self.assertEqual(Payment.objects.filter(status=PaymentStatus.EXPIRED).count(), 1)
+        self.assertEqual(Payment.objects.filter(status=PaymentStatus.PENDING).count(), 1)
+
+
+@override_settings(PAYMENTS_ASYNC_CHECKOUT=True, AUTH_TOKEN_CACHE_ENABLED=False, PUBLIC_BASE_URL=None)
+class AsyncPreferenceTests(PaymentsTestCase):
+
+    def _pending(self, match=None, **fields):
+        return Payment.objects.create(user=self.user, match=match or self.match, amount=20,
+                                      external_reference=uuid.uuid4().hex, **fields)
+
+    def _status(self, payment):
+        return self.client.get(reverse("payments-status", args=[payment.public_id]),
+                               headers={"Authorization": f"Bearer {self.token}"}, secure=True)
+
+    def test_status_answers_immediately_with_retry_after(self):
+        response = self._status(self._pending())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Retry-After"], "1")
+        response = self._status(self._pending(self.other_match, preference_error="MP caído"))
+        self.assertFalse(response.has_header("Retry-After"))
+
+    def test_unexpected_error_is_persisted(self):
+        payment = self._pending()
+        with mock.patch.object(checkout, "apply_preference", side_effect=RuntimeError("boom")), \
+                self.assertLogs(checkout.logger, "ERROR"):
+            checkout.build_preference(payment.pk, "")
+        payment.refresh_from_db()
+        self.assertEqual(payment.preference_error, "boom")
+        self.assertNotIn(payment.pk, checkout._in_flight)
+
+    def test_resubmit_clears_previous_error(self):
+        payment = self._pending(preference_error="MP caído")
+        with mock.patch.object(checkout, "_get_executor") as executor:
+            self.assertTrue(checkout.submit_preference(payment))
+        executor.return_value.submit.assert_called_once()
+        checkout._in_flight.discard(payment.pk)
+        payment.refresh_from_db()
+        self.assertEqual(payment.preference_error, "")
+
+
+class ReconcileAtScaleTests(PaymentsTestCase):
+    """50k pendientes contra el MP falso: búsquedas por franja, no una por pago."""
+    USERS, MATCHES = 250, 200  # 50k pares (user, match): un pendiente por par
+
+    def setUp(self):
+        super().setUp()
+        self.fake = FakeMercadoPago()
+        reset_mp_sdk(FakeHttpClient(self.fake))
+        users = User.objects.bulk_create(
+            User(username=f"u{i}", email=f"u{i}@example.com", password="!", document_number=f"{i:08d}")
+            for i in range(self.USERS))
+        matches = Match.objects.bulk_create(
+            Match(location=self.match.location, start_at=self.match.start_at, capacity=10,
+                  price_amount=20, status=MatchStatus.PUBLISHED) for _ in range(self.MATCHES))
+        refs = [uuid.uuid4() for _ in range(self.USERS * self.MATCHES)]
+        Payment.objects.bulk_create(
+            (Payment(user=user, match=match, amount=20, public_id=ref, external_reference=str(ref))
+             for ref, (user, match) in zip(refs, ((u, m) for u in users for m in matches))),
+            batch_size=2000)
+        Payment.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        # el usuario pagó en MP una parte de los pendientes; el webhook nunca llegó
+        self.rejected = [str(ref) for ref in refs[::100]]
+        self.in_process = [str(ref) for ref in refs[50::100]]
+        for ref in self.rejected:
+            self.fake.pay(ref, ("rejected",))
+        for ref in self.in_process:
+            self.fake.pay(ref, ("in_process",))
+
+    def test_searches_scale_with_mp_payments_not_pending_rows(self):
+        items = []
+        report = reconcile.reconcile_pending(chunk_size=500, concurrency=4, older_than=timedelta(0),
+                                             on_item=items.append)
+
+        counts = report["counts"]
+        self.assertEqual(counts["scanned"], 50_000)
+        self.assertEqual(counts["pending->rejected"], len(self.rejected))
+        self.assertEqual(counts["pending->pending"], len(self.in_process))
+        self.assertEqual(counts["not_found"], 50_000 - len(self.rejected) - len(self.in_process))
+        self.assertEqual(Payment.objects.filter(status=PaymentStatus.REJECTED).count(), len(self.rejected))
+        self.assertEqual(len(items), len(self.rejected) + len(self.in_process))
+        # 1000 pagos en MP = 10 páginas por franja; una búsqueda por pago serían 50k
+        self.assertLess(self.fake.calls, 50)
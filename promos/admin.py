@@ -1,21 +1,35 @@
 from django.contrib import admin
 
-from .models import Banner, Sponsor
+from .models import Banner, PromoCounter, Sponsor
 
 
 @admin.register(Banner)
 class BannerAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "order", "is_active")
+    list_display = ("id", "title", "order", "is_active", "starts_at", "ends_at")
     list_editable = ("order", "is_active")
     search_fields = ("title", "description", "path")
-    list_filter = ("is_active",)
+    list_filter = ("is_active", "starts_at", "ends_at")
     ordering = ("order", "id")
 
 
 @admin.register(Sponsor)
 class SponsorAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "order", "is_active")
+    list_display = ("id", "title", "order", "is_active", "starts_at", "ends_at")
     list_editable = ("order", "is_active")
     search_fields = ("title",)
-    list_filter = ("is_active",)
+    list_filter = ("is_active", "starts_at", "ends_at")
     ordering = ("order", "id")
+
+
+@admin.register(PromoCounter)
+class PromoCounterAdmin(admin.ModelAdmin):
+    # Lo escribe el buffer de eventos (promos/services/events.py)
+    list_display = ("hour", "kind", "promo_id", "impressions", "clicks")
+    list_filter = ("kind",)
+    date_hierarchy = "hour"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,5 +1,6 @@
 # promos/api/models.py
 from django.db import models
+from django.db.models import Q
 
 
 class Banner(models.Model):
@@ -9,6 +10,9 @@ class Banner(models.Model):
     path = models.CharField(max_length=300, blank=True)
     order = models.PositiveIntegerField(default=0, db_index=True)
     is_active = models.BooleanField(default=True)
+    # ventana de publicación (NULL = sin límite); se muestra si is_active y starts_at <= ahora < ends_at
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -17,6 +21,7 @@ class Banner(models.Model):
         ordering = ["order", "id"]
         indexes = [
             models.Index(fields=["is_active", "order"]),
+            models.Index(fields=["ends_at", "starts_at"], condition=Q(is_active=True), name="banner_active_window_idx"),
         ]
 
     def __str__(self):
@@ -28,6 +33,9 @@ class Sponsor(models.Model):
     image_url = models.URLField(max_length=500)
     order = models.PositiveIntegerField(default=0, db_index=True)
     is_active = models.BooleanField(default=True)
+    # ventana de publicación (NULL = sin límite); se muestra si is_active y starts_at <= ahora < ends_at
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -36,7 +44,38 @@ class Sponsor(models.Model):
         ordering = ["order", "id"]
         indexes = [
             models.Index(fields=["is_active", "order"]),
+            models.Index(fields=["ends_at", "starts_at"], condition=Q(is_active=True), name="sponsor_active_window_idx"),
         ]
 
     def __str__(self):
         return f"[{self.order}] {self.title}"
+
+
+class PromoKind(models.TextChoices):
+    BANNER = "banner", "Banner"
+    SPONSOR = "sponsor", "Sponsor"
+
+
+class PromoCounter(models.Model):
+    """
+    Impresiones y clics por promo y por hora. Se escribe en lotes desde el
+    buffer en memoria de promos/services/events.py (upsert que suma), nunca
+    una fila por evento.
+    """
+    kind = models.CharField(max_length=10, choices=PromoKind.choices)
+    promo_id = models.PositiveIntegerField()  # Banner.id o Sponsor.id según kind
+    hour = models.DateTimeField()  # inicio de la hora (UTC)
+    impressions = models.PositiveBigIntegerField(default=0)
+    clicks = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-hour", "kind", "promo_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "promo_id", "hour"], name="uniq_promo_counter_hour"),
+        ]
+        indexes = [
+            models.Index(fields=["hour"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.promo_id} @ {self.hour:%Y-%m-%d %H}h | {self.impressions}/{self.clicks}"
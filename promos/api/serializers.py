@@ -9,7 +9,7 @@ class BannerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Banner
-        fields = ("image", "title", "description", "path", "order", "is_active")
+        fields = ("id", "image", "title", "description", "path", "order", "is_active")
 
 
 class SponsorSerializer(serializers.ModelSerializer):
@@ -17,4 +17,4 @@ class SponsorSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Sponsor
-        fields = ("title", "image", "order", "is_active")
+        fields = ("id", "title", "image", "order", "is_active")
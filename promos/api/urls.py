@@ -1,8 +1,10 @@
 # promos/api/urls.py
 from django.urls import path
 
-from promos.api.views import PublicPromosView
+from promos.api.views import PromoEventsView, PromoReportView, PublicPromosView
 
 urlpatterns = [
     path("promos", PublicPromosView.as_view(), name="public-promos"),
+    path("promos/events", PromoEventsView.as_view(), name="promos-events"),
+    path("promos/report", PromoReportView.as_view(), name="promos-report"),
 ]
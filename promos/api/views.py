@@ -1,22 +1,99 @@
 # promos/api/views.py
-from rest_framework.permissions import AllowAny
+from django.conf import settings
+from django.db.models import Sum
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.views import APIView
 
-from config.responses import ok
-from promos.api.models import Banner, Sponsor
-from promos.api.serializers import BannerSerializer, SponsorSerializer
+from accounts.utils.authentication import DeviceTokenAuthentication
+from config.db_router import read_replica
+from config.exports import parse_range
+from config.query_budget import query_budget
+from config.responses import ok, error
+from promos.api.models import Banner, PromoCounter, PromoKind, Sponsor
+from promos.services.events import ingest
+from promos.services.payload import promos_payload
 
 
+@query_budget(get=2)
 class PublicPromosView(APIView):
+    """
+    GET /api/promos
+    Sirve bytes precalculados (promos/services/payload.py): sin BD ni serializers
+    por request. ETag = hash del payload; con If-None-Match responde 304.
+    """
+    authentication_classes = []  # público: no resolver el token en cada arranque de la app
     permission_classes = [AllowAny]
 
     def get(self, request):
-        banners_qs = Banner.objects.filter(is_active=True).order_by("order", "id")
-        sponsors_qs = Sponsor.objects.filter(is_active=True).order_by("order", "id")
+        tag, body = promos_payload()
+        etag = f'"{tag}"'
+        # comparación débil: comprimida, la respuesta sale con W/"..." (config/compression.py)
+        sent = {t.strip().removeprefix("W/") for t in request.headers.get("If-None-Match", "").split(",")}
+        if etag in sent:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        return response
 
-        data = {
-            "banners": BannerSerializer(banners_qs, many=True).data,
-            "sponsors": SponsorSerializer(sponsors_qs, many=True).data,
-        }
 
-        return ok(data, message="Promos")
+@query_budget(post=3)
+class PromoEventsView(APIView):
+    """
+    POST /api/promos/events
+    {"events": [{"kind": "banner", "id": 3, "type": "impression", "ts": 1767225600}, ...]}
+    Se agregan en memoria y se guardan en lote (PromoCounter); responde 202.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        if not isinstance(events, list):
+            return error("Se espera {'events': [...]}")
+        if len(events) > settings.PROMOS_EVENTS_MAX_BATCH:
+            return error(f"Máximo {settings.PROMOS_EVENTS_MAX_BATCH} eventos por request")
+        return ok(ingest(events), message="Eventos recibidos", status_code=status.HTTP_202_ACCEPTED)
+
+
+@read_replica
+@query_budget(get=3)
+class PromoReportView(APIView):
+    """
+    GET /api/promos/report?from=YYYY-MM-DD&to=YYYY-MM-DD&kind=banner|sponsor  (staff)
+    Lee los contadores por hora ya agregados; no hay una fila por evento.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        kind = request.query_params.get("kind") or None
+        try:
+            start, end = parse_range(request.query_params.get("from"), request.query_params.get("to"))
+        except ValueError:
+            return error("Parámetros inválidos")
+        if kind and kind not in PromoKind.values:
+            return error("Parámetros inválidos")
+
+        qs = PromoCounter.objects.all()
+        if kind:
+            qs = qs.filter(kind=kind)
+        if start:
+            qs = qs.filter(hour__gte=start)
+        if end:
+            qs = qs.filter(hour__lte=end)
+        rows = list(qs.values("kind", "promo_id")
+                    .annotate(impressions=Sum("impressions"), clicks=Sum("clicks"))
+                    .order_by("-impressions"))
+
+        titles = {PromoKind.BANNER: {}, PromoKind.SPONSOR: {}}
+        for model, k in ((Banner, PromoKind.BANNER), (Sponsor, PromoKind.SPONSOR)):
+            wanted = [r["promo_id"] for r in rows if r["kind"] == k]
+            if wanted:
+                titles[k] = dict(model.objects.filter(pk__in=wanted).values_list("id", "title"))
+        for r in rows:
+            r["title"] = titles[r["kind"]].get(r["promo_id"], "")
+            r["ctr"] = round(r["clicks"] / r["impressions"], 4) if r["impressions"] else None
+        return ok(rows, message="Reporte de promos")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promos', '0002_promo_windows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromoCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('banner', 'Banner'), ('sponsor', 'Sponsor')], max_length=10)),
+                ('promo_id', models.PositiveIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-hour', 'kind', 'promo_id'],
+                'indexes': [models.Index(fields=['hour'], name='promos_prom_hour_1f7868_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'promo_id', 'hour'), name='uniq_promo_counter_hour')],
+            },
+        ),
+    ]
@@ -0,0 +1,175 @@
+# promos/services/events.py
+"""
+Impresiones y clics de banners/sponsors.
+
+El cliente manda eventos en lote; aquí se validan contra las promos vigentes
+(sin BD: ids del payload en memoria) y se suman en un dict por
+(tipo, id, hora). El buffer se vuelca con un upsert que SUMA
+(INSERT ... ON CONFLICT DO UPDATE SET x = x + excluded.x) desde un hilo del
+worker cada PROMOS_EVENTS_FLUSH_INTERVAL segundos (haya tráfico o no), desde
+la request que lo llena y al apagar el worker. La escritura escala con
+(promos × horas), no con eventos.
+
+Si el upsert falla (BD caída, timeout) las filas vuelven al buffer y se
+reintentan en el próximo volcado; los volcados disparados por una request no
+le pasan el error al cliente y esperan un intervalo antes de reintentar.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from promos.api.models import PromoCounter
+from promos.services.payload import promo_ids
+
+EVENT_TYPES = {"impression": 0, "click": 1}
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    def __init__(self, max_keys: int, interval: float):
+        self.max_keys = max_keys
+        self.interval = interval
+        self._counts = {}
+        self._retry_at = 0.0  # tras un volcado fallido, la request no reintenta antes de esto
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _add(self, counts: dict):
+        for key, (imp, clk) in counts.items():
+            current = self._counts.get(key)
+            if current is None:
+                self._counts[key] = [imp, clk]
+            else:
+                current[0] += imp
+                current[1] += clk
+
+    def merge(self, counts: dict):
+        """Suma los contadores ya agregados de una request (un solo lock por lote)."""
+        with self._lock:
+            self._add(counts)
+            due = len(self._counts) >= self.max_keys and time.monotonic() >= self._retry_at
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+        if due:
+            self._safe_flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+        rows = [
+            (kind, promo_id, datetime.fromtimestamp(hour, tz=dt_timezone.utc), imp, clk)
+            for (kind, promo_id, hour), (imp, clk) in counts.items()
+        ]
+        try:
+            upsert_counters(rows)
+        except Exception:
+            with self._lock:
+                self._add(counts)  # vuelven al buffer: se reintentan en el próximo volcado
+                self._retry_at = time.monotonic() + self.interval
+            raise
+        self._retry_at = 0.0  # la BD volvió: las requests pueden volcar de nuevo
+        return len(rows)
+
+    def _safe_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudieron volcar los eventos de promos (%s claves en el buffer)", len(self))
+
+    def _start_flusher(self):
+        # por pid: con gunicorn --preload el hilo del master no sobrevive al fork
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="promo-events-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            self._safe_flush()
+            # el hilo no pasa por request_finished: como en el checkout, CONN_MAX_AGE/pool se respetan aquí
+            close_old_connections()
+
+    def __len__(self):
+        return len(self._counts)
+
+
+def upsert_counters(rows, batch_size=500):
+    """rows: [(kind, promo_id, hour, impressions, clicks)]; suma sobre lo existente."""
+    qn = connection.ops.quote_name
+    table = qn(PromoCounter._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))
+            params = [connection.ops.adapt_datetimefield_value(v) if isinstance(v, datetime) else v
+                      for row in batch for v in row]
+            cursor.execute(
+                f"INSERT INTO {table} ({qn('kind')}, {qn('promo_id')}, {qn('hour')}, "
+                f"{qn('impressions')}, {qn('clicks')}) VALUES {values} "
+                f"ON CONFLICT ({qn('kind')}, {qn('promo_id')}, {qn('hour')}) DO UPDATE SET "
+                f"{qn('impressions')} = {table}.{qn('impressions')} + excluded.{qn('impressions')}, "
+                f"{qn('clicks')} = {table}.{qn('clicks')} + excluded.{qn('clicks')}",
+                params,
+            )
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def event_buffer() -> EventBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = EventBuffer(settings.PROMOS_EVENTS_BUFFER_KEYS, settings.PROMOS_EVENTS_FLUSH_INTERVAL)
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def ingest(events) -> dict:
+    """
+    events: [{"kind": "banner"|"sponsor", "id": 3, "type": "impression"|"click", "ts": epoch?}, ...]
+    `ts` (opcional) ubica el evento en su hora si no es futuro ni más viejo que PROMOS_EVENTS_MAX_AGE.
+    """
+    ids = promo_ids()
+    now = time.time()
+    oldest = now - settings.PROMOS_EVENTS_MAX_AGE
+    hour_now = int(now // 3600 * 3600)
+    counts, rejected = {}, 0
+
+    for e in events:
+        try:
+            kind, promo_id, idx = e["kind"], e["id"], EVENT_TYPES[e["type"]]
+            if promo_id not in ids[kind]:
+                raise KeyError(promo_id)
+        except (KeyError, TypeError):
+            rejected += 1
+            continue
+        ts = e.get("ts")
+        hour = int(ts // 3600 * 3600) if isinstance(ts, (int, float)) and oldest <= ts <= now else hour_now
+        key = (kind, promo_id, hour)
+        c = counts.get(key)
+        if c is None:
+            c = counts[key] = [0, 0]
+        c[idx] += 1
+
+    if counts:
+        event_buffer().merge(counts)
+    return {"accepted": len(events) - rejected, "rejected": rejected}
+
+
+def flush_events() -> int:
+    return event_buffer().flush() if _buffer is not None else 0
@@ -0,0 +1,141 @@
+# promos/services/payload.py
+"""
+Respuesta de /api/promos precalculada en memoria del proceso.
+
+Banners y sponsors cambian muy rara vez, así que se guarda la respuesta YA
+renderizada (bytes) junto con un sello de versión. La versión vigente vive en
+el alias de Django cache PROMOS_CACHE_ALIAS; cada save/delete de Banner o
+Sponsor (admin, list_editable, shell) la reemplaza por una nueva.
+
+Solo si ese alias es compartido (CACHE_URL: Redis o BD) el cambio llega a
+todos los workers de gunicorn. Con la LocMemCache por defecto solo se entera
+el worker que escribió; los demás reconstruyen cuando su payload cumple
+PROMOS_LOCAL_MAX_AGE segundos, así que ese es el atraso máximo.
+
+La versión compartida se consulta como mucho cada PROMOS_VERSION_CHECK_INTERVAL
+segundos; entre chequeos la request no toca ni la BD ni la caché.
+
+Ventanas (starts_at/ends_at): el payload vale hasta el próximo inicio o fin de
+alguna campaña, así una campaña entra/sale exactamente a su hora y cada worker
+reconstruye una sola vez en el borde (no una consulta por request).
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from config.caches import is_shared
+from promos.api.models import Banner, Sponsor
+from promos.api.serializers import BannerSerializer, SponsorSerializer
+
+_VERSION_KEY = "promos:version"
+
+
+def scheduled(model, now):
+    """
+    (vigentes, próximo borde) con UNA consulta: filas activas que aún no
+    terminaron; las que todavía no empiezan solo aportan su starts_at.
+    """
+    rows = list(
+        model.objects.filter(is_active=True)
+        .filter(Q(ends_at__isnull=True) | Q(ends_at__gt=now))
+        .order_by("order", "id")
+    )
+    current = [r for r in rows if r.starts_at is None or r.starts_at <= now]
+    edges = [r.starts_at for r in rows if r.starts_at and r.starts_at > now]
+    edges += [r.ends_at for r in current if r.ends_at]
+    return current, min(edges, default=None)
+
+
+class PromosPayload:
+    def __init__(self):
+        self.version = None
+        self.body = None
+        self.etag = None
+        self.ids = {}  # {"banner": {ids vigentes}, "sponsor": {...}} para validar eventos
+        self.expires_at = float("inf")  # próximo borde de ventana (epoch)
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---- versión compartida ----
+    def _shared(self):
+        return caches[settings.PROMOS_CACHE_ALIAS]
+
+    def shared_version(self) -> str:
+        cache = self._shared()
+        version = cache.get(_VERSION_KEY)
+        if version is None:
+            # primera vez o la caché se vació: nadie puede tener una copia "vigente"
+            cache.add(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(_VERSION_KEY)
+        return version
+
+    def bump(self):
+        self._shared().set(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        with self._lock:
+            self.version = self.body = self.etag = None
+
+    # ---- payload ----
+    @staticmethod
+    def render():
+        """(bytes, próximo borde como epoch o inf, ids vigentes por tipo)."""
+        now = timezone.now()
+        banners, banners_edge = scheduled(Banner, now)
+        sponsors, sponsors_edge = scheduled(Sponsor, now)
+        data = {
+            "banners": BannerSerializer(banners, many=True).data,
+            "sponsors": SponsorSerializer(sponsors, many=True).data,
+        }
+        edges = [e.timestamp() for e in (banners_edge, sponsors_edge) if e]
+        # mismo formato que config.responses.ok
+        body = JSONRenderer().render({"status": "success", "message": "Promos", "data": data})
+        ids = {"banner": {b.id for b in banners}, "sponsor": {s.id for s in sponsors}}
+        return body, min(edges, default=float("inf")), ids
+
+    def _stale(self, shared) -> bool:
+        return self.body is None or self.version != shared or time.time() >= self.expires_at
+
+    def get(self):
+        """(etag, body) vigentes; reconstruye si cambió la versión compartida o se cruzó un borde."""
+        now = time.monotonic()
+        etag, body = self.etag, self.body
+        if (body is not None and now - self.checked_at < settings.PROMOS_VERSION_CHECK_INTERVAL
+                and time.time() < self.expires_at):
+            return etag, body
+
+        shared = self.shared_version()
+        if self._stale(shared):
+            with self._lock:
+                if self._stale(shared):
+                    self.body, self.expires_at, self.ids = self.render()
+                    if not is_shared(settings.PROMOS_CACHE_ALIAS):
+                        # otro worker pudo cambiar las promos sin que esta caché se entere
+                        self.expires_at = min(self.expires_at, time.time() + settings.PROMOS_LOCAL_MAX_AGE)
+                    self.etag = hashlib.blake2b(self.body, digest_size=8).hexdigest()
+                    self.version = shared
+                etag, body = self.etag, self.body
+        self.checked_at = now
+        return etag, body
+
+
+_payload = PromosPayload()
+
+
+def promos_payload():
+    return _payload.get()
+
+
+def promo_ids() -> dict:
+    """Ids de banners/sponsors que se están mostrando ahora (misma vigencia que el payload)."""
+    _payload.get()
+    return _payload.ids
+
+
+def invalidate_promos():
+    _payload.bump()
@@ -1,3 +1,116 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from promos.api.models import Banner, PromoCounter
+from promos.services import events, payload
+from promos.services.payload import PromosPayload
+
+
+def _titles(body) -> list:
+    return [b["title"] for b in json.loads(body)["data"]["banners"]]
+
+
+@override_settings(PROMOS_VERSION_CHECK_INTERVAL=0)
+class PromosPayloadTests(TestCase):
+    def setUp(self):
+        caches[settings.PROMOS_CACHE_ALIAS].clear()
+        self.worker = PromosPayload()
+        patcher = mock.patch.object(payload, "_payload", self.worker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.banner = Banner.objects.create(title="Torneo", image_url="https://example.com/b.png")
+
+    def test_rendered_once_per_version(self):
+        response = self.client.get(reverse("public-promos"), secure=True)
+        self.assertEqual(_titles(response.content), ["Torneo"])
+        with self.assertNumQueries(0):  # bytes ya renderizados: sin BD
+            again = self.client.get(reverse("public-promos"), secure=True,
+                                    headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    def test_invalidation_runs_on_commit(self):
+        etag, _ = payload.promos_payload()
+        other_worker = PromosPayload()  # mismo alias compartido, otro proceso
+        other_worker.get()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.banner.title = "Liga"
+            self.banner.save()
+            # antes del commit nadie reconstruye con datos que aún no son visibles
+            self.assertEqual(payload.promos_payload()[0], etag)
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertNotEqual(payload.promos_payload()[0], etag)
+        self.assertEqual(_titles(payload.promos_payload()[1]), ["Liga"])
+        self.assertEqual(_titles(other_worker.get()[1]), ["Liga"])  # vio la versión nueva
+
+    def test_rolled_back_change_does_not_invalidate(self):
+        etag, _ = payload.promos_payload()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.banner.delete()
+                raise RuntimeError("rollback")
+        self.assertEqual(callbacks, [])
+        self.assertEqual(payload.promos_payload()[0], etag)
+
+    @override_settings(PROMOS_LOCAL_MAX_AGE=3600)  # que el borde sea la campaña, no el tope de la LocMem
+    def test_window_edges_rebuild_once(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            Banner.objects.create(title="Final", image_url="https://example.com/f.png",
+                                  starts_at=now + timedelta(minutes=5), ends_at=now + timedelta(minutes=10))
+        self.assertEqual(_titles(payload.promos_payload()[1]), ["Torneo"])
+        self.assertEqual(self.worker.expires_at, (now + timedelta(minutes=5)).timestamp())
+
+        for minutes, titles in ((6, ["Torneo", "Final"]), (11, ["Torneo"])):
+            later = now + timedelta(minutes=minutes)
+            with mock.patch.object(payload.time, "time", return_value=later.timestamp()), \
+                    mock.patch.object(payload.timezone, "now", return_value=later):
+                self.assertEqual(_titles(payload.promos_payload()[1]), titles)
+                with self.assertNumQueries(0):  # una reconstrucción por borde, no por request
+                    payload.promos_payload()
+
+
+class EventBufferTests(TestCase):
+    def setUp(self):
+        caches[settings.PROMOS_CACHE_ALIAS].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.banner = Banner.objects.create(title="Torneo", image_url="https://example.com/b.png")
+        self.buffer = events.EventBuffer(max_keys=1, interval=60)
+        for patcher in (mock.patch.object(events, "_buffer", self.buffer),
+                        mock.patch.object(events.EventBuffer, "_start_flusher")):  # sin hilo en los tests
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _post(self, *types):
+        response = self.client.post(reverse("promos-events"),
+                                    {"events": [{"kind": "banner", "id": self.banner.pk, "type": t} for t in types]},
+                                    content_type="application/json", secure=True)
+        self.assertEqual(response.status_code, 202, response.content)
+
+    def test_failed_upsert_keeps_counts_for_next_flush(self):
+        with mock.patch.object(events, "upsert_counters", side_effect=DatabaseError("BD caída")) as upsert, \
+                self.assertLogs(events.logger, "ERROR"):
+            self._post("impression", "impression", "click")  # llena el buffer: vuelca y falla sin error 5xx
+            self._post("impression")  # dentro del intervalo de espera: no reintenta
+        self.assertEqual(upsert.call_count, 1)
+        self.assertEqual(PromoCounter.objects.count(), 0)
+
+        self.assertEqual(events.flush_events(), 1)
+        counter = PromoCounter.objects.get()
+        self.assertEqual((counter.kind, counter.promo_id, counter.impressions, counter.clicks),
+                         ("banner", self.banner.pk, 3, 1))
+        self.assertEqual(len(self.buffer), 0)
+
+        self._post("click")  # la espera solo aplica tras un fallo; el upsert suma sobre la fila
+        counter.refresh_from_db()
+        self.assertEqual((counter.impressions, counter.clicks), (3, 2))
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from promos.api.models import Banner, Sponsor
+from promos.services.payload import invalidate_promos
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_save, sender=Sponsor)
+@receiver(post_delete, sender=Banner)
+@receiver(post_delete, sender=Sponsor)
+def invalidate_promos_payload(sender, **kwargs):
+    # Cubre el admin (incluido list_editable, que guarda fila por fila) y borrados en bloque.
+    # Al confirmar: si otro worker reconstruye antes del commit, leería los datos viejos
+    transaction.on_commit(invalidate_promos)
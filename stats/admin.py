@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import PlayerMatchStat
+from .models import Leaderboard, PlayerMatchStat, PlayerStatsSummary
 
 
 @admin.register(PlayerMatchStat)
@@ -9,3 +9,24 @@ class PlayerMatchStatAdmin(admin.ModelAdmin):
     list_editable = ("goals", "is_winner", "is_mvp")
     search_fields = ("user__email", "user__first_name", "user__last_name", "match__title")
     list_filter = ("is_winner", "is_mvp")
+
+
+@admin.register(PlayerStatsSummary)
+class PlayerStatsSummaryAdmin(admin.ModelAdmin):
+    # Solo lectura: lo mantienen las señales de PlayerMatchStat / rebuild_stats_summary
+    list_display = ("user", "matches", "wins", "goals", "mvps", "updated_at")
+    search_fields = ("user__email", "user__first_name", "user__last_name")
+    readonly_fields = ("user", "matches", "wins", "goals", "mvps", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Leaderboard)
+class LeaderboardAdmin(admin.ModelAdmin):
+    # Generado por refresh_leaderboards
+    list_display = ("season", "scope", "scope_id", "metric", "size", "computed_at")
+    list_filter = ("season", "scope", "metric")
+
+    def has_add_permission(self, request):
+        return False
@@ -26,6 +26,14 @@ class PlayerMatchStat(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # valores tal como se leyeron de la BD: permiten calcular el delta del
+    # resumen (PlayerStatsSummary) al editar sin volver a consultar la fila
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta:
         unique_together = [("user", "match")]
         indexes = [
@@ -37,3 +45,88 @@ class PlayerMatchStat(models.Model):
 
     def __str__(self):
         return f"{self.user_id} | {self.match_id} | goals={self.goals}"
+
+
+class PlayerStatsSummary(models.Model):
+    """
+    Totales por usuario (una fila), mantenidos incrementalmente por las señales
+    de PlayerMatchStat (stats/utils/signals.py). Si hay drift:
+    `manage.py rebuild_stats_summary`.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="stats_totals"
+    )
+    matches = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    goals = models.PositiveIntegerField(default=0)
+    mvps = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} | matches={self.matches} goals={self.goals}"
+
+
+class LeaderboardMetric(models.TextChoices):
+    GOALS = "goals", "Goles"
+    MVPS = "mvps", "MVPs"
+    WINS = "wins", "Victorias"
+    WIN_RATE = "win_rate", "% de victorias"
+
+
+class LeaderboardScope(models.TextChoices):
+    GLOBAL = "global", "Liga"
+    CITY = "city", "Ciudad"
+    DISTRICT = "district", "Distrito"
+    TEAM = "team", "Equipo"
+
+
+class Leaderboard(models.Model):
+    """
+    Ranking precalculado (stats/services/leaderboards.py) por temporada
+    ("2026" o "all"), ámbito (liga/ciudad/distrito/equipo) y métrica.
+    Se lee por posición: cada página es un rango de LeaderboardEntry.position.
+    """
+    season = models.CharField(max_length=8)
+    scope = models.CharField(max_length=10, choices=LeaderboardScope.choices)
+    scope_id = models.PositiveIntegerField(default=0)  # city/district/team id; 0 = liga
+    metric = models.CharField(max_length=10, choices=LeaderboardMetric.choices)
+
+    size = models.PositiveIntegerField(default=0)
+    # huella de los PlayerMatchStat de origen: si cambia, la temporada está desactualizada
+    source_rows = models.PositiveIntegerField(default=0)
+    source_updated_at = models.DateTimeField(null=True, blank=True)
+    # y de las TeamMembership que cubren la temporada (atribución a equipos)
+    memberships_rows = models.PositiveIntegerField(default=0)
+    memberships_updated_at = models.DateTimeField(null=True, blank=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["season", "scope", "scope_id", "metric"], name="uniq_leaderboard"),
+        ]
+
+    def __str__(self):
+        return f"{self.season} | {self.scope}:{self.scope_id} | {self.metric}"
+
+
+class LeaderboardEntry(models.Model):
+    leaderboard = models.ForeignKey(Leaderboard, on_delete=models.CASCADE, related_name="entries")
+    position = models.PositiveIntegerField()  # 1..N sin huecos (orden estable para paginar)
+    rank = models.PositiveIntegerField()  # empates comparten rank (1, 1, 3...)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    value = models.FloatField()
+
+    matches = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    goals = models.PositiveIntegerField(default=0)
+    mvps = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["leaderboard", "position"], name="uniq_leaderboard_position"),
+        ]
+
+    def __str__(self):
+        return f"{self.leaderboard_id} | #{self.rank} {self.user_id} = {self.value}"
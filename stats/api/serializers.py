@@ -1,7 +1,8 @@
-from django.db.models import Sum
 from rest_framework import serializers
 
-from stats.api.models import PlayerMatchStat
+from stats.api.models import LeaderboardEntry, PlayerMatchStat
+from stats.services.results import DRAW, SIDES
+from stats.services.summary import summary_aggregates
 
 
 class PlayerMatchStatSerializer(serializers.ModelSerializer):
@@ -26,9 +27,31 @@ class StatsSummarySerializer(serializers.Serializer):
 
     @staticmethod
     def from_queryset(qs):
-        return {
-            "matches": qs.count(),
-            "wins": qs.filter(is_winner=True).count(),
-            "goals": qs.aggregate(total=Sum("goals"))["total"] or 0,
-            "mvps": qs.filter(is_mvp=True).count(),
-        }
+        # una sola consulta con agregados condicionales
+        return qs.aggregate(**summary_aggregates())
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    user_id = serializers.IntegerField(read_only=True)
+    first_name = serializers.CharField(source="user.first_name", read_only=True)
+    last_name = serializers.CharField(source="user.last_name", read_only=True)
+    photo = serializers.CharField(source="user.photo", read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = (
+            "rank", "position", "user_id", "first_name", "last_name", "photo",
+            "value", "matches", "wins", "goals", "mvps",
+        )
+
+
+class PlayerResultSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    goals = serializers.IntegerField(min_value=0, default=0)
+    side = serializers.ChoiceField(choices=SIDES, required=False, allow_blank=True, default="")
+
+
+class MatchResultsSerializer(serializers.Serializer):
+    players = PlayerResultSerializer(many=True, allow_empty=False)
+    winning_side = serializers.ChoiceField(choices=(*SIDES, DRAW), required=False, allow_null=True, default=None)
+    mvp_user_id = serializers.IntegerField(required=False, allow_null=True, default=None)
@@ -1,8 +1,16 @@
 from django.urls import path
 
-from stats.api.views import MyStatsSummaryView, MyMatchStatsView
+from stats.api.views import (
+    LeaderboardView, MatchResultsView, MyMatchStatsView, MyStatsBucketsView, MyStatsSummaryView, StatsExportView,
+    TeamStatsView,
+)
 
 urlpatterns = [
     path("stats/summary", MyStatsSummaryView.as_view(), name="stats-me-summary"),
+    path("stats/buckets", MyStatsBucketsView.as_view(), name="stats-me-buckets"),
     path("stats/matches", MyMatchStatsView.as_view(), name="stats-me-matches"),
+    path("stats/export", StatsExportView.as_view(), name="stats-export"),
+    path("stats/leaderboards/<str:metric>", LeaderboardView.as_view(), name="stats-leaderboard"),
+    path("matches/<uuid:match_identifier>/results", MatchResultsView.as_view(), name="matches-results"),
+    path("teams/<int:team_id>/stats", TeamStatsView.as_view(), name="teams-stats"),
 ]
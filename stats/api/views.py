@@ -1,22 +1,61 @@
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 
 from accounts.utils.authentication import DeviceTokenAuthentication
-from config.responses import ok
-from stats.api.models import PlayerMatchStat
-from stats.api.serializers import PlayerMatchStatSerializer, StatsSummarySerializer
+from config.db_router import read_replica
+from config.exports import parse_export_params, streaming_export
+from config.query_budget import query_budget
+from config.responses import ok, error
+from matches.models import Match, Team
+from stats.api.models import LeaderboardMetric, LeaderboardScope, PlayerMatchStat
+from stats.api.serializers import LeaderboardEntrySerializer, MatchResultsSerializer, PlayerMatchStatSerializer
+from stats.services.buckets import periods, user_buckets
+from stats.services.exports import stats_export
+from stats.services.leaderboards import leaderboard_page
+from stats.services.results import record_match_results
+from stats.services.seasons import parse_season
+from stats.services.summary import summary_for_user
+from stats.services.teams import team_stats
 
 
+@read_replica
+@query_budget(get=1)
 class MyStatsSummaryView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = PlayerMatchStat.objects.filter(user=request.user)
-        data = StatsSummarySerializer.from_queryset(qs)
+        data = summary_for_user(request.user)
         return ok(data, message="Resumen de estadísticas")
 
 
+@query_budget(get=2)
+class MyStatsBucketsView(APIView):
+    """
+    GET /api/stats/buckets?period=week|month|season|year&limit=12
+    Goles, victorias y MVPs del usuario por periodo (más reciente primero).
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        period = request.query_params.get("period", "month")
+        if period not in periods():
+            return error(message="Periodo no válido", errors={"period": periods()})
+        try:
+            limit = max(1, int(request.query_params.get("limit", 12)))
+        except ValueError:
+            return error(message="Parámetros inválidos")
+        data = user_buckets(request.user.pk, period)[:limit]
+        return ok(data, message="Estadísticas por periodo")
+
+
+@read_replica
+@query_budget(get=1)
 class MyMatchStatsView(APIView):
     authentication_classes = [DeviceTokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -28,3 +67,105 @@ class MyMatchStatsView(APIView):
               .order_by("-match__start_at", "-id"))
         data = PlayerMatchStatSerializer(qs, many=True).data
         return ok(data, message="Estadísticas por partido")
+
+
+@read_replica
+@query_budget(get=2)
+class LeaderboardView(APIView):
+    """
+    GET /api/stats/leaderboards/<metric>?season=2026|all&city=<id>|district=<id>|team=<id>&page=1&page_size=50
+    metric: goals | mvps | wins | win_rate. Lee rankings precalculados (refresh_leaderboards).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, metric):
+        if metric not in LeaderboardMetric.values:
+            return error(message="Métrica no válida", errors={"metric": LeaderboardMetric.values})
+        try:
+            season = parse_season(request.query_params.get("season"))
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = min(max(1, int(request.query_params.get("page_size", settings.STATS_LEADERBOARD_PAGE_SIZE))),
+                            settings.STATS_LEADERBOARD_PAGE_SIZE * 4)
+            scopes = [(s, int(request.query_params[s])) for s in ("city", "district", "team")
+                      if request.query_params.get(s)]
+        except ValueError:
+            return error(message="Parámetros inválidos")
+        if len(scopes) > 1:
+            return error(message="Filtra por solo uno de: city, district, team")
+        scope, scope_id = scopes[0] if scopes else (LeaderboardScope.GLOBAL, 0)
+
+        board, entries = leaderboard_page(season, metric, scope, scope_id, page, page_size)
+        payload = {
+            "metric": metric,
+            "season": str(season),
+            "scope": scope,
+            "scope_id": scope_id or None,
+            "page": page,
+            "page_size": page_size,
+            "total": board.size if board else 0,
+            "computed_at": board.computed_at if board else None,
+            "results": LeaderboardEntrySerializer(entries, many=True).data,
+        }
+        return ok(payload, message="Ranking")
+
+
+@query_budget(post=12)
+class MatchResultsView(APIView):
+    """
+    POST /api/matches/<uuid>/results  (staff o creador del partido)
+    {"players": [{"user_id": 1, "goals": 2, "side": "A"}, ...], "winning_side": "A", "mvp_user_id": 1}
+    Aplica todos los resultados en una transacción y marca el partido como finalizado.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, match_identifier):
+        m = get_object_or_404(Match, match_identifier=match_identifier)
+        if not (request.user.is_staff or m.created_by_id == request.user.id):
+            return error("Solo el organizador puede cargar resultados", status_code=status.HTTP_403_FORBIDDEN)
+
+        ser = MatchResultsSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        try:
+            payload = record_match_results(m.id, **ser.validated_data)
+        except ValidationError as e:
+            errors = e.message_dict if hasattr(e, "error_dict") else None
+            return error(e.messages[0] if errors is None else "Resultados inválidos", errors=errors)
+        return ok(payload, message="Resultados registrados")
+
+
+@query_budget(get=3)
+class TeamStatsView(APIView):
+    """
+    GET /api/teams/<id>/stats
+    Goles, victorias, partidos y mejores jugadores del equipo, atribuyendo cada
+    estadística al equipo vigente del jugador en la fecha del partido.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, team_id):
+        team = Team.objects.filter(pk=team_id).values("id", "name", "badge_url").first()
+        if not team:
+            return error("Team not found", status_code=status.HTTP_404_NOT_FOUND)
+        return ok({"team": team, **team_stats(team_id)}, message="Estadísticas del equipo")
+
+
+@read_replica
+@query_budget(get=1)
+class StatsExportView(APIView):
+    """
+    GET /api/stats/export?output=csv|ndjson&match=<uuid>&from=YYYY-MM-DD&to=YYYY-MM-DD  (staff)
+    Streaming: memoria constante sin importar cuántas filas haya.
+    """
+    authentication_classes = [DeviceTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            params = parse_export_params(request.query_params)
+        except ValueError:
+            return error(message="Parámetros inválidos")
+        match = None
+        if params["match_identifier"]:
+            match = get_object_or_404(Match, match_identifier=params["match_identifier"])
+        return streaming_export(stats_export(match, params["start"], params["end"]), params["format"])
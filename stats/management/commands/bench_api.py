@@ -0,0 +1,101 @@
+# stats/management/commands/bench_api.py
+"""
+Benchmark de todos los endpoints de la API (config/benchmarks.py).
+
+Crea una BD de prueba (como `manage.py test`: test_<NAME> en Postgres, en
+memoria con SQLite), genera la liga de cada tamaño con un seed fijo, mide y la
+destruye al terminar. La BD real no se toca.
+
+    python manage.py bench_api --sizes small,medium --json bench.json
+    python manage.py bench_api --compare bench.json      # contra una corrida anterior
+    python manage.py bench_api --metrics-overhead        # solo el costo de MetricsMiddleware
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from config.benchmarks import DATASETS, SCENARIOS, compare, metrics_overhead, run_suite
+from config.db_router import REPLICA, replica_enabled
+
+
+class Command(BaseCommand):
+    help = "Benchmark de la API (latencia p50/p90/p99 y queries por endpoint) sobre datos deterministas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="small,medium", help=f"tamaños: {', '.join(DATASETS)}")
+        parser.add_argument("--iterations", type=int, default=30, help="requests medidas por endpoint")
+        parser.add_argument("--warmup", type=int, default=3, help="requests previas sin medir")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--only", help="nombres de URL separados por coma (p.ej. matches-board,auth-login)")
+        parser.add_argument("--json", help="escribe los resultados en este archivo")
+        parser.add_argument("--compare", help="JSON de una corrida anterior para mostrar diferencias")
+        parser.add_argument("--metrics-overhead", action="store_true",
+                            help="mide solo el costo por request de MetricsMiddleware (sin dataset)")
+        parser.add_argument("--max-overhead-us", type=float, default=50,
+                            help="con --metrics-overhead: falla si el costo lo supera")
+
+    def handle(self, *args, **opts):
+        if opts["metrics_overhead"]:
+            return self._metrics_overhead(opts)
+        sizes = [s.strip() for s in opts["sizes"].split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in DATASETS]
+        if unknown:
+            raise CommandError(f"Tamaños desconocidos: {', '.join(unknown)}")
+        only = {s.strip() for s in opts["only"].split(",")} if opts["only"] else None
+        if only and not only & {s.url_name for s in SCENARIOS}:
+            raise CommandError("--only no coincide con ningún escenario")
+        baseline = None
+        if opts["compare"]:
+            with open(opts["compare"]) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        if replica_enabled():  # como en los tests: la réplica apunta a la misma BD de prueba
+            connections[REPLICA].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            report = run_suite(sizes, iterations=opts["iterations"], warmup=opts["warmup"], seed=opts["seed"],
+                               only=only, log=lambda msg: self.stderr.write(msg))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if report["uncovered"]:
+            self.stderr.write(self.style.WARNING(f"Endpoints sin escenario: {', '.join(report['uncovered'])}"))
+        for size, data in report["datasets"].items():
+            errors = [label for label, r in data["scenarios"].items()
+                      if any(code.startswith("5") for code in r["statuses"])]
+            if errors:
+                self.stderr.write(self.style.ERROR(f"[{size}] respuestas 5xx en: {', '.join(errors)}"))
+
+        if baseline is not None:
+            lines = compare(baseline, report)
+            self.stdout.write("\n".join(lines) if lines else "Sin cambios significativos contra la base.")
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(report, f, indent=2)
+        elif baseline is None:
+            self.stdout.write(json.dumps(report, indent=2))
+
+    def _metrics_overhead(self, opts):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            result = metrics_overhead(requests=opts["iterations"] * 100)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"db={connection.vendor} requests={result['requests']} queries/req={result['queries']}")
+        self.stdout.write(f"  sin métricas: {result['bare_us']} µs/req")
+        self.stdout.write(f"  con métricas: {result['metrics_us']} µs/req (+{result['overhead_us']} µs)")
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(result, f, indent=2)
+        if result["overhead_us"] > opts["max_overhead_us"]:
+            raise CommandError(f"MetricsMiddleware cuesta {result['overhead_us']} µs/req, "
+                               f"más que --max-overhead-us {opts['max_overhead_us']}")
@@ -0,0 +1,122 @@
+# stats/management/commands/bench_compression.py
+"""
+CPU de comprimir contra bytes ahorrados, sobre payloads reales del board.
+
+Como bench_api: BD de prueba, liga determinista por tamaño, y por cada
+payload (board anónimo, board de un jugador inscrito, próximos partidos) mide
+cada codificación y nivel: tamaño, ms de CPU por request y KB ahorrados por ms
+de CPU, junto al CPU de generar la respuesta para ver cuánto suma comprimir.
+
+    python manage.py bench_compression --sizes small,medium,large
+    python manage.py bench_compression --levels gzip:1,6,9 --levels br:4,5,11
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from config.benchmarks import DATASETS, Call, Scenario, bench_environment, perform, prepare_dataset
+from config.compression import BROTLI, GZIP, available_encodings, compress
+from config.db_router import REPLICA, replica_enabled
+
+DEFAULT_LEVELS = {GZIP: (1, 4, 6, 9), BROTLI: (1, 4, 5, 6, 9, 11)}
+
+
+def _cpu_ms(fn, iterations) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) * 1000 / iterations
+
+
+def _payloads(ctx):
+    """(nombre, Scenario, Call) de las respuestas a medir."""
+    board = Scenario("matches-board", "get", None)
+    return [
+        ("board anónimo", board, Call()),
+        ("board jugador", board, Call(token=ctx.player(0)[1])),
+        ("próximos", Scenario("matches-upcoming", "get", None), Call()),
+    ]
+
+
+def measure(ctx, levels, iterations) -> list:
+    client = Client()
+    rows = []
+    for name, scenario, call in _payloads(ctx):
+        response = perform(client, scenario, call)  # sin Accept-Encoding: cuerpo sin comprimir
+        body = response.content
+        render_ms = _cpu_ms(lambda: perform(client, scenario, call), max(1, iterations // 4))
+        for encoding, encoding_levels in levels.items():
+            for level in encoding_levels:
+                size = len(compress(body, encoding, level))
+                cpu = _cpu_ms(lambda: compress(body, encoding, level), iterations)
+                saved_kb = (len(body) - size) / 1024
+                rows.append({
+                    "payload": name, "encoding": encoding, "level": level,
+                    "bytes": len(body), "compressed": size, "ratio": round(size / len(body), 3),
+                    "cpu_ms": round(cpu, 3), "render_ms": round(render_ms, 3),
+                    "kb_saved_per_cpu_ms": round(saved_kb / cpu, 1) if cpu else None,
+                })
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Mide CPU de compresión vs bytes ahorrados por codificación y nivel en payloads del board."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="small,medium", help=f"tamaños: {', '.join(DATASETS)}")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--levels", action="append",
+                            help="p.ej. gzip:1,6,9 (repetible); por defecto una grilla de gzip y br")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", help="escribe los resultados en este archivo")
+
+    def handle(self, *args, **opts):
+        sizes = [s.strip() for s in opts["sizes"].split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in DATASETS]
+        if unknown:
+            raise CommandError(f"Tamaños desconocidos: {', '.join(unknown)}")
+        levels = dict(DEFAULT_LEVELS)
+        if opts["levels"]:
+            levels = {}
+            for spec in opts["levels"]:
+                encoding, _, values = spec.partition(":")
+                try:
+                    levels[encoding] = tuple(int(v) for v in values.split(","))
+                except ValueError:
+                    raise CommandError(f"--levels inválido: {spec}")
+        missing = [e for e in levels if e not in available_encodings()]
+        if missing:
+            self.stderr.write(self.style.WARNING(f"No disponible (¿falta el paquete?): {', '.join(missing)}"))
+            levels = {e: v for e, v in levels.items() if e not in missing}
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        if replica_enabled():
+            connections[REPLICA].creation.set_as_test_mirror(connection.settings_dict)
+        report = {}
+        try:
+            with bench_environment(opts["seed"]) as fake_mp:
+                for size in sizes:
+                    ctx = prepare_dataset(size, opts["seed"], fake_mp)
+                    report[size] = measure(ctx, levels, opts["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for size, rows in report.items():
+            self.stdout.write(f"\n[{size}]")
+            self.stdout.write(f"{'payload':<15} {'enc':<5} {'nivel':>5} {'bytes':>9} {'comprimido':>10} "
+                              f"{'ratio':>6} {'cpu ms':>7} {'render ms':>9} {'KB/ms':>7}")
+            for r in rows:
+                self.stdout.write(
+                    f"{r['payload']:<15} {r['encoding']:<5} {r['level']:>5} {r['bytes']:>9} {r['compressed']:>10} "
+                    f"{r['ratio']:>6} {r['cpu_ms']:>7} {r['render_ms']:>9} {r['kb_saved_per_cpu_ms'] or '-':>7}"
+                )
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,234 @@
+# stats/management/commands/bench_db_pool.py
+"""
+Prueba de carga de conexiones: ráfagas de requests concurrentes (como los
+hilos de un worker gthread) y cuántas conexiones quedan abiertas.
+
+Como bench_api: BD de prueba y liga determinista. Un pool de --threads hilos
+que vive toda la corrida (los hilos de gunicorn no mueren entre requests)
+atiende --bursts ráfagas de lecturas (board, próximos, leaderboard) con
+pausas entre medio. Un hilo muestrea cada --interval:
+
+- conexiones del lado del servidor (Postgres: pg_stat_activity de la BD, por
+  una conexión propia fuera del pool),
+- conexiones tomadas por los hilos (wrappers de Django con conexión abierta),
+- con DATABASE_POOL: tamaño del pool y hilos esperando (get_stats()).
+
+Sin pool el pico sigue a --threads y las conexiones quedan abiertas en las
+pausas; con pool no pasa de DATABASE_POOL_MAX_SIZE por alias y las ráfagas se
+pagan en espera (p99). --max-connections hace que falle si el pico lo supera.
+
+    DATABASE_POOL=0 python manage.py bench_db_pool --threads 32
+    DATABASE_POOL=1 DATABASE_POOL_MAX_SIZE=4 python manage.py bench_db_pool --threads 32 --max-connections 4
+"""
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from config.benchmarks import DATASETS, Call, Scenario, bench_environment, percentile, perform, prepare_dataset
+from config.db_router import PRIMARY, REPLICA, replica_enabled
+from config.metrics import POOL_STATS, pool_stats
+
+_SCENARIOS = (
+    (Scenario("matches-board", "get", None), lambda ctx, i: Call(token=ctx.player(i)[1])),
+    (Scenario("matches-upcoming", "get", None), lambda ctx, i: Call()),
+    (Scenario("stats-leaderboard", "get", None), lambda ctx, i: Call(kwargs={"metric": "goals"})),
+)
+
+
+def _pool_value(values, stat):
+    return values[POOL_STATS.index(stat)]
+
+
+class ConnectionSampler(threading.Thread):
+    """Muestrea conexiones abiertas mientras corre la carga."""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []  # (segundos, servidor | None, tomadas, pool_size | None, esperando | None)
+        self._wrappers = set()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._server = None
+        if connection.vendor == "postgresql":
+            # conexión propia: no cuenta en el pool ni en las tomadas (se descuenta en la query)
+            import psycopg
+
+            params = connection.get_connection_params()
+            self._server = psycopg.connect(**params, autocommit=True)
+
+    def track(self, sender, connection, **kwargs):
+        with self._lock:
+            self._wrappers.add(connection)
+
+    def server_connections(self):
+        if self._server is None:
+            return None
+        row = self._server.execute(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        ).fetchone()
+        return row[0]
+
+    def sample(self, started):
+        with self._lock:
+            held = sum(1 for w in self._wrappers if w.connection is not None)
+        pools = pool_stats()
+        size = sum(_pool_value(v, "pool_size") for v in pools.values()) if pools else None
+        waiting = sum(_pool_value(v, "requests_waiting") for v in pools.values()) if pools else None
+        self.samples.append((time.perf_counter() - started, self.server_connections(), held, size, waiting))
+
+    def run(self):
+        started = time.perf_counter()
+        while not self._done.is_set():
+            self.sample(started)
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        if self._server is not None:
+            self._server.close()
+
+
+def _peak(samples, idx):
+    values = [s[idx] for s in samples if s[idx] is not None]
+    return max(values) if values else None
+
+
+def run_bursts(ctx, threads, bursts, per_thread, pause, sampler) -> list:
+    local = threading.local()
+    calls = []  # la misma ráfaga cada vez, armada fuera de la medición
+    for i in range(threads * per_thread):
+        scenario, build = _SCENARIOS[i % len(_SCENARIOS)]
+        calls.append((scenario, build(ctx, i)))
+
+    def request(job):
+        scenario, call = job
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(raise_request_exception=False)
+        started = time.perf_counter()
+        try:
+            status = perform(client, scenario, call).status_code
+        except Exception as e:  # p.ej. PoolTimeout fuera de la vista (middleware)
+            status = type(e).__name__
+        return time.perf_counter() - started, status
+
+    results = []
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="gthread") as executor:
+        for n in range(bursts):
+            first = len(sampler.samples)
+            started = time.perf_counter()
+            outcomes = list(executor.map(request, calls))
+            elapsed = time.perf_counter() - started
+            during = sampler.samples[first:]
+            time.sleep(pause)  # entre ráfagas: ¿se liberan las conexiones?
+            idle = sampler.samples[-1] if sampler.samples else None
+            latencies = [o[0] for o in outcomes]
+            results.append({
+                "burst": n + 1,
+                "requests": len(outcomes),
+                "rps": round(len(outcomes) / elapsed, 1),
+                "statuses": dict(Counter(str(o[1]) for o in outcomes)),
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "peak_server": _peak(during, 1),
+                "peak_held": _peak(during, 2),
+                "peak_pool": _peak(during, 3),
+                "peak_waiting": _peak(during, 4),
+                "idle_server": idle[1] if idle else None,
+                "idle_held": idle[2] if idle else None,
+            })
+        # como al reiniciar el worker: cada hilo cierra (o devuelve al pool) su conexión
+        barrier = threading.Barrier(threads)
+
+        def close(_):
+            barrier.wait()  # una tarea por hilo
+            connections.close_all()
+
+        list(executor.map(close, range(threads)))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Ráfagas de requests concurrentes y conexiones a la BD abiertas (con y sin DATABASE_POOL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", default="small", help=f"tamaño: {', '.join(DATASETS)}")
+        parser.add_argument("--threads", type=int, default=32, help="hilos concurrentes (gunicorn --threads)")
+        parser.add_argument("--bursts", type=int, default=3)
+        parser.add_argument("--requests", type=int, default=5, help="requests por hilo en cada ráfaga")
+        parser.add_argument("--pause", type=float, default=1.0, help="segundos entre ráfagas")
+        parser.add_argument("--interval", type=float, default=0.02, help="segundos entre muestras")
+        parser.add_argument("--max-connections", type=int,
+                            help="falla si el pico de conexiones (servidor o tomadas) lo supera")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", help="escribe el reporte en este archivo")
+
+    def handle(self, *args, **opts):
+        if opts["size"] not in DATASETS:
+            raise CommandError(f"Tamaño desconocido: {opts['size']}")
+        pooled = {alias: connections[alias].settings_dict["OPTIONS"].get("pool") for alias in connections}
+        pooled = {alias: options for alias, options in pooled.items() if options}
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        if replica_enabled():
+            connections[REPLICA].creation.set_as_test_mirror(connections[PRIMARY].settings_dict)
+        sampler = None
+        try:
+            with bench_environment(opts["seed"]) as fake_mp:
+                ctx = prepare_dataset(opts["size"], opts["seed"], fake_mp)
+                connections.close_all()  # el hilo principal no retiene conexiones durante la carga
+                sampler = ConnectionSampler(opts["interval"])
+                connection_created.connect(sampler.track)
+                sampler.start()
+                bursts = run_bursts(ctx, opts["threads"], opts["bursts"], opts["requests"], opts["pause"], sampler)
+        finally:
+            if sampler is not None:
+                connection_created.disconnect(sampler.track)
+                sampler.stop()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "vendor": connection.vendor,
+            "threads": opts["threads"],
+            "pool": pooled or None,
+            "bursts": bursts,
+            "peak_server": max((b["peak_server"] for b in bursts if b["peak_server"] is not None), default=None),
+            "peak_held": max((b["peak_held"] or 0 for b in bursts), default=0),
+        }
+        self.stdout.write(f"{report['vendor']}, {opts['threads']} hilos, "
+                          f"pool: {', '.join(f'{a} {o}' for a, o in pooled.items()) or 'no (CONN_MAX_AGE)'}")
+        if report["vendor"] != "postgresql":
+            self.stdout.write("(sin conteo del servidor: solo Postgres tiene pg_stat_activity)")
+        self.stdout.write(f"{'ráfaga':>6} {'reqs':>5} {'rps':>7} {'p50 ms':>8} {'p99 ms':>8} {'servidor':>8} "
+                          f"{'tomadas':>7} {'pool':>5} {'espera':>6} {'ociosas':>8}  status")
+        for b in bursts:
+            idle = b["idle_server"] if b["idle_server"] is not None else b["idle_held"]
+            self.stdout.write(
+                f"{b['burst']:>6} {b['requests']:>5} {b['rps']:>7} {b['p50_ms']:>8} {b['p99_ms']:>8} "
+                f"{b['peak_server'] if b['peak_server'] is not None else '-':>8} {b['peak_held']:>7} "
+                f"{b['peak_pool'] if b['peak_pool'] is not None else '-':>5} "
+                f"{b['peak_waiting'] if b['peak_waiting'] is not None else '-':>6} {idle:>8}  {b['statuses']}"
+            )
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        limit = opts["max_connections"]
+        peak = max(report["peak_server"] or 0, report["peak_held"])
+        if limit is not None and peak > limit:
+            raise CommandError(f"Pico de {peak} conexiones, más que --max-connections {limit}")
+        if limit is not None:
+            self.stdout.write(self.style.SUCCESS(f"Conexiones estables: pico {peak} <= {limit}"))
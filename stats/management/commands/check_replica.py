@@ -0,0 +1,152 @@
+# stats/management/commands/check_replica.py
+"""
+Simula lag de réplica y verifica el ruteo de config/db_router.py.
+
+Crea dos BD de prueba separadas (primario y réplica; en memoria con SQLite,
+test_<NAME> y test_<NAME>_replica en Postgres), siembra la liga en el
+primario, la copia a la réplica y después escribe solo en el primario: la
+réplica queda "atrasada" hasta la próxima copia. Cada paso hace requests
+reales y cuenta las queries por alias.
+
+    DATABASE_URL=sqlite:///db.sqlite3 DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 \\
+        python manage.py check_replica
+"""
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from config.benchmarks import Call, Scenario, bench_environment, perform, prepare_dataset
+from config.db_router import PRIMARY, REPLICA, replica_enabled
+from config.seeding import SEED_PASSWORD
+from matches.api.models import Match, MatchStatus
+
+
+def replicate():
+    """Copia todas las tablas del primario a la réplica (la réplica "se pone al día")."""
+    replica = connections[REPLICA]
+    models = [m for m in apps.get_models(include_auto_created=True) if m._meta.managed and not m._meta.proxy]
+    with transaction.atomic(using=REPLICA):  # FKs diferidas: el orden de inserción no importa
+        with replica.cursor() as cursor:
+            for model in models:
+                cursor.execute(f"DELETE FROM {replica.ops.quote_name(model._meta.db_table)}")
+        for model in models:
+            rows = list(model._base_manager.using(PRIMARY).all())
+            model._base_manager.using(REPLICA).bulk_create(rows, batch_size=1000)
+
+
+class _AliasCounter:
+    def __init__(self):
+        self.counts = {}
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in (PRIMARY, REPLICA):
+            self._stack.enter_context(connections[alias].execute_wrapper(self._wrapper(alias)))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def _wrapper(self, alias):
+        def count(execute, sql, params, many, context):
+            self.counts[alias] = self.counts.get(alias, 0) + 1
+            return execute(sql, params, many, context)
+        return count
+
+
+class Command(BaseCommand):
+    help = "Simula lag entre primario y réplica y verifica qué lecturas van a cada uno."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pin-seconds", type=float, default=1.0,
+                            help="REPLICA_PIN_SECONDS durante la simulación")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        if not replica_enabled():
+            raise CommandError("Define DATABASE_URL y DATABASE_REPLICA_URL (dos BD distintas)")
+
+        setup_test_environment()
+        primary, replica = connections[PRIMARY], connections[REPLICA]
+        old_names = {PRIMARY: primary.settings_dict["NAME"], REPLICA: replica.settings_dict["NAME"]}
+        replica.settings_dict["TEST"].update(  # BD propia en vez de MIRROR: así puede atrasarse
+            MIRROR=None, NAME=None if replica.vendor == "sqlite" else f"test_{old_names[REPLICA]}_replica",
+        )
+        for conn in (primary, replica):
+            conn.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(REPLICA_PIN_SECONDS=opts["pin_seconds"]):
+                failures = self.simulate(opts["seed"], opts["pin_seconds"])
+        finally:
+            for alias, conn in ((REPLICA, replica), (PRIMARY, primary)):
+                conn.creation.destroy_test_db(old_names[alias], verbosity=0)
+            teardown_test_environment()
+        if failures:
+            raise CommandError(f"{failures} verificaciones fallaron")
+        self.stdout.write(self.style.SUCCESS("Ruteo de réplica OK"))
+
+    def simulate(self, seed, pin_seconds) -> int:
+        client = Client()
+        failures = 0
+
+        def check(label, scenario, call, status, alias):
+            nonlocal failures
+            with _AliasCounter() as counter:
+                response = perform(client, scenario, call)
+            served = REPLICA if counter.counts.get(REPLICA) else PRIMARY
+            passed = response.status_code == status and served == alias
+            failures += not passed
+            style = self.style.SUCCESS if passed else self.style.ERROR
+            self.stdout.write(style(
+                f"{'ok  ' if passed else 'FAIL'} {label}: {response.status_code} desde {served} "
+                f"(esperado {status} desde {alias}) queries={counter.counts}"
+            ))
+            return response
+
+        with bench_environment(seed) as fake_mp:
+            ctx = prepare_dataset("small", seed, fake_mp)
+            user, token = ctx.player(0)
+            replicate()
+
+            # escritura que la réplica todavía no vio
+            fresh = Match.objects.create(
+                location_id=ctx.open_match.location_id, title="Recién creado",
+                start_at=timezone.now() + timedelta(days=3), capacity=10, price_amount=0,
+                status=MatchStatus.PUBLISHED,
+            )
+            detail = Scenario("matches-detail", "get", None)
+            see_fresh = Call(kwargs={"match_identifier": fresh.match_identifier}, token=token)
+
+            check("réplica atrasada", detail, see_fresh, 404, REPLICA)
+            with transaction.atomic():
+                check("dentro de transaction.atomic", detail, see_fresh, 200, PRIMARY)
+            check("vista sin @read_replica", Scenario("profile-edit", "get", None), Call(token=token), 200, PRIMARY)
+
+            check("escritura del usuario", Scenario("profile-edit", "patch", None),
+                  Call(token=token, data={"phone": "911111111"}), 200, PRIMARY)
+            check("leer lo propio tras escribir", detail, see_fresh, 200, PRIMARY)
+            time.sleep(pin_seconds + 0.1)
+            check(f"pasados {pin_seconds}s", detail, see_fresh, 404, REPLICA)
+
+            login = check("login (token solo en el primario)", Scenario("auth-login", "post", None), Call(data={
+                "document_type": ctx.league.document_type.code, "document_number": user.document_number,
+                "password": SEED_PASSWORD, "device_id": "replica-check",
+            }), 200, PRIMARY)
+            new_token = login.json()["data"]["access"]
+            check("leer lo propio tras login", detail, Call(kwargs=see_fresh.kwargs, token=new_token), 200, PRIMARY)
+            time.sleep(pin_seconds + 0.1)
+            check("token nuevo, réplica atrasada", detail,
+                  Call(kwargs=see_fresh.kwargs, token=new_token), 404, REPLICA)
+
+            replicate()
+            check("réplica al día", detail, see_fresh, 200, REPLICA)
+            check("exportación en streaming", Scenario("matches-enrollments-export", "get", None),
+                  Call(token=ctx.staff, query={"output": "csv"}), 200, REPLICA)
+        return failures
@@ -0,0 +1,53 @@
+# stats/management/commands/export_data.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.exports import FORMATS, iter_export, parse_range
+from matches.models import Match
+from matches.services.exports import enrollments_export
+from payments.models import PaymentStatus
+from payments.services.exports import payments_export
+from stats.services.exports import stats_export
+
+
+class Command(BaseCommand):
+    help = "Exporta estadísticas, inscripciones o pagos en CSV/NDJSON en streaming (memoria constante)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["stats", "enrollments", "payments"])
+        parser.add_argument("--format", choices=list(FORMATS), default="csv")
+        parser.add_argument("--match", help="match_identifier (uuid)")
+        parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--status", choices=PaymentStatus.values, help="solo payments")
+        parser.add_argument("--output", "-o", help="archivo de salida (por defecto stdout)")
+
+    def handle(self, *args, **opts):
+        try:
+            start, end = parse_range(opts["date_from"], opts["date_to"])
+        except ValueError as exc:
+            raise CommandError(f"Fecha inválida: {exc}")
+        match = None
+        if opts["match"]:
+            match = Match.objects.filter(match_identifier=opts["match"]).first()
+            if match is None:
+                raise CommandError("Partido no encontrado")
+
+        if opts["kind"] == "payments":
+            export = payments_export(match, opts["status"], start, end)
+        elif opts["kind"] == "enrollments":
+            export = enrollments_export(match, start, end)
+        else:
+            export = stats_export(match, start, end)
+
+        out = open(opts["output"], "w", newline="", encoding="utf-8") if opts["output"] else sys.stdout
+        rows = -1 if opts["format"] == "csv" else 0  # sin contar el encabezado
+        try:
+            for line in iter_export(export, opts["format"]):
+                out.write(line)
+                rows += 1
+        finally:
+            if opts["output"]:
+                out.close()
+        self.stderr.write(self.style.SUCCESS(f"{rows} filas exportadas ({export.name})"))
@@ -0,0 +1,181 @@
+# stats/management/commands/profile_startup.py
+"""
+Perfil de arranque en frío de un worker: cuánto tarda en responder la primera
+request y qué módulos se lo llevan.
+
+Cada corrida es un intérprete nuevo con `python -X importtime` que hace lo
+mismo que un worker de gunicorn: importa config.wsgi (django.setup +
+middleware) y atiende una request por WSGI (ahí se cargan URLconf, vistas y
+serializers). Reporta la mediana por fase, el costo de import por paquete y
+los módulos más caros de cada fase.
+
+    python manage.py profile_startup --runs 5 --path /api/promos
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# corre en el intérprete hijo; las marcas en stderr separan los imports por fase
+_CHILD = r"""
+import sys, time
+t0 = time.perf_counter()
+sys.stderr.write("## start\n")
+marks = {}
+
+def phase(name):
+    marks[name] = time.perf_counter() - t0
+    sys.stderr.write(f"## {name}\n")
+    sys.stderr.flush()
+
+import django
+django.setup()
+phase("setup")
+from config.wsgi import application
+phase("wsgi")
+
+from io import BytesIO
+from django.conf import settings
+host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+path, _, query = sys.argv[1].partition("?")
+statuses = []
+
+def start_response(status, headers, exc_info=None):
+    statuses.append(int(status.split()[0]))
+
+def serve():
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SERVER_NAME": host,
+        "SERVER_PORT": "443", "HTTP_HOST": host, "SERVER_PROTOCOL": "HTTP/1.1", "REMOTE_ADDR": "127.0.0.1",
+        "HTTP_X_FORWARDED_PROTO": "https", "wsgi.url_scheme": "https", "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr, "wsgi.version": (1, 0), "wsgi.multithread": True,
+        "wsgi.multiprocess": True, "wsgi.run_once": False,
+    }
+    response = application(environ, start_response)
+    b"".join(response)
+    response.close()
+
+serve()
+phase("first_request")
+serve()
+phase("second_request")
+print("##RESULT " + __import__("json").dumps({"marks": marks, "statuses": statuses}))
+"""
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+PHASES = ("setup", "wsgi", "first_request", "second_request")
+IMPORT_PHASES = ("interpreter",) + PHASES  # lo importado antes del script (site, etc.) es del intérprete
+PHASE_LABELS = {
+    "interpreter": "arranque del intérprete",
+    "setup": "django.setup (settings, apps, modelos)",
+    "wsgi": "config.wsgi (middleware)",
+    "first_request": "primera request (URLconf, vistas)",
+    "second_request": "segunda request (en caliente)",
+}
+
+
+def _first_party() -> set:
+    return {name for name in os.listdir(settings.BASE_DIR)
+            if os.path.isfile(os.path.join(settings.BASE_DIR, name, "__init__.py"))}
+
+
+def run_once(path: str) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, path],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, env=os.environ.copy(),
+    )
+    wall = time.perf_counter() - started
+    result = next((json.loads(line[len("##RESULT "):]) for line in proc.stdout.splitlines()
+                   if line.startswith("##RESULT ")), None)
+    if proc.returncode or result is None:
+        raise CommandError(f"El arranque falló:\n{proc.stderr[-3000:]}")
+
+    imports = []  # (fase, profundidad, módulo, self_us, acumulado_us)
+    seen = 0  # marcas "## fase" vistas: los imports siguientes son de la fase que sigue
+    for line in proc.stderr.splitlines():
+        if line.startswith("## "):
+            seen += 1
+            continue
+        m = _LINE.match(line)
+        if m:
+            phase = IMPORT_PHASES[min(seen, len(IMPORT_PHASES) - 1)]
+            imports.append((phase, len(m.group(3)) // 2, m.group(4), int(m.group(1)), int(m.group(2))))
+    return {"wall": wall, "marks": result["marks"], "statuses": result["statuses"], "imports": imports}
+
+
+def summarize(runs: list, top: int) -> dict:
+    first_party = _first_party()
+    marks = {p: statistics.median(r["marks"][p] for r in runs) for p in PHASES}
+    wall = statistics.median(r["wall"] for r in runs)
+    phases, previous = {}, 0.0
+    for p in PHASES:
+        phases[p] = round((marks[p] - previous) * 1000, 1)
+        previous = marks[p]
+
+    # la lista de imports es la misma en cada corrida: mediana por (fase, módulo)
+    per_module = defaultdict(list)
+    for r in runs:
+        for phase, depth, name, self_us, cum_us in r["imports"]:
+            per_module[(phase, depth, name)].append((self_us, cum_us))
+    packages = defaultdict(float)
+    by_phase = defaultdict(list)
+    for (phase, depth, name), values in per_module.items():
+        self_ms = statistics.median(v[0] for v in values) / 1000
+        cum_ms = statistics.median(v[1] for v in values) / 1000
+        root = name.split(".")[0]
+        packages[root] += self_ms
+        by_phase[phase].append({"module": name, "depth": depth, "self_ms": round(self_ms, 2),
+                                "cumulative_ms": round(cum_ms, 2), "first_party": root in first_party})
+
+    return {
+        "runs": len(runs),
+        "statuses": runs[0]["statuses"],
+        "cold_start_ms": round(marks["first_request"] * 1000, 1),
+        "process_wall_ms": round(wall * 1000, 1),
+        "phases_ms": phases,
+        "packages_ms": dict(sorted(((k, round(v, 1)) for k, v in packages.items()), key=lambda kv: -kv[1])[:top]),
+        # solo imports "raíz" de cada fase (profundidad 0): su acumulado no se solapa
+        "top_imports": {
+            p: sorted((m for m in by_phase[p] if m["depth"] == 0), key=lambda m: -m["cumulative_ms"])[:top]
+            for p in IMPORT_PHASES if by_phase[p]
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = "Mide el arranque en frío (hasta la primera respuesta) y el costo de import por módulo."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="intérpretes nuevos a medir (se usa la mediana)")
+        parser.add_argument("--path", default="/api/promos", help="request a servir en frío")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--json", help="escribe el reporte en este archivo")
+
+    def handle(self, *args, **opts):
+        runs = [run_once(opts["path"]) for _ in range(max(1, opts["runs"]))]
+        report = summarize(runs, opts["top"])
+
+        self.stdout.write(f"Arranque en frío hasta la primera respuesta: {report['cold_start_ms']} ms "
+                          f"(proceso completo {report['process_wall_ms']} ms, mediana de {report['runs']}; "
+                          f"status {report['statuses']})")
+        for p, ms in report["phases_ms"].items():
+            self.stdout.write(f"  {PHASE_LABELS[p]:<42} {ms:>8} ms")
+        self.stdout.write("\nImport por paquete (tiempo propio):")
+        for name, ms in report["packages_ms"].items():
+            self.stdout.write(f"  {name:<30} {ms:>8} ms")
+        for p, modules in report["top_imports"].items():
+            self.stdout.write(f"\nImports más caros en {PHASE_LABELS[p]}:")
+            for m in modules:
+                mark = "*" if m["first_party"] else " "
+                self.stdout.write(f" {mark}{m['module']:<45} {m['cumulative_ms']:>8} ms")
+        if opts["json"]:
+            with open(opts["json"], "w") as f:
+                json.dump(report, f, indent=2)
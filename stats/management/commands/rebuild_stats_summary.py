@@ -0,0 +1,18 @@
+# stats/management/commands/rebuild_stats_summary.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from stats.services.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recalcula PlayerStatsSummary desde PlayerMatchStat (corrige drift del resumen incremental)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="id de usuario (repetible); por defecto todos")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            written = rebuild_summaries(opts["users"])
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes recalculados: {written}"))
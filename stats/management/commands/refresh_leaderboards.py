@@ -0,0 +1,36 @@
+# stats/management/commands/refresh_leaderboards.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.services.leaderboards import refresh_leaderboards
+from stats.services.seasons import ALL_TIME, parse_season
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los rankings precalculados (Leaderboard). Solo toca temporadas cuyas "
+        "estadísticas cambiaron; pensado para correr periódicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", action="append", dest="seasons",
+                            help="temporada (p.ej. 2026) o 'all'; repetible. Por defecto todas")
+        parser.add_argument("--force", action="store_true", help="recalcula aunque la huella no haya cambiado")
+
+    def handle(self, *args, **opts):
+        seasons = None
+        if opts["seasons"]:
+            try:
+                seasons = [parse_season(s) for s in opts["seasons"]]
+            except ValueError as exc:
+                raise CommandError(f"Temporada inválida: {exc}")
+            if ALL_TIME not in seasons:
+                seasons.append(ALL_TIME)
+
+        started = time.perf_counter()
+        refreshed = refresh_leaderboards(seasons, force=opts["force"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rankings recalculados: {', '.join(refreshed) or 'ninguno (sin cambios)'} ({elapsed:.2f}s)"
+        ))
@@ -0,0 +1,65 @@
+# stats/management/commands/release.py
+"""
+Fase de release del deploy (Procfile `release:`; en Railway, preDeployCommand
+de railway.json): migra solo si hay migraciones pendientes, así el proceso web
+arranca directo en gunicorn.
+
+El plan pendiente se calcula contra django_migrations; si está vacío no se
+corre `migrate` (ni sus checks ni el post_migrate).
+
+Los estáticos NO van acá: la fase de release corre en un contenedor aparte y
+lo que escribe en STATIC_ROOT no llega al contenedor web. `collectstatic` es
+parte del build (buildCommand de railway.json; el buildpack de Python de
+Heroku lo corre solo), que queda en la imagen que sirve WhiteNoise.
+
+    python manage.py release            # lo necesario
+    python manage.py release --check    # solo informa; sale con error si hay algo pendiente
+    python manage.py release --force    # corre migrate igual
+"""
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+def migration_plan() -> list:
+    """Migraciones pendientes ("app.nombre") en el orden en que se aplicarían."""
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return [f"{migration.app_label}.{migration.name}" for migration, backwards in plan]
+
+
+class Command(BaseCommand):
+    help = "Migra solo si hay migraciones pendientes (los estáticos se juntan en el build)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="no aplica nada; error si hay algo pendiente")
+        parser.add_argument("--force", action="store_true", help="corre migrate igual")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        pending = []
+
+        plan = migration_plan()
+        if plan:
+            self.stdout.write(f"Migraciones pendientes ({len(plan)}): {', '.join(plan)}")
+            pending.append("migrate")
+        elif opts["force"]:
+            pending.append("migrate")
+        else:
+            self.stdout.write("Migraciones: nada pendiente")
+
+        if opts["check"]:
+            if pending:
+                raise CommandError(f"Pendiente: {', '.join(pending)}")
+            return
+
+        if "migrate" in pending:
+            call_command("migrate", interactive=False, verbosity=max(0, opts["verbosity"] - 1))
+        # tabla de CACHE_URL=db://...: no hace nada si ya existe o si la caché no es de BD
+        call_command("createcachetable", verbosity=max(0, opts["verbosity"] - 1))
+        self.stdout.write(self.style.SUCCESS(
+            f"Release en {time.perf_counter() - started:.2f}s: {', '.join(pending) or 'nada que hacer'}"
+        ))
@@ -0,0 +1,84 @@
+# stats/management/commands/seed_league.py
+"""
+Siembra una liga completa (config/seeding.py) en la BD configurada, p.ej.:
+
+    python manage.py seed_league --users 100000 --matches 10000 --enrollments 1000000
+
+Todo en una transacción. En Postgres las tablas grandes van por COPY. Se
+puede correr sobre una BD con datos (usa DNI libres y crea solo filas nuevas),
+pero está pensado para entornos de prueba/staging, nunca producción: todos los
+usuarios comparten SEED_PASSWORD, así que con DEBUG=0 se niega salvo
+--i-know-this-is-not-production.
+
+Los partidos tienen cupo acotado: si lo pedido no entra (inscripciones, pagos
+tomados de ellas...) se avisa cuánto faltó al terminar.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from config.seeding import SEED_PASSWORD, LeagueSpec, generate_league
+
+
+# cantidades de LeagueSpec que se comparan con lo generado
+_REQUESTED = ("users", "matches", "enrollments", "payments", "pending_payments")
+
+
+class Command(BaseCommand):
+    help = "Genera datos coherentes de liga (usuarios, partidos, inscripciones, pagos, stats, promos) en bloque."
+
+    def add_arguments(self, parser):
+        defaults = LeagueSpec()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--locations", type=int, default=defaults.locations)
+        parser.add_argument("--matches", type=int, default=defaults.matches)
+        parser.add_argument("--enrollments", type=int, default=defaults.enrollments,
+                            help="total (cada una con su fila de estadísticas)")
+        parser.add_argument("--payments", type=int, default=defaults.payments, help="pagos aprobados")
+        parser.add_argument("--pending-payments", type=int, default=defaults.pending_payments)
+        parser.add_argument("--teams", type=int, default=defaults.teams)
+        parser.add_argument("--promos", type=int, default=defaults.promos, help="banners y sponsors")
+        parser.add_argument("--promo-days", type=int, default=defaults.promo_days)
+        parser.add_argument("--played", type=float, default=defaults.played,
+                            help="fracción de partidos ya jugados (0-1)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--i-know-this-is-not-production", action="store_true", dest="not_production",
+                            help="permite correrlo con DEBUG=0 (usuarios con contraseña compartida)")
+
+    def handle(self, *args, **opts):
+        if not settings.DEBUG and not opts["not_production"]:
+            raise CommandError(
+                f"DEBUG=0: seed_league crea usuarios con la contraseña compartida '{SEED_PASSWORD}'. "
+                "Si esta BD no es producción, pasa --i-know-this-is-not-production."
+            )
+        if not 0 <= opts["played"] <= 1:
+            raise CommandError("--played debe estar entre 0 y 1")
+        spec = LeagueSpec(
+            users=opts["users"], locations=max(1, opts["locations"]), matches=opts["matches"],
+            enrollments=opts["enrollments"], payments=opts["payments"],
+            pending_payments=opts["pending_payments"], teams=opts["teams"], promos=opts["promos"],
+            promo_days=opts["promo_days"], played=opts["played"],
+        )
+        capacity = spec.matches * 22  # capacidad máxima por partido del generador
+        if spec.enrollments > min(capacity, spec.matches * spec.users):
+            self.stderr.write(self.style.WARNING(
+                f"--enrollments excede la capacidad de {spec.matches} partidos: se generarán menos"
+            ))
+
+        self.stdout.write(f"db={connection.vendor} ({'COPY' if connection.vendor == 'postgresql' else 'bulk_create'})")
+        started = time.perf_counter()
+        with transaction.atomic():
+            league = generate_league(spec, seed=opts["seed"], log=lambda msg: self.stdout.write(f"  {msg}"))
+        elapsed = time.perf_counter() - started
+
+        counts = ", ".join(f"{k}={v}" for k, v in league.counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Liga generada en {elapsed:.1f}s: {counts}"))
+        short = [f"{name} {league.counts.get(name, 0)} de {getattr(spec, name)}"
+                 for name in _REQUESTED if league.counts.get(name, 0) < getattr(spec, name)]
+        if short:
+            self.stderr.write(self.style.WARNING(
+                f"Menos filas que las pedidas (no entran en los cupos de los partidos): {', '.join(short)}"
+            ))
+        self.stdout.write(f"Contraseña de los usuarios: {SEED_PASSWORD}")
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    PlayerMatchStat = apps.get_model('stats', 'PlayerMatchStat')
+    PlayerStatsSummary = apps.get_model('stats', 'PlayerStatsSummary')
+    rows = (
+        PlayerMatchStat.objects.order_by().values('user_id')
+        .annotate(matches=Count('id'), wins=Count('id', filter=Q(is_winner=True)),
+                  goals=Sum('goals'), mvps=Count('id', filter=Q(is_mvp=True)))
+    )
+    PlayerStatsSummary.objects.bulk_create(
+        [PlayerStatsSummary(user_id=r['user_id'], matches=r['matches'], wins=r['wins'],
+                            goals=r['goals'] or 0, mvps=r['mvps']) for r in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_photo'),
+        ('stats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStatsSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats_totals', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('goals', models.PositiveIntegerField(default=0)),
+                ('mvps', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0002_playerstatssummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=8)),
+                ('scope', models.CharField(choices=[('global', 'Liga'), ('city', 'Ciudad'), ('district', 'Distrito'), ('team', 'Equipo')], max_length=10)),
+                ('scope_id', models.PositiveIntegerField(default=0)),
+                ('metric', models.CharField(choices=[('goals', 'Goles'), ('mvps', 'MVPs'), ('wins', 'Victorias'), ('win_rate', '% de victorias')], max_length=10)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('source_rows', models.PositiveIntegerField(default=0)),
+                ('source_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('season', 'scope', 'scope_id', 'metric'), name='uniq_leaderboard')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('value', models.FloatField()),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('goals', models.PositiveIntegerField(default=0)),
+                ('mvps', models.PositiveIntegerField(default=0)),
+                ('leaderboard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='stats.leaderboard')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('leaderboard', 'position'), name='uniq_leaderboard_position')],
+            },
+        ),
+    ]
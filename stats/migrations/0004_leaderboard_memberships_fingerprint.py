@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0003_leaderboards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboard',
+            name='memberships_rows',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='leaderboard',
+            name='memberships_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
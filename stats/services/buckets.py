@@ -0,0 +1,119 @@
+# stats/services/buckets.py
+"""
+Estadísticas de un usuario por periodo (semana, mes, temporada, año).
+
+La agregación se hace en la BD con Trunc sobre match.start_at (GROUP BY por
+periodo; funciona igual en Postgres y en SQLite). Las temporadas se arman
+sumando meses, porque empiezan en STATS_SEASON_START_MONTH.
+
+Caché por usuario y periodo: los periodos cerrados (fin <= ahora) se guardan
+junto con `closed_until` y no se vuelven a calcular; en cada lectura solo se
+consulta el periodo en curso y, si avanzó el calendario, el tramo entre el
+viejo y el nuevo `closed_until`. Un cambio en las estadísticas del usuario
+borra su caché (stats/services/invalidation.py). Si STATS_CACHE_ALIAS es local
+al proceso ese borrado no llega a los otros workers, así que ahí la caché dura
+STATS_LOCAL_CACHE_TTL en vez de STATS_BUCKET_CACHE_TTL.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+from config.caches import is_shared
+from stats.services.seasons import season_bounds, season_of
+from stats.services.summary import SUMMARY_FIELDS, played_stats, summary_aggregates
+
+TRUNCS = {"week": TruncWeek, "month": TruncMonth, "season": TruncMonth, "year": TruncYear}
+_KEY_PREFIX = "stats:buckets:"
+
+
+def periods():
+    return [p for p in settings.STATS_BUCKET_PERIODS if p in TRUNCS]
+
+
+def bucket_start(period: str, dt) -> datetime:
+    dt = timezone.localtime(dt)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "year":
+        return day.replace(month=1, day=1)
+    return season_bounds(season_of(dt))[0]
+
+
+def bucket_end(period: str, start: datetime) -> datetime:
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    if period == "year":
+        return start.replace(year=start.year + 1)
+    return season_bounds(start.year)[1]
+
+
+def _aggregate(user_id, period, since=None, until=None) -> dict:
+    """{inicio_iso: totales} de los periodos con partidos en [since, until)."""
+    qs = played_stats().filter(user_id=user_id)
+    if since is not None:
+        qs = qs.filter(match__start_at__gte=since)
+    if until is not None:
+        qs = qs.filter(match__start_at__lt=until)
+    rows = (qs.annotate(bucket=TRUNCS[period]("match__start_at"))
+            .values("bucket").annotate(**summary_aggregates()).order_by("bucket"))
+
+    out = {}
+    for row in rows:
+        start = bucket_start(period, row["bucket"]) if period == "season" else row["bucket"]
+        totals = out.setdefault(start.isoformat(), dict.fromkeys(SUMMARY_FIELDS, 0))
+        for f in SUMMARY_FIELDS:
+            totals[f] += row[f]
+    return out
+
+
+def _cache():
+    return caches[settings.STATS_CACHE_ALIAS]
+
+
+def _timeout():
+    if is_shared(settings.STATS_CACHE_ALIAS):
+        return settings.STATS_BUCKET_CACHE_TTL
+    return min(settings.STATS_BUCKET_CACHE_TTL, settings.STATS_LOCAL_CACHE_TTL)
+
+
+def user_buckets(user_id: int, period: str) -> list:
+    """Periodos con actividad, del más reciente al más antiguo."""
+    current = bucket_start(period, timezone.now())
+    key = f"{_KEY_PREFIX}{user_id}:{period}"
+    cached = _cache().get(key)
+
+    if cached is None or cached["closed_until"] != current.isoformat():
+        since = datetime.fromisoformat(cached["closed_until"]) if cached else None
+        closed = dict(cached["buckets"]) if cached else {}
+        # solo el tramo que se cerró desde la última vez; lo anterior no se recalcula
+        closed.update(_aggregate(user_id, period, since=since, until=current))
+        cached = {"closed_until": current.isoformat(), "buckets": closed}
+        _cache().set(key, cached, timeout=_timeout())
+
+    buckets = {**cached["buckets"], **_aggregate(user_id, period, since=current)}
+    result = []
+    for start_iso in sorted(buckets, reverse=True):
+        start = datetime.fromisoformat(start_iso)
+        end = bucket_end(period, start)
+        result.append({
+            "period": period,
+            "start": start.date().isoformat(),
+            "end": end.date().isoformat(),
+            "closed": start < current,
+            **buckets[start_iso],
+        })
+    return result
+
+
+def invalidate_user_buckets(user_ids):
+    keys = [f"{_KEY_PREFIX}{u}:{p}" for u in user_ids for p in TRUNCS]
+    if keys:
+        _cache().delete_many(keys)
@@ -0,0 +1,25 @@
+# stats/services/exports.py
+from config.exports import Export
+from stats.api.models import PlayerMatchStat
+
+HEADERS = [
+    "id", "match_identifier", "match_title", "match_start_at",
+    "user_id", "email", "first_name", "last_name",
+    "goals", "is_winner", "is_mvp", "updated_at",
+]
+
+
+def stats_export(match=None, start=None, end=None) -> Export:
+    qs = PlayerMatchStat.objects.all()
+    if match is not None:
+        qs = qs.filter(match=match)
+    if start is not None:
+        qs = qs.filter(match__start_at__gte=start)
+    if end is not None:
+        qs = qs.filter(match__start_at__lte=end)
+    rows = qs.order_by("id").values_list(
+        "id", "match__match_identifier", "match__title", "match__start_at",
+        "user_id", "user__email", "user__first_name", "user__last_name",
+        "goals", "is_winner", "is_mvp", "updated_at",
+    )
+    return Export("player-stats", HEADERS, rows)
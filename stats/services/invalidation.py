@@ -0,0 +1,30 @@
+# stats/services/invalidation.py
+"""
+Punto único para refrescar lo derivado de PlayerMatchStat.
+
+- invalidate_derived: borra cachés (por equipo y por periodo). Lo llaman las
+  señales en cada cambio de fila.
+- stats_changed: para escrituras masivas (bulk_update/bulk_create no disparan
+  señales); recalcula además los resúmenes. Se llama UNA vez por operación con
+  todos los usuarios afectados, no por fila.
+
+Los rankings (Leaderboard) no se tocan aquí: refresh_leaderboards detecta el
+cambio por la huella de la temporada (filas + último updated_at).
+"""
+from stats.services.buckets import invalidate_user_buckets
+from stats.services.summary import rebuild_summaries
+from stats.services.teams import invalidate_user_teams
+
+
+def invalidate_derived(user_ids):
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        invalidate_user_teams(user_ids)
+        invalidate_user_buckets(user_ids)
+
+
+def stats_changed(user_ids):
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        rebuild_summaries(user_ids)
+        invalidate_derived(user_ids)
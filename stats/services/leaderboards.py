@@ -0,0 +1,159 @@
+# stats/services/leaderboards.py
+"""
+Rankings precalculados sobre PlayerMatchStat.
+
+Por cada temporada (y "all") se calcula, con UNA consulta GROUP BY por ámbito
+(liga, ciudad, distrito, equipo), los totales por usuario; luego se ordena en
+Python y se guardan como Leaderboard + LeaderboardEntry. La lectura es un rango
+de `position`, O(página) sin importar cuántas estadísticas haya.
+
+`refresh_leaderboards()` está pensado para correr periódicamente (cron /
+`manage.py refresh_leaderboards`): cada temporada guarda una huella (filas y
+último updated_at de sus estadísticas y de las membresías de equipo que la
+cubren, que deciden a qué equipo se atribuye cada fila) y solo se recalcula si
+cambió, así las temporadas cerradas no cuestan nada.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from matches.models import TeamMembership
+from stats.api.models import Leaderboard, LeaderboardEntry, LeaderboardMetric, LeaderboardScope
+from stats.services.seasons import ALL_TIME, current_season, season_bounds, season_of
+from stats.services.summary import played_stats, summary_aggregates
+from stats.services.teams import attribute_teams
+
+# columna por la que se agrupa cada ámbito (None = toda la liga)
+SCOPE_COLUMNS = {
+    LeaderboardScope.GLOBAL: None,
+    LeaderboardScope.CITY: "match__location__district__city_id",
+    LeaderboardScope.DISTRICT: "match__location__district_id",
+    LeaderboardScope.TEAM: "team_id",
+}
+
+
+def season_stats(season):
+    qs = played_stats()
+    if season == ALL_TIME:
+        return qs
+    start, end = season_bounds(season)
+    return qs.filter(match__start_at__gte=start, match__start_at__lt=end)
+
+
+def _metric_value(metric, row):
+    if metric == LeaderboardMetric.WIN_RATE:
+        if row["decided"] < settings.STATS_LEADERBOARD_MIN_MATCHES:
+            return None
+        return round(row["wins"] / row["decided"], 4)
+    return row[metric] or None  # 0 goles/mvps/victorias no entra al ranking
+
+
+def rank_rows(metric, rows):
+    """[(position, rank, value, row)] ordenado; empates comparten rank."""
+    scored = [(v, r) for r in rows if (v := _metric_value(metric, r)) is not None]
+    scored.sort(key=lambda item: (-item[0], -item[1]["matches"], item[1]["user_id"]))
+    ranked, prev_value, rank = [], None, 0
+    for position, (value, row) in enumerate(scored[:settings.STATS_LEADERBOARD_SIZE], start=1):
+        if value != prev_value:
+            rank, prev_value = position, value
+        ranked.append((position, rank, value, row))
+    return ranked
+
+
+def _grouped_rows(qs):
+    """{(scope, scope_id): [fila por usuario]} con una consulta por ámbito."""
+    groups = defaultdict(list)
+    aggregates = {**summary_aggregates(), "decided": Count("id", filter=Q(is_winner__isnull=False))}
+    for scope, column in SCOPE_COLUMNS.items():
+        base = attribute_teams(qs) if scope == LeaderboardScope.TEAM else qs
+        fields = ["user_id"] + ([column] if column else [])
+        for row in base.values(*fields).annotate(**aggregates).order_by():
+            scope_id = row[column] if column else 0
+            if scope_id is not None:
+                groups[(scope, scope_id)].append(row)
+    return groups
+
+
+def season_memberships(season):
+    """Membresías vigentes en algún día de la temporada (las que usa attribute_teams)."""
+    qs = TeamMembership.objects.all()
+    if season == ALL_TIME:
+        return qs
+    start, end = season_bounds(season)
+    return qs.filter(Q(date_to__isnull=True) | Q(date_to__gt=start.date()), date_from__lt=end.date())
+
+
+def _fingerprint(season, qs) -> dict:
+    fp = qs.aggregate(source_rows=Count("id"), source_updated_at=Max("updated_at"))
+    teams = season_memberships(season).aggregate(rows=Count("id"), updated_at=Max("updated_at"))
+    return {
+        "source_rows": fp["source_rows"] or 0,
+        "source_updated_at": fp["source_updated_at"],
+        # alta/baja/edición de una membresía cambia el ranking por equipo aunque las stats no cambien
+        "memberships_rows": teams["rows"] or 0,
+        "memberships_updated_at": teams["updated_at"],
+    }
+
+
+def refresh_season(season, force=False) -> bool:
+    """Recalcula los rankings de una temporada (o ALL_TIME). True si se recalculó."""
+    label = str(season)
+    qs = season_stats(season)
+    fingerprint = _fingerprint(season, qs)
+    if not force:
+        current = Leaderboard.objects.filter(season=label).values(*fingerprint).first()
+        if current == fingerprint or (current is None and not fingerprint["source_rows"]):
+            return False
+
+    now = timezone.now()
+    boards, ranked_by_board = [], []
+    for (scope, scope_id), rows in _grouped_rows(qs).items():
+        for metric in LeaderboardMetric.values:
+            ranked = rank_rows(metric, rows)
+            boards.append(Leaderboard(season=label, scope=scope, scope_id=scope_id, metric=metric,
+                                      size=len(ranked), computed_at=now, **fingerprint))
+            ranked_by_board.append(ranked)
+
+    with transaction.atomic():
+        Leaderboard.objects.filter(season=label).delete()
+        Leaderboard.objects.bulk_create(boards, batch_size=500)
+        LeaderboardEntry.objects.bulk_create(
+            (LeaderboardEntry(leaderboard=board, position=position, rank=rank, user_id=row["user_id"],
+                              value=value, matches=row["matches"], wins=row["wins"],
+                              goals=row["goals"], mvps=row["mvps"])
+             for board, ranked in zip(boards, ranked_by_board)
+             for position, rank, value, row in ranked),
+            batch_size=1000,
+        )
+    return True
+
+
+def all_seasons():
+    first = played_stats().aggregate(first=Min("match__start_at"))["first"]
+    if first is None:
+        return []
+    return list(range(season_of(first), current_season() + 1))
+
+
+def refresh_leaderboards(seasons=None, force=False) -> list:
+    """Recalcula las temporadas cuya huella cambió (+ histórico). Devuelve las recalculadas."""
+    seasons = all_seasons() if seasons is None else seasons
+    targets = list(seasons) + ([ALL_TIME] if ALL_TIME not in seasons else [])
+    return [str(s) for s in targets if refresh_season(s, force=force)]
+
+
+def leaderboard_page(season, metric, scope=LeaderboardScope.GLOBAL, scope_id=0, page=1, page_size=50):
+    """(Leaderboard | None, [LeaderboardEntry]) de la página pedida: dos consultas indexadas."""
+    board = Leaderboard.objects.filter(season=str(season), scope=scope, scope_id=scope_id or 0,
+                                       metric=metric).first()
+    if board is None:
+        return None, []
+    offset = (page - 1) * page_size
+    entries = list(
+        LeaderboardEntry.objects.select_related("user")
+        .filter(leaderboard=board, position__gt=offset, position__lte=offset + page_size)
+    )
+    return board, entries
@@ -0,0 +1,74 @@
+# stats/services/results.py
+"""
+Carga de resultados de un partido completo (goles por jugador, lado ganador y
+MVP) en una sola transacción: un bulk_update de PlayerMatchStat, el partido
+pasa a FINISHED y los derivados se refrescan una vez.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from matches.models import Enrollment, Match, MatchStatus
+from stats.api.models import PlayerMatchStat
+from stats.services.invalidation import stats_changed
+
+SIDES = ("A", "B")
+DRAW = "draw"
+
+
+def _is_winner(side, winning_side):
+    if winning_side is None or not side:
+        return None  # desconocido
+    if winning_side == DRAW:
+        return False
+    return side == winning_side
+
+
+@transaction.atomic
+def record_match_results(match_id: int, players, winning_side=None, mvp_user_id=None) -> dict:
+    """
+    players: [{"user_id": 1, "goals": 2, "side": "A"}, ...] con TODOS los inscritos activos.
+    winning_side: "A" | "B" | "draw" | None (desconocido).
+    """
+    match = Match.objects.select_for_update().get(pk=match_id)
+    if match.status == MatchStatus.CANCELLED:
+        raise ValidationError("Match is cancelled.")
+    if winning_side not in (None, DRAW, *SIDES):
+        raise ValidationError("Invalid winning side.")
+
+    by_user = {}
+    for p in players:
+        if p["user_id"] in by_user:
+            raise ValidationError(f"Duplicated player {p['user_id']}.")
+        by_user[p["user_id"]] = p
+
+    enrolled = set(
+        Enrollment.objects.filter(match=match, is_active=True).values_list("user_id", flat=True)
+    )
+    unknown = sorted(set(by_user) - enrolled)
+    missing = sorted(enrolled - set(by_user))
+    if unknown or missing:
+        raise ValidationError({"unknown_players": unknown, "missing_players": missing})
+    if mvp_user_id is not None and mvp_user_id not in enrolled:
+        raise ValidationError("MVP must be an enrolled player.")
+
+    stats = {s.user_id: s for s in PlayerMatchStat.objects.filter(match=match, user_id__in=enrolled)}
+    absent = [PlayerMatchStat(user_id=uid, match=match) for uid in enrolled if uid not in stats]
+    if absent:
+        PlayerMatchStat.objects.bulk_create(absent, ignore_conflicts=True)
+        stats = {s.user_id: s for s in PlayerMatchStat.objects.filter(match=match, user_id__in=enrolled)}
+
+    now = timezone.now()
+    for uid, stat in stats.items():
+        p = by_user[uid]
+        stat.goals = p.get("goals") or 0
+        stat.is_winner = _is_winner(p.get("side"), winning_side)
+        stat.is_mvp = uid == mvp_user_id
+        stat.updated_at = now  # bulk_update no aplica auto_now
+    PlayerMatchStat.objects.bulk_update(stats.values(), ["goals", "is_winner", "is_mvp", "updated_at"])
+
+    match.status = MatchStatus.FINISHED
+    match.save(update_fields=["status", "updated_at"])
+
+    stats_changed(stats.keys())
+    return {"match_id": match.id, "players": len(stats), "status": match.status}
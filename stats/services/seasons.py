@@ -0,0 +1,39 @@
+# stats/services/seasons.py
+"""
+Temporadas: una por año, empezando el día 1 de STATS_SEASON_START_MONTH.
+La temporada se identifica por el año en que empieza (p.ej. 2026).
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+ALL_TIME = "all"
+
+
+def season_bounds(season: int):
+    """[inicio, fin) de la temporada como datetimes aware."""
+    month = settings.STATS_SEASON_START_MONTH
+    tz = timezone.get_current_timezone()
+    return datetime(season, month, 1, tzinfo=tz), datetime(season + 1, month, 1, tzinfo=tz)
+
+
+def season_of(dt) -> int:
+    dt = timezone.localtime(dt)
+    return dt.year if dt.month >= settings.STATS_SEASON_START_MONTH else dt.year - 1
+
+
+def current_season() -> int:
+    return season_of(timezone.now())
+
+
+def parse_season(value):
+    """'all' | '2026' -> ALL_TIME | 2026. ValueError si no es válido."""
+    if value in (None, ""):
+        return current_season()
+    if value == ALL_TIME:
+        return ALL_TIME
+    season = int(value)
+    if not 2000 <= season <= 2100:
+        raise ValueError(value)
+    return season
@@ -0,0 +1,86 @@
+# stats/services/summary.py
+"""
+Resumen de estadísticas por usuario (PlayerStatsSummary).
+
+Cada PlayerMatchStat aporta: 1 partido, 1 victoria si is_winner es True, sus
+goles y 1 mvp si is_mvp. Las señales (stats/utils/signals.py) aplican el delta
+de cada alta/edición/baja; `rebuild_summaries` recalcula desde cero.
+"""
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from matches.models import MatchStatus
+from stats.api.models import PlayerMatchStat, PlayerStatsSummary
+
+SUMMARY_FIELDS = ("matches", "wins", "goals", "mvps")
+EMPTY_SUMMARY = dict.fromkeys(SUMMARY_FIELDS, 0)
+
+
+def contribution(goals, is_winner, is_mvp) -> dict:
+    return {"matches": 1, "wins": int(is_winner is True), "goals": goals or 0, "mvps": int(bool(is_mvp))}
+
+
+def played_stats():
+    """Estadísticas que cuentan en rankings/equipos: partidos publicados o finalizados que ya empezaron."""
+    return PlayerMatchStat.objects.filter(
+        match__status__in=[MatchStatus.PUBLISHED, MatchStatus.FINISHED],
+        match__start_at__lte=timezone.now(),
+    ).order_by()
+
+
+def summary_aggregates() -> dict:
+    """Los cuatro totales en UNA consulta (para aggregate/annotate)."""
+    return {
+        "matches": Count("id"),
+        "wins": Count("id", filter=Q(is_winner=True)),
+        "goals": Coalesce(Sum("goals"), 0),
+        "mvps": Count("id", filter=Q(is_mvp=True)),
+    }
+
+
+def apply_delta(user_id, delta: dict, sign: int = 1):
+    """Suma (sign=1) o resta (sign=-1) `delta` al resumen del usuario."""
+    delta = {k: sign * v for k, v in delta.items() if v}
+    if not delta:
+        return
+    updates = {k: Greatest(F(k) + v, 0) for k, v in delta.items()}
+    if PlayerStatsSummary.objects.filter(user_id=user_id).update(**updates):
+        return
+    # sin fila: solo se crea al sumar (en un borrado en cascada del usuario no hay que recrearla)
+    if sign > 0:
+        row, created = PlayerStatsSummary.objects.get_or_create(
+            user_id=user_id, defaults={k: max(v, 0) for k, v in delta.items()}
+        )
+        if not created:
+            PlayerStatsSummary.objects.filter(user_id=user_id).update(**updates)
+
+
+def summary_for_user(user) -> dict:
+    """Lee la fila del resumen (usa el select_related("stats_totals") si viene cargado)."""
+    try:
+        row = user.stats_totals
+    except PlayerStatsSummary.DoesNotExist:
+        return dict(EMPTY_SUMMARY)
+    return {k: getattr(row, k) for k in SUMMARY_FIELDS}
+
+
+def rebuild_summaries(user_ids=None) -> int:
+    """Recalcula los resúmenes con un GROUP BY y un upsert. Devuelve filas escritas."""
+    stats = PlayerMatchStat.objects.order_by()
+    summaries = PlayerStatsSummary.objects.all()
+    if user_ids is not None:
+        stats = stats.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+
+    rows = [
+        PlayerStatsSummary(user_id=r["user_id"], **{k: r[k] for k in SUMMARY_FIELDS})
+        for r in stats.values("user_id").annotate(**summary_aggregates())
+    ]
+    PlayerStatsSummary.objects.bulk_create(
+        rows, batch_size=1000, update_conflicts=True,
+        unique_fields=["user"], update_fields=[*SUMMARY_FIELDS, "updated_at"],
+    )
+    # usuarios que ya no tienen estadísticas (subconsulta: sin un parámetro por usuario)
+    summaries.exclude(user_id__in=stats.values("user_id")).delete()
+    return len(rows)
@@ -0,0 +1,102 @@
+# stats/services/teams.py
+"""
+Estadísticas por equipo a partir del historial de membresías.
+
+Cada PlayerMatchStat se atribuye al equipo del jugador vigente al inicio del
+partido: date_from <= match.start_at < date_to (date_to NULL = vigente). Es un
+único JOIN por rango (índices de TeamMembership por user y por team+fechas).
+
+El resultado por equipo se cachea (STATS_CACHE_ALIAS) y se invalida cuando
+cambian las estadísticas de sus jugadores o sus membresías. Con un alias local
+al proceso la invalidación solo llega a un worker: ahí el TTL se acota a
+STATS_LOCAL_CACHE_TTL.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F, Q
+
+from config.caches import is_shared
+from matches.models import TeamMembership
+from stats.services.summary import played_stats, summary_aggregates
+
+_KEY_PREFIX = "stats:team:"
+
+
+def attribute_teams(stats_qs, team_id=None):
+    """
+    Anota `team_id` en cada PlayerMatchStat según la membresía vigente al
+    inicio del partido; las filas sin membresía en esa fecha quedan fuera.
+    Con `team_id` filtra a ese equipo dentro del mismo JOIN.
+    """
+    match_day = F("match__start_at__date")
+    conditions = {"user__team_memberships__date_from__lte": match_day}
+    if team_id is not None:
+        conditions["user__team_memberships__team_id"] = team_id
+    return stats_qs.filter(
+        Q(user__team_memberships__date_to__isnull=True) | Q(user__team_memberships__date_to__gt=match_day),
+        **conditions,
+    ).annotate(team_id=F("user__team_memberships__team_id"))
+
+
+def compute_team_stats(team_id: int) -> dict:
+    """Totales + mejores jugadores del equipo: dos consultas."""
+    qs = attribute_teams(played_stats(), team_id=team_id)
+    totals = qs.aggregate(
+        matches=Count("match", distinct=True),
+        wins=Count("match", filter=Q(is_winner=True), distinct=True),
+        goals=summary_aggregates()["goals"],
+        mvps=Count("id", filter=Q(is_mvp=True)),
+        appearances=Count("id"),
+        players=Count("user", distinct=True),
+    )
+    top = (
+        qs.values("user_id", "user__first_name", "user__last_name", "user__photo")
+        .annotate(**summary_aggregates())
+        .order_by("-goals", "-mvps", "-matches", "user_id")[:settings.STATS_TEAM_TOP_PLAYERS]
+    )
+    totals["top_players"] = [
+        {
+            "user_id": r["user_id"],
+            "first_name": r["user__first_name"],
+            "last_name": r["user__last_name"],
+            "photo": r["user__photo"],
+            "matches": r["matches"],
+            "wins": r["wins"],
+            "goals": r["goals"],
+            "mvps": r["mvps"],
+        }
+        for r in top
+    ]
+    return totals
+
+
+def _cache():
+    return caches[settings.STATS_CACHE_ALIAS]
+
+
+def _timeout():
+    if is_shared(settings.STATS_CACHE_ALIAS):
+        return settings.STATS_TEAM_CACHE_TTL
+    return min(settings.STATS_TEAM_CACHE_TTL, settings.STATS_LOCAL_CACHE_TTL)
+
+
+def team_stats(team_id: int) -> dict:
+    key = f"{_KEY_PREFIX}{team_id}"
+    data = _cache().get(key)
+    if data is None:
+        data = compute_team_stats(team_id)
+        _cache().set(key, data, timeout=_timeout())
+    return data
+
+
+def invalidate_team_stats(*team_ids):
+    team_ids = {t for t in team_ids if t}
+    if team_ids:
+        _cache().delete_many([f"{_KEY_PREFIX}{t}" for t in team_ids])
+
+
+def invalidate_user_teams(user_ids):
+    """Invalida los equipos por los que pasaron estos usuarios (una consulta)."""
+    team_ids = (TeamMembership.objects.filter(user_id__in=list(user_ids))
+                .values_list("team_id", flat=True).distinct())
+    invalidate_team_stats(*team_ids)
@@ -1,3 +1,368 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import tempfile
+import uuid
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import City, District, SessionToken
+from config.db_router import PRIMARY, REPLICA, ReplicaRouter, _RequestState, _state, pin_primary
+from matches.models import Enrollment, Location, Match, MatchStatus, Team, TeamMembership
+from matches.services.memberships import clear_current_team, set_current_team
+from payments.models import Payment, PaymentStatus
+from stats.api.models import PlayerMatchStat, PlayerStatsSummary
+from stats.services import buckets
+from stats.services.leaderboards import leaderboard_page, refresh_leaderboards
+from stats.services.results import record_match_results
+from stats.services.summary import SUMMARY_FIELDS, played_stats, rebuild_summaries
+from stats.services.teams import attribute_teams, compute_team_stats
+
+User = get_user_model()
+
+# con DATABASE_REPLICA_URL la réplica es un espejo de la BD de prueba (TEST MIRROR)
+_DATABASES = {"default", REPLICA} if REPLICA in settings.DATABASES else {"default"}
+_DB_CACHE = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "test_cache"}}
+
+
+def _user(username="jugador", document_number="12345678"):
+    return User.objects.create_user(username, email=f"{username}@example.com", password="x",
+                                    document_number=document_number)
+
+
+def _location():
+    district = District.objects.create(city=City.objects.create(name="Lima"), name="Miraflores")
+    return Location.objects.create(district=district, field_name="Cancha", address="Av. 1")
+
+
+def _match(location, days_ago=1, status=MatchStatus.FINISHED):
+    return Match.objects.create(location=location, start_at=timezone.now() - timedelta(days=days_ago),
+                                capacity=10, price_amount=20, status=status)
+
+
+@override_settings(CACHES=_DB_CACHE, REPLICA_CACHE_ALIAS="default", STATS_CACHE_ALIAS="default",
+                   AUTH_TOKEN_CACHE_ENABLED=False)
+class ReplicaDatabaseCacheTests(TransactionTestCase):
+    """CACHE_URL=db://... con réplica: la tabla de la caché se lee siempre del primario."""
+    databases = _DATABASES
+
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+        self.user = _user()
+
+    def test_cache_entry_is_read_from_primary(self):
+        cache = caches["default"]
+        token = _state.set(_RequestState(SimpleNamespace(user=self.user), replica=True))
+        try:
+            self.assertEqual(ReplicaRouter().db_for_read(cache.cache_model_class), PRIMARY)
+            self.assertIsNone(cache.get("stats:missing"))  # no pasa por pinned() ni rompe en _meta.label
+        finally:
+            _state.reset(token)
+
+    @skipUnless(REPLICA in settings.DATABASES, "sin DATABASE_REPLICA_URL")
+    def test_read_replica_view_with_database_cache(self):
+        token = uuid.uuid4().hex
+        SessionToken.objects.create(user=self.user, document_number=self.user.document_number,
+                                    device_id="d1", token=token)
+        headers = {"Authorization": f"Bearer {token}"}
+        response = self.client.get(reverse("stats-me-summary"), headers=headers, secure=True)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        pin_primary(self.user.pk)  # fijado: el pin se lee del primario sin recursión
+        response = self.client.get(reverse("stats-me-summary"), headers=headers, secure=True)
+        self.assertEqual(response.status_code, 200, response.content)
+
+
+class SummarySignalTests(TestCase):
+    """Las señales mantienen PlayerStatsSummary igual a rebuild_summaries()."""
+
+    def setUp(self):
+        location = _location()
+        self.match, self.other_match = _match(location), _match(location, days_ago=2)
+        self.ana, self.beto = _user("ana", "11111111"), _user("beto", "22222222")
+
+    @staticmethod
+    def _summaries() -> dict:
+        return {row["user_id"]: row for row in PlayerStatsSummary.objects.values("user_id", *SUMMARY_FIELDS)}
+
+    def assertMatchesRebuild(self):
+        # las señales dejan en cero la fila de quien se queda sin estadísticas; rebuild la borra
+        incremental = {u: row for u, row in self._summaries().items() if any(row[f] for f in SUMMARY_FIELDS)}
+        rebuild_summaries()
+        self.assertEqual(incremental, self._summaries())
+
+    def test_create_and_update(self):
+        stat = PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=2, is_winner=True)
+        PlayerMatchStat.objects.create(user=self.ana, match=self.other_match, goals=1, is_mvp=True)
+        self.assertMatchesRebuild()
+
+        stat = PlayerMatchStat.objects.get(pk=stat.pk)  # from_db: delta sin releer la fila
+        stat.goals, stat.is_winner, stat.is_mvp = 5, False, True
+        stat.save()
+        stat.goals = 1  # segundo save de la misma instancia
+        stat.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(self._summaries()[self.ana.pk]["goals"], 2)
+
+    def test_update_of_instance_not_loaded_from_db(self):
+        stat = PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=2, is_winner=True)
+        deferred = PlayerMatchStat.objects.only("id").get(pk=stat.pk)
+        deferred.goals = 3
+        deferred.save()
+        PlayerMatchStat(pk=stat.pk, user=self.ana, match=self.match, goals=4, is_winner=False,
+                        created_at=stat.created_at).save()
+        self.assertMatchesRebuild()
+        self.assertEqual(self._summaries()[self.ana.pk]["wins"], 0)
+
+    def test_move_stat_between_users_and_matches(self):
+        stat = PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=3, is_winner=True, is_mvp=True)
+        PlayerMatchStat.objects.create(user=self.beto, match=self.other_match, goals=1)
+
+        stat = PlayerMatchStat.objects.get(pk=stat.pk)
+        stat.user = self.beto
+        stat.save()
+        self.assertMatchesRebuild()
+        self.assertNotIn(self.ana.pk, self._summaries())
+
+        stat.match, stat.goals = self.other_match, 0
+        stat.user = self.ana
+        stat.save()
+        self.assertMatchesRebuild()
+
+    def test_deletes(self):
+        PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=2, is_winner=True)
+        PlayerMatchStat.objects.create(user=self.ana, match=self.other_match, goals=1, is_mvp=True)
+        PlayerMatchStat.objects.create(user=self.beto, match=self.match, goals=4)
+
+        PlayerMatchStat.objects.filter(user=self.ana, match=self.other_match).delete()  # leave_match
+        self.assertMatchesRebuild()
+        self.match.delete()  # cascada
+        self.assertEqual(self._summaries()[self.beto.pk]["goals"], 0)
+        self.assertMatchesRebuild()
+        self.assertEqual(self._summaries(), {})
+
+    def test_backfill_migration(self):
+        PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=2, is_winner=True)
+        PlayerMatchStat.objects.create(user=self.ana, match=self.other_match, is_mvp=True)
+        PlayerMatchStat.objects.create(user=self.beto, match=self.match, goals=4, is_winner=False)
+        expected = self._summaries()
+
+        PlayerStatsSummary.objects.all().delete()
+        import_module("stats.migrations.0002_playerstatssummary").backfill_summaries(apps, None)
+        self.assertEqual(self._summaries(), expected)
+        rebuild_summaries()
+        self.assertEqual(self._summaries(), expected)
+
+
+class LeaderboardFreshnessTests(TestCase):
+    """Tras un cambio, la siguiente pasada de refresh_leaderboards lo refleja en la lectura."""
+
+    def setUp(self):
+        self.match = _match(_location())
+        self.ana = _user("ana", "11111111")
+        self.rojos, self.azules = Team.objects.create(name="Rojos"), Team.objects.create(name="Azules")
+        self.membership = TeamMembership.objects.create(
+            user=self.ana, team=self.rojos, date_from=timezone.localdate() - timedelta(days=30))
+        self.stat = PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=3)
+        refresh_leaderboards()
+
+    def _goals(self, **params) -> dict:
+        response = self.client.get(reverse("stats-leaderboard", args=["goals"]),
+                                   {"season": "all", **params}, secure=True)
+        self.assertEqual(response.status_code, 200, response.content)
+        return {row["user_id"]: row["goals"] for row in response.json()["data"]["results"]}
+
+    def test_membership_edit(self):
+        self.assertEqual(self._goals(team=self.rojos.pk), {self.ana.pk: 3})
+        self.membership.team = self.azules
+        self.membership.save()
+
+        self.assertIn("all", refresh_leaderboards())
+        self.assertEqual(self._goals(team=self.rojos.pk), {})
+        self.assertEqual(self._goals(team=self.azules.pk), {self.ana.pk: 3})
+
+    def test_team_change_backdated_before_the_match(self):
+        set_current_team(self.ana, self.azules, start_date=timezone.localdate() - timedelta(days=2))
+        self.assertIn("all", refresh_leaderboards())
+        self.assertEqual(self._goals(team=self.azules.pk), {self.ana.pk: 3})
+
+        # cerrar la membresía es solo un update() de date_to: también cambia la huella
+        clear_current_team(self.ana, end_date=timezone.localdate() - timedelta(days=2))
+        self.assertIn("all", refresh_leaderboards())
+        self.assertEqual(self._goals(team=self.azules.pk), {})
+        self.assertEqual(self._goals(), {self.ana.pk: 3})
+
+    def test_stat_update(self):
+        self.stat.goals = 5
+        self.stat.save()
+        self.assertIn("all", refresh_leaderboards())
+        self.assertEqual(self._goals(), {self.ana.pk: 5})
+        self.assertEqual(refresh_leaderboards(), [])  # sin cambios no se recalcula nada
+
+
+class RecordMatchResultsTests(TestCase):
+    def setUp(self):
+        location = _location()
+        self.match = _match(location, status=MatchStatus.PUBLISHED)
+        self.ana, self.beto, self.caro = (_user(n, d) for n, d in
+                                          (("ana", "11111111"), ("beto", "22222222"), ("caro", "33333333")))
+        for user in (self.ana, self.beto, self.caro):
+            Enrollment.objects.create(match=self.match, user=user)
+        # beto ya tenía la fila (se inscribió con join_match) y estadísticas de otro partido
+        PlayerMatchStat.objects.create(user=self.beto, match=self.match)
+        PlayerMatchStat.objects.create(user=self.beto, match=_match(location, days_ago=8), goals=1, is_winner=True)
+
+    def _record(self, goals, winning_side="A", mvp=None):
+        sides = {self.ana.pk: "A", self.beto.pk: "A", self.caro.pk: "B"}
+        players = [{"user_id": uid, "goals": goals.get(uid, 0), "side": side} for uid, side in sides.items()]
+        return record_match_results(self.match.id, players, winning_side=winning_side, mvp_user_id=mvp)
+
+    def test_summaries_and_leaderboard(self):
+        result = self._record({self.ana.pk: 2, self.caro.pk: 1}, mvp=self.ana.pk)
+        self.assertEqual(result, {"match_id": self.match.id, "players": 3, "status": MatchStatus.FINISHED})
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, MatchStatus.FINISHED)
+
+        summaries = {r["user_id"]: r for r in PlayerStatsSummary.objects.values("user_id", *SUMMARY_FIELDS)}
+        self.assertEqual(summaries[self.ana.pk], {"user_id": self.ana.pk, "matches": 1, "wins": 1, "goals": 2, "mvps": 1})
+        self.assertEqual(summaries[self.beto.pk], {"user_id": self.beto.pk, "matches": 2, "wins": 2, "goals": 1, "mvps": 0})
+        self.assertEqual(summaries[self.caro.pk], {"user_id": self.caro.pk, "matches": 1, "wins": 0, "goals": 1, "mvps": 0})
+        rebuild_summaries()
+        self.assertEqual(summaries, {r["user_id"]: r for r in PlayerStatsSummary.objects.values("user_id", *SUMMARY_FIELDS)})
+
+        refresh_leaderboards()
+        _, entries = leaderboard_page("all", "goals")
+        self.assertEqual([(e.user_id, e.rank, e.value) for e in entries],
+                         [(self.ana.pk, 1, 2), (self.beto.pk, 2, 1), (self.caro.pk, 2, 1)])
+
+        # corrección de resultados: bulk_update sin señales, pero updated_at cambia la huella
+        self._record({self.caro.pk: 4}, winning_side="B")
+        self.assertIn("all", refresh_leaderboards())
+        _, entries = leaderboard_page("all", "goals")
+        self.assertEqual([(e.user_id, e.value) for e in entries], [(self.caro.pk, 4), (self.beto.pk, 1)])
+        self.assertEqual(PlayerStatsSummary.objects.get(user=self.ana).mvps, 0)
+
+
+class TeamAttributionTests(TestCase):
+    def test_player_who_changed_teams_mid_season(self):
+        location = _location()
+        ana = _user("ana")
+        rojos, azules = Team.objects.create(name="Rojos"), Team.objects.create(name="Azules")
+        today = timezone.localdate()
+        TeamMembership.objects.create(user=ana, team=rojos, date_from=today - timedelta(days=60),
+                                      date_to=today - timedelta(days=10))
+        TeamMembership.objects.create(user=ana, team=azules, date_from=today - timedelta(days=10))
+        before, switch_day, after = (_match(location, days_ago=d) for d in (20, 10, 5))
+        PlayerMatchStat.objects.create(user=ana, match=before, goals=2, is_winner=True)
+        PlayerMatchStat.objects.create(user=ana, match=switch_day, goals=1)  # date_to excluye el día del cambio
+        PlayerMatchStat.objects.create(user=ana, match=after, goals=3, is_mvp=True)
+        PlayerMatchStat.objects.create(user=ana, match=_match(location, days_ago=90), goals=7)  # sin equipo
+
+        attributed = attribute_teams(played_stats()).values_list("match_id", "team_id")
+        self.assertCountEqual(attributed, [(before.pk, rojos.pk), (switch_day.pk, azules.pk),
+                                           (after.pk, azules.pk)])
+        rojos_stats, azules_stats = compute_team_stats(rojos.pk), compute_team_stats(azules.pk)
+        self.assertEqual((rojos_stats["matches"], rojos_stats["wins"], rojos_stats["goals"]), (1, 1, 2))
+        self.assertEqual((azules_stats["matches"], azules_stats["goals"], azules_stats["mvps"]), (2, 4, 1))
+        self.assertEqual([p["goals"] for p in azules_stats["top_players"]], [4])
+
+
+class BucketCacheTests(TestCase):
+    def setUp(self):
+        self.location = _location()
+        self.ana = _user("ana")
+        PlayerMatchStat.objects.create(user=self.ana, match=_match(self.location, days_ago=70), goals=2)
+        caches[settings.STATS_CACHE_ALIAS].clear()
+
+    def test_closed_periods_are_not_recomputed(self):
+        with self.assertNumQueries(2):  # periodos cerrados + periodo en curso
+            first = buckets.user_buckets(self.ana.pk, "month")
+        # alta sin señales (como un bulk_create): la caché de periodos cerrados no se entera
+        PlayerMatchStat.objects.bulk_create([PlayerMatchStat(user=self.ana, goals=5,
+                                                             match=_match(self.location, days_ago=100))])
+        with self.assertNumQueries(1):  # solo el periodo en curso
+            self.assertEqual(buckets.user_buckets(self.ana.pk, "month"), first)
+
+        # avanza el calendario: solo se consulta el tramo recién cerrado (y el nuevo periodo en curso)
+        later = timezone.now() + timedelta(days=40)
+        with mock.patch.object(buckets.timezone, "now", return_value=later), self.assertNumQueries(2):
+            moved = buckets.user_buckets(self.ana.pk, "month")
+        self.assertEqual([b["goals"] for b in moved], [2])
+        cached = caches[settings.STATS_CACHE_ALIAS].get(f"stats:buckets:{self.ana.pk}:month")
+        self.assertEqual(cached["closed_until"], buckets.bucket_start("month", later).isoformat())
+
+        buckets.invalidate_user_buckets([self.ana.pk])
+        self.assertEqual(sorted(b["goals"] for b in buckets.user_buckets(self.ana.pk, "month")), [2, 5])
+
+
+@override_settings(AUTH_TOKEN_CACHE_ENABLED=False, EXPORTS_CHUNK_SIZE=1)
+class ExportTests(TransactionTestCase):
+    """Las vistas de export leen de la réplica (TEST MIRROR): sin el atomic de TestCase."""
+    databases = _DATABASES
+
+    def setUp(self):
+        location = _location()
+        self.match, other = _match(location), _match(location, days_ago=3)
+        self.ana, self.beto = _user("ana", "11111111"), _user("beto", "22222222")
+        self.stats = [
+            PlayerMatchStat.objects.create(user=self.ana, match=self.match, goals=2, is_winner=True),
+            PlayerMatchStat.objects.create(user=self.beto, match=self.match, is_mvp=True),
+            PlayerMatchStat.objects.create(user=self.ana, match=other, goals=1),
+        ]
+        staff = _user("staff", "99999999")
+        staff.is_staff = True
+        staff.save(update_fields=["is_staff"])
+        self.token = uuid.uuid4().hex
+        SessionToken.objects.create(user=staff, document_number=staff.document_number, device_id="d1",
+                                    token=self.token)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("stats-export"), params, secure=True,
+                                   headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)  # StreamingHttpResponse: nada materializado
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_view(self):
+        response, body = self._export(output="csv")
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([int(r["id"]) for r in rows], [s.pk for s in self.stats])
+        self.assertEqual(rows[0]["match_identifier"], str(self.match.match_identifier))
+        self.assertEqual((rows[0]["email"], rows[0]["goals"], rows[0]["is_winner"]), ("ana@example.com", "2", "True"))
+        self.assertEqual(rows[1]["is_winner"], "")  # desconocido
+
+    def test_ndjson_view_filtered_by_match(self):
+        response, body = self._export(output="ndjson", match=str(self.match.match_identifier))
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([(r["user_id"], r["goals"], r["is_mvp"]) for r in rows],
+                         [(self.ana.pk, 2, False), (self.beto.pk, 0, True)])
+
+    def test_command_writes_file(self):
+        Payment.objects.create(user=self.ana, match=self.match, amount="20.00", external_reference="ref-1",
+                               status=PaymentStatus.APPROVED)
+        with tempfile.NamedTemporaryFile("r", suffix=".ndjson") as out:
+            call_command("export_data", "payments", format="ndjson", output=out.name, stderr=io.StringIO())
+            rows = [json.loads(line) for line in out.read().splitlines()]
+        self.assertEqual([(r["external_reference"], r["amount"], r["status"]) for r in rows],
+                         [("ref-1", "20.00", PaymentStatus.APPROVED)])
+
+        stderr = io.StringIO()
+        with tempfile.NamedTemporaryFile("r", suffix=".csv", newline="") as out:
+            call_command("export_data", "stats", format="csv", output=out.name,
+                         date_to=str(timezone.localdate() - timedelta(days=2)), stderr=stderr)
+            rows = list(csv.DictReader(out))
+        self.assertEqual([int(r["id"]) for r in rows], [self.stats[2].pk])
+        self.assertIn("1 filas exportadas", stderr.getvalue())
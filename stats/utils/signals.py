@@ -0,0 +1,74 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from matches.models import TeamMembership
+from stats.api.models import PlayerMatchStat
+from stats.services.invalidation import invalidate_derived
+from stats.services.summary import apply_delta, contribution
+from stats.services.teams import invalidate_team_stats, invalidate_user_teams
+
+_TRACKED = ("user_id", "goals", "is_winner", "is_mvp")
+
+
+def _current(instance: PlayerMatchStat) -> dict:
+    return {f: getattr(instance, f) for f in _TRACKED}
+
+
+def _previous(instance: PlayerMatchStat):
+    """Valores guardados en BD antes de este save (None si es alta)."""
+    if instance._state.adding and instance.pk is None:
+        return None
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    if all(f in loaded for f in _TRACKED):
+        return {f: loaded[f] for f in _TRACKED}
+    # instancia no cargada desde la BD (campos diferidos, o construida con un pk
+    # existente: save() hace UPDATE): una consulta
+    return PlayerMatchStat.objects.filter(pk=instance.pk).values(*_TRACKED).first()
+
+
+def _contribution(values: dict) -> dict:
+    return contribution(values["goals"], values["is_winner"], values["is_mvp"])
+
+
+@receiver(pre_save, sender=PlayerMatchStat)
+def remember_previous_stat(sender, instance: PlayerMatchStat, **kwargs):
+    instance._summary_previous = _previous(instance)
+
+
+@receiver(post_save, sender=PlayerMatchStat)
+def update_summary_on_save(sender, instance: PlayerMatchStat, **kwargs):
+    old = getattr(instance, "_summary_previous", None)
+    new = _current(instance)
+    new_part = _contribution(new)
+
+    if old is None:
+        apply_delta(new["user_id"], new_part)
+    elif old["user_id"] != new["user_id"]:
+        apply_delta(old["user_id"], _contribution(old), sign=-1)
+        apply_delta(new["user_id"], new_part)
+    else:
+        old_part = _contribution(old)
+        apply_delta(new["user_id"], {k: new_part[k] - old_part[k] for k in new_part})
+
+    # un segundo save() de la misma instancia parte de lo recién guardado
+    instance._loaded_values = new
+    instance._summary_previous = None
+    invalidate_derived({new["user_id"], old["user_id"]} if old else {new["user_id"]})
+
+
+@receiver(post_delete, sender=PlayerMatchStat)
+def update_summary_on_delete(sender, instance: PlayerMatchStat, **kwargs):
+    # Cubre leave_match (delete del queryset), el admin y las cascadas
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    values = {f: loaded.get(f, getattr(instance, f)) for f in _TRACKED}
+    apply_delta(values["user_id"], _contribution(values), sign=-1)
+    invalidate_derived([values["user_id"]])
+
+
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+def invalidate_team_on_membership_change(sender, instance: TeamMembership, **kwargs):
+    # set_current_team cierra la membresía anterior con un update(): invalida
+    # todos los equipos del usuario, no solo el de esta fila
+    invalidate_team_stats(instance.team_id)
+    invalidate_user_teams([instance.user_id])